@@ -0,0 +1,174 @@
+import numpy as np
+from scipy.optimize import brentq
+from compute import check_cancelled
+
+# -----------------------------------------------
+# Roots, Extrema and Inflection Points
+# -----------------------------------------------
+
+# Refined points are listed at most this many per kind; beyond that the
+# markers would cover the curve anyway
+MAX_POINTS = 5000
+
+# A refined sign change only counts as a zero if |g(x)| there is below this
+# fraction of the curve's scale; otherwise it was a pole (1/x, tan(x))
+POLE_RATIO = 1e-6
+
+
+class CriticalPoints:
+    """Roots of f, its local maxima and minima, and its inflection points on the grid."""
+
+    def __init__(self, roots, maxima, minima, inflections, truncated=False):
+        # Each is an (n, 2) array of (x, f(x)) rows, sorted by x
+        self.roots = roots
+        self.maxima = maxima
+        self.minima = minima
+        self.inflections = inflections
+        # True if some kind hit MAX_POINTS
+        self.truncated = truncated
+
+    def __len__(self):
+        return len(self.roots) + len(self.maxima) + len(self.minima) + len(self.inflections)
+
+
+def _scale(y_vals):
+    finite = y_vals[np.isfinite(y_vals)]
+    return max(float(np.max(np.abs(finite))), 1.0) if finite.size else 1.0
+
+
+def bracket_sign_changes(x_vals, y_vals):
+    """
+    Find every grid interval on which a sampled curve changes sign.
+
+    Args:
+        x_vals (np.ndarray): The grid
+        y_vals (np.ndarray): The curve on the grid (NaN where undefined)
+
+    Returns:
+        tuple: (brackets, exact) where brackets holds the left index of each
+            interval with a strict sign change and exact holds indices where
+            the sample is exactly zero
+    """
+    finite = np.isfinite(y_vals)
+    signs = np.sign(np.where(finite, y_vals, 0.0))
+    both_finite = finite[:-1] & finite[1:]
+    brackets = np.flatnonzero(both_finite & (signs[:-1] * signs[1:] < 0))
+    exact = np.flatnonzero(finite & (signs == 0))
+    return brackets, exact
+
+
+def refine_zeros(func, x_vals, y_vals, xtol=1e-12, cancel_event=None, limit=MAX_POINTS):
+    """
+    Refine the sign changes of a sampled curve with Brent's method.
+
+    Args:
+        func (callable): The compiled curve, f(array) -> array (see compile_function)
+        x_vals (np.ndarray): The grid
+        y_vals (np.ndarray): func sampled on the grid
+        xtol (float): Absolute tolerance of each zero
+        cancel_event (threading.Event): Optional flag checked every few hundred zeros
+        limit (int): Stop after this many zeros
+
+    Returns:
+        tuple: (zeros array, lower-side signs array, truncated flag). The sign is
+            that of the curve just left of each zero, so a caller can tell a
+            downward from an upward crossing.
+    """
+    brackets, exact = bracket_sign_changes(x_vals, y_vals)
+
+    def scalar(x_val):
+        return float(func(np.array([x_val]))[0])
+
+    scale = _scale(y_vals)
+
+    zeros = []
+    signs = []
+    for n, i in enumerate(brackets):
+        if len(zeros) >= limit:
+            break
+        if n % 256 == 0:
+            check_cancelled(cancel_event)
+        try:
+            zero = brentq(scalar, x_vals[i], x_vals[i + 1], xtol=xtol)
+        except (ValueError, RuntimeError):
+            continue
+        value = scalar(zero)
+        if not np.isfinite(value) or abs(value) > POLE_RATIO * scale:
+            continue
+        zeros.append(zero)
+        signs.append(np.sign(y_vals[i]))
+
+    # Samples that are already exact zeros need no refinement; the crossing
+    # direction is read from the neighbours on either side
+    for i in exact:
+        if len(zeros) >= limit:
+            break
+        left = y_vals[i - 1] if i > 0 else np.nan
+        right = y_vals[i + 1] if i + 1 < len(y_vals) else np.nan
+        if np.isfinite(left) and np.isfinite(right) and np.sign(left) * np.sign(right) < 0:
+            zeros.append(x_vals[i])
+            signs.append(np.sign(left))
+        elif not (np.isfinite(left) and np.isfinite(right)):
+            continue
+        elif np.sign(left) == np.sign(right) != 0:
+            # Touching zero without crossing, e.g. x**2 at 0
+            zeros.append(x_vals[i])
+            signs.append(0.0)
+
+    truncated = len(brackets) + len(exact) > limit
+    order = np.argsort(zeros)
+    return np.asarray(zeros, dtype=np.float64)[order], np.asarray(signs)[order], truncated
+
+
+def find_critical_points(funcs, x_vals, samples, cancel_event=None, limit=MAX_POINTS):
+    """
+    Locate roots, extrema and inflection points of f on the grid.
+
+    Sign changes of f, f' and f'' are bracketed with one vectorized pass over
+    the sampled arrays, then each bracket is refined with Brent's method on
+    the compiled callable.
+
+    Args:
+        funcs (list): Compiled [f, f', f''] (see compile_function)
+        x_vals (np.ndarray): The grid
+        samples (list): [f, f', f''] sampled on the grid
+        cancel_event (threading.Event): Optional flag checked between stages
+        limit (int): Maximum points kept per kind
+
+    Returns:
+        CriticalPoints: Every point paired with f(x)
+    """
+    f = funcs[0]
+
+    def with_values(xs):
+        if not len(xs):
+            return np.empty((0, 2))
+        return np.column_stack([xs, f(xs)])
+
+    roots, _, roots_cut = refine_zeros(f, x_vals, samples[0], cancel_event=cancel_event, limit=limit)
+    check_cancelled(cancel_event)
+    stationary, slope_signs, extrema_cut = refine_zeros(funcs[1], x_vals, samples[1],
+                                                        cancel_event=cancel_event, limit=limit)
+    check_cancelled(cancel_event)
+    bends, bend_signs, inflections_cut = refine_zeros(funcs[2], x_vals, samples[2],
+                                                      cancel_event=cancel_event, limit=limit)
+
+    # f' going + -> - is a maximum, - -> + a minimum; a touching zero of f' is neither
+    maxima = stationary[slope_signs > 0]
+    minima = stationary[slope_signs < 0]
+    # An inflection needs f'' to actually change sign
+    inflections = bends[bend_signs != 0]
+
+    # Double roots (x**2 at 0) never change sign; they show up as extrema on the axis
+    turning = np.concatenate([maxima, minima])
+    if len(turning):
+        touching = turning[np.abs(f(turning)) <= POLE_RATIO * _scale(samples[0])]
+        # Skip any that were already found as a sampled zero
+        if len(roots) and len(touching):
+            nearest = np.min(np.abs(touching[:, None] - roots[None, :]), axis=1)
+            touching = touching[nearest > 1e-9]
+        if len(touching):
+            roots = np.sort(np.concatenate([roots, touching]))
+
+    return CriticalPoints(with_values(roots), with_values(maxima), with_values(minima),
+                          with_values(inflections), roots_cut or extrema_cut or inflections_cut)
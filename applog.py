@@ -0,0 +1,114 @@
+import os
+import sys
+import logging
+from collections import deque
+
+# -----------------------------------------------
+# Application Logging
+# -----------------------------------------------
+
+# Every module logs under this name, e.g. "graphique.assets"
+ROOT_LOGGER_NAME = "graphique"
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+root_logger = logging.getLogger(ROOT_LOGGER_NAME)
+
+
+def get_logger(name):
+    """
+    Get a logger below the application's root logger.
+
+    Messages should use lazy %-style arguments (logger.debug("x: %s", x)) so
+    nothing is formatted unless a handler will emit the record.
+    """
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Keep the most recent records in memory so they can be dumped on demand.
+
+    Records are stored unformatted; formatting only happens in dump().
+    """
+
+    def __init__(self, capacity=1000):
+        super().__init__(logging.DEBUG)
+        self.records = deque(maxlen=capacity)
+        self.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def dump(self):
+        """
+        Returns:
+            list: The buffered records formatted as strings, oldest first
+        """
+        self.acquire()
+        try:
+            records = list(self.records)
+        finally:
+            self.release()
+        return [self.format(record) for record in records]
+
+    def dump_to_file(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.dump()))
+            f.write("\n")
+
+
+ring_buffer = None
+
+
+def configure_logging(level=None, ring_capacity=None):
+    """
+    Set up the application's log handlers.
+
+    The default is quiet: only warnings and errors reach the console, and no
+    console handler is installed at all when there is no console (e.g. a
+    windowed PyInstaller build).
+
+    Args:
+        level (str): Console level; defaults to $GRAPHIQUE_LOG_LEVEL or WARNING
+        ring_capacity (int): Size of the in-memory diagnostics buffer; defaults to
+            $GRAPHIQUE_LOG_BUFFER or 0 (disabled). The buffer captures DEBUG records.
+
+    Returns:
+        RingBufferHandler: The diagnostics buffer, or None if disabled
+    """
+    global ring_buffer
+
+    if level is None:
+        level = os.environ.get("GRAPHIQUE_LOG_LEVEL", "WARNING")
+    level = logging.getLevelName(level.upper()) if isinstance(level, str) else level
+    if not isinstance(level, int):
+        level = logging.WARNING
+
+    if ring_capacity is None:
+        try:
+            ring_capacity = int(os.environ.get("GRAPHIQUE_LOG_BUFFER", "0"))
+        except ValueError:
+            ring_capacity = 0
+
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    ring_buffer = None
+
+    # Records below the logger level are dropped before a LogRecord is even built
+    root_logger.setLevel(logging.DEBUG if ring_capacity > 0 else level)
+    root_logger.propagate = False
+
+    if sys.stderr is not None:
+        console = logging.StreamHandler(sys.stderr)
+        console.setLevel(level)
+        console.setFormatter(logging.Formatter(LOG_FORMAT))
+        root_logger.addHandler(console)
+    else:
+        root_logger.addHandler(logging.NullHandler())
+
+    if ring_capacity > 0:
+        ring_buffer = RingBufferHandler(ring_capacity)
+        root_logger.addHandler(ring_buffer)
+
+    return ring_buffer
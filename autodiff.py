@@ -0,0 +1,247 @@
+import math
+import numpy as np
+import sympy as sp
+
+# -----------------------------------------------
+# Taylor-Mode Automatic Differentiation
+# -----------------------------------------------
+
+# Functions the Taylor arithmetic below can propagate
+SUPPORTED_FUNCTIONS = (sp.exp, sp.log, sp.sin, sp.cos, sp.tan, sp.cot, sp.sec, sp.csc,
+                       sp.sinh, sp.cosh, sp.tanh, sp.asin, sp.acos, sp.atan)
+
+# Integer powers up to this are formed by repeated products, which also work
+# where the base is zero; larger and fractional powers use the power recurrence
+SMALL_POWER = 16
+
+
+def supports(expr, x):
+    """True if every node of expr is a number, x, +, *, a power or one of SUPPORTED_FUNCTIONS."""
+    for node in sp.preorder_traversal(expr):
+        if node.is_Number or node == x or node.is_NumberSymbol:
+            continue
+        if node.is_Symbol:
+            return False
+        if node.is_Add or node.is_Mul or node.is_Pow:
+            continue
+        if not isinstance(node, SUPPORTED_FUNCTIONS):
+            return False
+    return True
+
+
+def _product(a, b):
+    # Cauchy product of two truncated series, (order + 1, N) each
+    out = np.empty(np.broadcast_shapes(a.shape, b.shape))
+    for k in range(out.shape[0]):
+        out[k] = np.sum(a[:k + 1] * b[k::-1], axis=0)
+    return out
+
+
+def _quotient(a, b):
+    # h = a / b: b_0 h_k = a_k - sum_{j>=1} b_j h_{k-j}
+    out = np.empty(np.broadcast_shapes(a.shape, b.shape))
+    for k in range(out.shape[0]):
+        out[k] = (a[k] - np.sum(b[1:k + 1] * out[k - 1::-1][:k], axis=0)) / b[0]
+    return out
+
+
+def _derivative(a):
+    # Series of da/dx, one order shorter (the last coefficient is padded with zero)
+    k = np.arange(1, a.shape[0])[:, None]
+    return np.vstack([a[1:] * k, np.zeros((1, a.shape[1]))])
+
+
+def _antiderivative(d, value):
+    # Series whose derivative is d and whose constant term is value
+    k = np.arange(1, d.shape[0])[:, None]
+    return np.vstack([value[None, :], d[:-1] / k])
+
+
+def _exp(a):
+    # g = exp(a): k g_k = sum_{j=1..k} j a_j g_{k-j}
+    out = np.empty_like(a)
+    out[0] = np.exp(a[0])
+    for k in range(1, a.shape[0]):
+        j = np.arange(1, k + 1)[:, None]
+        out[k] = np.sum(j * a[1:k + 1] * out[k - 1::-1][:k], axis=0) / k
+    return out
+
+
+def _log(a):
+    # g = log(a): g' = a' / a
+    return _antiderivative(_quotient(_derivative(a), a), np.log(a[0]))
+
+
+def _sin_cos(a, hyperbolic=False):
+    # s' = c a', c' = -s a' (c' = s a' for the hyperbolic pair)
+    s, c = np.empty_like(a), np.empty_like(a)
+    s[0], c[0] = (np.sinh(a[0]), np.cosh(a[0])) if hyperbolic else (np.sin(a[0]), np.cos(a[0]))
+    sign = 1.0 if hyperbolic else -1.0
+    for k in range(1, a.shape[0]):
+        j = np.arange(1, k + 1)[:, None]
+        ja = j * a[1:k + 1]
+        s[k] = np.sum(ja * c[k - 1::-1][:k], axis=0) / k
+        c[k] = sign * np.sum(ja * s[k - 1::-1][:k], axis=0) / k
+    return s, c
+
+
+def _power(a, exponent):
+    # g = a^p: k a_0 g_k = sum_{j=1..k} ((p + 1) j - k) a_j g_{k-j}
+    out = np.empty_like(a)
+    out[0] = a[0] ** exponent
+    for k in range(1, a.shape[0]):
+        j = np.arange(1, k + 1)[:, None]
+        out[k] = np.sum(((exponent + 1) * j - k) * a[1:k + 1] * out[k - 1::-1][:k], axis=0) / (k * a[0])
+    return out
+
+
+def _integer_power(a, n):
+    result, base = None, a
+    while n:
+        if n & 1:
+            result = base if result is None else _product(result, base)
+        n >>= 1
+        if n:
+            base = _product(base, base)
+    return result
+
+
+class TaylorKernel:
+    """
+    f, f', ..., f^(n) on a grid by propagating truncated Taylor series through f's tree.
+
+    Every node of the expression becomes an (n + 1, N) array of Taylor
+    coefficients at the grid points, combined with the standard recurrences
+    (Cauchy products, exp/log/sin/cos/power rules). The cost is O(n^2) array
+    operations per node, however large the symbolic derivatives would be.
+    Shared subexpressions are evaluated once.
+    """
+
+    def __init__(self, expr, x, order):
+        if not supports(expr, x):
+            raise NotImplementedError(f"No Taylor arithmetic for {expr}")
+        self.expr = expr
+        self.x = x
+        self.order = order
+
+    def __len__(self):
+        return self.order + 1
+
+    def __call__(self, x_vals):
+        x_vals = np.asarray(x_vals, dtype=np.float64)
+        shape = x_vals.shape
+        flat = x_vals.ravel()
+        with np.errstate(all='ignore'):
+            series = self._series(self.expr, flat, {})
+        return [np.broadcast_to(series[k] * math.factorial(k), flat.shape).reshape(shape).copy()
+                for k in range(self.order + 1)]
+
+    def _constant(self, value, size):
+        out = np.zeros((self.order + 1, size))
+        out[0] = value
+        return out
+
+    def _series(self, expr, x_vals, memo):
+        if expr in memo:
+            return memo[expr]
+        size = len(x_vals)
+        if expr == self.x:
+            out = self._constant(x_vals, size)
+            if self.order:
+                out[1] = 1.0
+        elif not expr.has(self.x):
+            out = self._constant(float(expr), size)
+        elif expr.is_Add:
+            out = sum(self._series(arg, x_vals, memo) for arg in expr.args)
+        elif expr.is_Mul:
+            out = None
+            for arg in expr.args:
+                term = self._series(arg, x_vals, memo)
+                out = term if out is None else _product(out, term)
+        elif expr.is_Pow:
+            base, exponent = expr.args
+            if exponent.has(self.x):
+                # a^b = exp(b log a)
+                out = _exp(_product(self._series(exponent, x_vals, memo), _log(self._series(base, x_vals, memo))))
+            elif exponent.is_Integer and 0 < exponent <= SMALL_POWER:
+                out = _integer_power(self._series(base, x_vals, memo), int(exponent))
+            elif exponent == -1:
+                out = _quotient(self._constant(1.0, size), self._series(base, x_vals, memo))
+            else:
+                out = _power(self._series(base, x_vals, memo), float(exponent))
+        else:
+            out = self._function(expr, self._series(expr.args[0], x_vals, memo))
+        memo[expr] = out
+        return out
+
+    def _function(self, expr, a):
+        if isinstance(expr, sp.exp):
+            return _exp(a)
+        if isinstance(expr, sp.log):
+            return _log(a)
+        if isinstance(expr, (sp.sin, sp.cos, sp.tan, sp.cot, sp.sec, sp.csc)):
+            s, c = _sin_cos(a)
+            one = self._constant(1.0, a.shape[1])
+            if isinstance(expr, sp.sin):
+                return s
+            if isinstance(expr, sp.cos):
+                return c
+            if isinstance(expr, sp.tan):
+                return _quotient(s, c)
+            if isinstance(expr, sp.cot):
+                return _quotient(c, s)
+            return _quotient(one, c) if isinstance(expr, sp.sec) else _quotient(one, s)
+        if isinstance(expr, (sp.sinh, sp.cosh, sp.tanh)):
+            s, c = _sin_cos(a, hyperbolic=True)
+            return s if isinstance(expr, sp.sinh) else c if isinstance(expr, sp.cosh) else _quotient(s, c)
+        # Inverse functions through their derivatives: atan' = a'/(1 + a^2), asin' = a'/sqrt(1 - a^2)
+        da = _derivative(a)
+        if isinstance(expr, sp.atan):
+            return _antiderivative(_quotient(da, self._constant(1.0, a.shape[1]) + _product(a, a)), np.arctan(a[0]))
+        root = _power(self._constant(1.0, a.shape[1]) - _product(a, a), -0.5)
+        if isinstance(expr, sp.asin):
+            return _antiderivative(_product(da, root), np.arcsin(a[0]))
+        return _antiderivative(-_product(da, root), np.arccos(a[0]))
+
+
+class TaylorFamily:
+    """
+    A kernel for a list mixing plain expressions and sp.Derivative(f, (x, k)).
+
+    The derivatives come from one TaylorKernel of f, the plain expressions from
+    an ordinary kernel; results are returned in the order of exprs, so this is
+    a drop-in replacement for a FusedKernel.
+    """
+
+    def __init__(self, exprs, x, compile_plain):
+        self.exprs = tuple(exprs)
+        derivatives = [expr for expr in self.exprs if isinstance(expr, sp.Derivative)]
+        base = derivatives[0].expr
+        order = max(expr.derivative_count for expr in derivatives)
+        self.taylor = TaylorKernel(base, x, order)
+        self.plain = [expr for expr in self.exprs if not isinstance(expr, sp.Derivative)]
+        self.plain_kernel = compile_plain(self.plain) if self.plain else None
+
+    def __len__(self):
+        return len(self.exprs)
+
+    def __call__(self, x_vals):
+        orders = self.taylor(x_vals)
+        plain = dict(zip(self.plain, self.plain_kernel(x_vals))) if self.plain_kernel is not None else {}
+        return [orders[expr.derivative_count] if isinstance(expr, sp.Derivative) else plain[expr]
+                for expr in self.exprs]
+
+
+def compile_derivative(derivative, x):
+    """
+    Vectorized callable for one sp.Derivative(f, (x, k)) placeholder.
+
+    Returns:
+        callable: x_vals -> f^(k)(x_vals), like compute.compile_function
+    """
+    kernel = TaylorKernel(derivative.expr, x, derivative.derivative_count)
+
+    def evaluate(x_vals):
+        return kernel(x_vals)[-1]
+
+    return evaluate
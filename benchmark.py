@@ -0,0 +1,267 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import numpy as np
+import sympy as sp
+from scipy.integrate import cumulative_trapezoid
+from compute import SAMPLE_COUNT, compile_family, compile_function, parse_expression
+from kernels import available_backends, compile_kernel, resolve_backend
+
+# -----------------------------------------------
+# Benchmark Corpus
+# -----------------------------------------------
+
+# (category, function text, x_min, x_max, derivative order)
+CORPUS = [
+    ("polynomial", "x**2 + 3*x + 5", -10, 10, 2),
+    ("polynomial", "2*x**6 - 5*x**5 + 3*x**4 + 7*x**3 - 4*x**2 + 6*x + 10", -10, 10, 6),
+    ("trig", "sin(x)*cos(2*x)", -10, 10, 3),
+    ("trig", "tan(x/4) + sin(x)**3", -5, 5, 2),
+    ("exponential", "exp(-x**2/10)", -10, 10, 4),
+    ("exponential", "x**2*exp(x/5)", -10, 10, 3),
+    ("rational", "1/(x**2 - 4)", -5, 5, 2),
+    ("rational", "(x**3 + 1)/(x - 1)", -5, 5, 2),
+    ("oscillatory", "sin(50*x)*exp(-x**2)", -3, 3, 2),
+    ("oscillatory", "sin(1/x)", -1, 1, 1),
+    ("nested", "sin(cos(exp(x/5)))", -10, 10, 3),
+    ("nested", "exp(sin(x))*cos(x)", -10, 10, 3),
+]
+
+STAGES = ["parse", "diff", "integrate", "simplify", "sample", "sample_fused", "sample_kernel",
+          "cumulative_trapezoid", "draw", "hover"]
+
+
+def time_call(func, repeat, setup=None):
+    """
+    Run func repeat times and return the best wall time in seconds with the last result.
+
+    Args:
+        func (callable): The work to time
+        repeat (int): Number of runs
+        setup (callable): Optional untimed call before each run
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+# -----------------------------------------------
+# Benchmark Runner
+# -----------------------------------------------
+
+def benchmark_compute(func_str, x_min, x_max, order, repeat, num_points, backend="numpy"):
+    """
+    Time the symbolic and numeric stages for one expression.
+
+    Returns:
+        tuple: (timings dict, x_vals, y_vals_list, int_vals)
+    """
+    timings = {}
+    # SymPy memoizes most operations, so symbolic stages start from a cold cache
+    cold = sp.core.cache.clear_cache
+
+    timings["parse"], (func, x) = time_call(lambda: parse_expression(func_str), repeat, cold)
+
+    # sp.diff is timed per order, each step differentiating the previous result
+    derivatives = [func]
+    diff_times = []
+    for _ in range(order):
+        elapsed, derivative = time_call(lambda: sp.diff(derivatives[-1], x), repeat, cold)
+        diff_times.append(elapsed)
+        derivatives.append(derivative)
+    timings["diff"] = sum(diff_times)
+    timings["diff_per_order"] = diff_times
+
+    timings["integrate"], _ = time_call(lambda: sp.integrate(func, x), 1, cold)
+    timings["simplify"], _ = time_call(lambda: [sp.simplify(d) for d in derivatives], 1, cold)
+
+    x_vals = np.linspace(x_min, x_max, num_points)
+
+    def sample():
+        return [compile_function(d, x)(x_vals) for d in derivatives]
+
+    timings["sample"], y_vals_list = time_call(sample, repeat)
+    # The whole family through one CSE kernel, as the pipeline evaluates it
+    timings["sample_fused"], _ = time_call(lambda: compile_family(derivatives, x)(x_vals), repeat)
+    # Evaluation only, with the kernel compiled (and JIT-warmed) beforehand
+    kernel = compile_kernel(derivatives, x, backend)
+    timings["sample_kernel"], _ = time_call(lambda: kernel(x_vals), repeat)
+    timings["cumulative_trapezoid"], int_vals = time_call(
+        lambda: cumulative_trapezoid(y_vals_list[0], x_vals, initial=0), repeat)
+
+    return timings, x_vals, y_vals_list, int_vals
+
+
+def benchmark_render(widget, x_vals, y_vals_list, int_vals, repeat, hover_points=50):
+    """
+    Time a full PlotWidget draw and a sweep of hover events across the curve.
+    """
+    from matplotlib.backend_bases import MouseEvent
+
+    dy_vals_list = [np.gradient(y, x_vals) for y in y_vals_list]
+    draw_time, _ = time_call(
+        lambda: widget.plot_function(x_vals, y_vals_list, dy_vals_list, int_vals), repeat)
+
+    # Synthesize motion events on the original curve
+    finite = np.isfinite(y_vals_list[0])
+    indices = np.linspace(0, len(x_vals) - 1, hover_points).astype(int)
+    indices = indices[finite[indices]]
+    events = []
+    for i in indices:
+        px, py = widget.ax.transData.transform((x_vals[i], y_vals_list[0][i]))
+        events.append(MouseEvent("motion_notify_event", widget, px, py))
+
+    def hover():
+        for event in events:
+            widget.on_hover(event)
+
+    hover_time, _ = time_call(hover, repeat)
+    return {"draw": draw_time, "hover": hover_time / max(len(events), 1)}
+
+
+def run_benchmarks(repeat=3, num_points=SAMPLE_COUNT, render=True, only=None, backend="auto"):
+    """
+    Run the whole corpus.
+
+    Args:
+        repeat (int): Repetitions per stage; the best time is kept
+        num_points (int): Grid size for sampling and drawing
+        render (bool): Also time PlotWidget draw and hover (needs PyQt5)
+        only (str): Restrict to one corpus category
+        backend (str): Evaluation backend timed by the sample_kernel stage
+
+    Returns:
+        dict: JSON-serializable results
+    """
+    backend = resolve_backend(backend)
+    widget = None
+    if render:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtWidgets import QApplication
+        from graph import PlotWidget
+        app = QApplication.instance() or QApplication(sys.argv)
+        widget = PlotWidget()
+        widget.resize(800, 600)
+
+    cases = []
+    for category, func_str, x_min, x_max, order in CORPUS:
+        if only and category != only:
+            continue
+        timings, x_vals, y_vals_list, int_vals = benchmark_compute(
+            func_str, x_min, x_max, order, repeat, num_points, backend)
+        if widget is not None:
+            timings.update(benchmark_render(widget, x_vals, y_vals_list, int_vals, repeat))
+        cases.append({
+            "category": category,
+            "function": func_str,
+            "range": [x_min, x_max],
+            "derivative_order": order,
+            "timings": timings,
+        })
+        print(f"{category:12s} {func_str:40s} " +
+              " ".join(f"{stage}={timings[stage] * 1000:.2f}ms" for stage in STAGES if stage in timings),
+              file=sys.stderr)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "sympy": sp.__version__,
+            "repeat": repeat,
+            "num_points": num_points,
+            "backend": backend,
+            "available_backends": available_backends(),
+        },
+        "cases": cases,
+    }
+
+
+# -----------------------------------------------
+# Baseline Comparison
+# -----------------------------------------------
+
+def compare(results, baseline, threshold=1.25, min_time=1e-4):
+    """
+    Compare two result sets stage by stage.
+
+    Args:
+        results (dict): Current run
+        baseline (dict): Saved run
+        threshold (float): Slowdown ratio that counts as a regression
+        min_time (float): Stages faster than this in both runs are ignored as noise
+
+    Returns:
+        list: One dict per (function, stage) present in both runs, with the ratio
+            and a "regression" flag
+    """
+    saved = {case["function"]: case["timings"] for case in baseline.get("cases", [])}
+    report = []
+    for case in results["cases"]:
+        old = saved.get(case["function"])
+        if old is None:
+            continue
+        for stage in STAGES:
+            if stage not in old or stage not in case["timings"]:
+                continue
+            before, after = old[stage], case["timings"][stage]
+            if max(before, after) < min_time:
+                continue
+            ratio = after / before if before > 0 else float("inf")
+            report.append({
+                "function": case["function"],
+                "stage": stage,
+                "baseline": before,
+                "current": after,
+                "ratio": ratio,
+                "regression": ratio > threshold,
+            })
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Graphique compute and render pipeline.")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per stage (best is kept)")
+    parser.add_argument("--points", type=int, default=SAMPLE_COUNT, help="grid size")
+    parser.add_argument("--category", help="only run one corpus category")
+    parser.add_argument("--no-render", action="store_true", help="skip PlotWidget draw and hover")
+    parser.add_argument("--backend", default="auto", help="evaluation backend: auto, numpy, numexpr or numba")
+    parser.add_argument("--output", help="write results JSON to this file instead of stdout")
+    parser.add_argument("--baseline", help="compare against a saved results JSON")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(repeat=args.repeat, num_points=args.points,
+                             render=not args.no_render, only=args.category, backend=args.backend)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report = compare(results, baseline, threshold=args.threshold)
+        results["comparison"] = report
+        regressions = [r for r in report if r["regression"]]
+        for r in regressions:
+            print(f"REGRESSION {r['stage']:20s} {r['function']}: x{r['ratio']:.2f}", file=sys.stderr)
+        exit_code = 1 if regressions else 0
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
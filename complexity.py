@@ -0,0 +1,295 @@
+import multiprocessing
+import threading
+import sympy as sp
+from autodiff import supports
+
+# -----------------------------------------------
+# Cost Model and Strategy Routing
+# -----------------------------------------------
+
+# How a job's symbolic work is done:
+#   symbolic          derivatives, simplify and integrate with no limit
+#   symbolic-timeout  the same, but simplify/integrate give up after SYMBOLIC_TIMEOUT
+#   numeric           no simplify or symbolic integral; quadrature for the definite integral
+#   autodiff          derivatives sampled by Taylor-mode AD instead of sp.diff
+STRATEGIES = ("symbolic", "symbolic-timeout", "numeric", "autodiff")
+
+# Seconds a single sp.simplify / sp.integrate call may take under a limited strategy
+SYMBOLIC_TIMEOUT = 5.0
+
+# Seconds the worker process may take to start (it imports the app's modules
+# once under spawn); not counted against SYMBOLIC_TIMEOUT
+WORKER_STARTUP_TIMEOUT = 60.0
+
+# Functions whose integrals rarely have closed forms, and ones that make
+# sp.integrate split into piecewise cases
+SPECIAL_FUNCTIONS = (sp.gamma, sp.loggamma, sp.factorial, sp.erf, sp.erfc, sp.Si, sp.Ci, sp.Ei,
+                     sp.li, sp.besselj, sp.bessely, sp.sinc)
+NONSMOOTH_FUNCTIONS = (sp.Abs, sp.sign, sp.floor, sp.ceiling, sp.Heaviside, sp.Min, sp.Max)
+
+# Tree sizes (nodes), depth and structure deciding the strategy. f runs
+# "symbolic" only up to SYMBOLIC_NODES / SYMBOLIC_DEPTH with at most one
+# composition and one extra product factor (products of compositions are
+# where sp.integrate stalls); above NUMERIC_NODES nothing symbolic is tried
+SYMBOLIC_NODES = 40
+SYMBOLIC_DEPTH = 8
+SYMBOLIC_COMPOSITIONS = 1
+SYMBOLIC_PRODUCTS = 1
+NUMERIC_NODES = 250
+
+# Predicted size of the highest derivative above which sp.diff is replaced by
+# AD when possible, and above which the job is flagged as expensive
+DERIVATIVE_NODES = 400
+EXPENSIVE_NODES = 5000
+
+# Per-order growth of the derivative tree: each composition (a function or
+# power of something other than x) roughly adds GROWTH_PER_COMPOSITION, each
+# extra x-dependent factor of a product GROWTH_PER_PRODUCT (measured on SymPy 1.12)
+GROWTH_PER_COMPOSITION = 0.35
+GROWTH_PER_PRODUCT = 0.25
+MAX_GROWTH = 3.5
+
+
+class SymbolicTimeout(Exception):
+    """A symbolic computation ran past its time limit and was stopped."""
+
+
+class CostEstimate:
+    """
+    Predicted cost of the symbolic work for one function and derivative order.
+
+    Attributes:
+        nodes (int): Nodes in f's expression tree
+        depth (int): Height of the tree
+        functions (dict): Category ("elementary", "special", "nonsmooth") -> sorted function names
+        derivative_nodes (int): Predicted nodes of f^(derivative_order)
+        strategy (str): One of STRATEGIES
+        reasons (list): Short human-readable reasons for the strategy
+        expensive (bool): True if the job is predicted to be slow even on this strategy
+    """
+
+    def __init__(self, nodes, depth, functions, derivative_order, derivative_nodes, strategy, reasons, expensive):
+        self.nodes = nodes
+        self.depth = depth
+        self.functions = functions
+        self.derivative_order = derivative_order
+        self.derivative_nodes = derivative_nodes
+        self.strategy = strategy
+        self.reasons = reasons
+        self.expensive = expensive
+
+    @property
+    def timeout(self):
+        """Seconds allowed for simplify/integrate, or None for no limit."""
+        return None if self.strategy == "symbolic" else SYMBOLIC_TIMEOUT
+
+    def describe(self):
+        """One line for the Details panel, e.g. "symbolic with a 5 s limit (34 nodes, special: gamma)"."""
+        label = {
+            "symbolic": "symbolic",
+            "symbolic-timeout": f"symbolic with a {SYMBOLIC_TIMEOUT:g} s limit",
+            "numeric": "numeric only",
+            "autodiff": "automatic differentiation",
+        }[self.strategy]
+        return f"{label} ({', '.join(self.reasons)})" if self.reasons else label
+
+
+def tree_stats(expr, x):
+    """
+    Walk expr once.
+
+    Returns:
+        tuple: (nodes, depth, function categories, compositions, extra product factors)
+    """
+    nodes = 0
+    depth = 0
+    compositions = 0
+    products = 0
+    functions = {"elementary": set(), "special": set(), "nonsmooth": set()}
+    stack = [(expr, 1)]
+    while stack:
+        node, level = stack.pop()
+        nodes += 1
+        depth = max(depth, level)
+        if node.is_Mul:
+            products += max(sum(1 for arg in node.args if arg.has(x)) - 1, 0)
+        elif node.is_Pow:
+            base, exponent = node.args
+            if exponent.has(x) or (base.has(x) and base != x):
+                compositions += 1
+        elif node.is_Function:
+            name = type(node).__name__
+            if isinstance(node, SPECIAL_FUNCTIONS):
+                functions["special"].add(name)
+            elif isinstance(node, NONSMOOTH_FUNCTIONS):
+                functions["nonsmooth"].add(name)
+            else:
+                functions["elementary"].add(name)
+            if any(arg.has(x) and arg != x for arg in node.args):
+                compositions += 1
+        stack.extend((arg, level + 1) for arg in node.args)
+    functions = {category: sorted(names) for category, names in functions.items()}
+    return nodes, depth, functions, compositions, products
+
+
+def estimate_cost(expr, x, derivative_order=0):
+    """
+    Predict how expensive the symbolic work for expr is and pick a strategy.
+
+    The size of f^(n) is modelled as nodes * growth^n, where growth comes from
+    the compositions and products in the tree (chain and product rule terms).
+
+    Args:
+        derivative_order (int): Highest derivative the job needs
+
+    Returns:
+        CostEstimate
+    """
+    nodes, depth, functions, compositions, products = tree_stats(expr, x)
+    growth = min(1.0 + GROWTH_PER_COMPOSITION * compositions + GROWTH_PER_PRODUCT * products, MAX_GROWTH)
+    derivative_nodes = int(nodes * growth ** max(derivative_order, 0))
+
+    reasons = [f"{nodes} nodes"]
+    if depth > SYMBOLIC_DEPTH:
+        reasons.append(f"depth {depth}")
+    if functions["special"]:
+        reasons.append("special: " + ", ".join(functions["special"]))
+    if functions["nonsmooth"]:
+        reasons.append("non-smooth: " + ", ".join(functions["nonsmooth"]))
+    if derivative_order > 0 and derivative_nodes > DERIVATIVE_NODES:
+        reasons.append(f"order-{derivative_order} derivative ~{derivative_nodes} nodes")
+
+    if derivative_order > 0 and derivative_nodes > DERIVATIVE_NODES and supports(expr, x):
+        strategy = "autodiff"
+    elif nodes > NUMERIC_NODES or derivative_nodes > EXPENSIVE_NODES:
+        strategy = "numeric"
+    elif nodes <= SYMBOLIC_NODES and depth <= SYMBOLIC_DEPTH and derivative_nodes <= DERIVATIVE_NODES \
+            and compositions <= SYMBOLIC_COMPOSITIONS and products <= SYMBOLIC_PRODUCTS \
+            and not functions["special"] and not functions["nonsmooth"]:
+        strategy = "symbolic"
+    else:
+        strategy = "symbolic-timeout"
+
+    # Autodiff avoids the big derivatives; the other strategies still build them with sp.diff
+    expensive = strategy != "autodiff" and derivative_nodes > EXPENSIVE_NODES
+    return CostEstimate(nodes, depth, functions, derivative_order, derivative_nodes, strategy, reasons, expensive)
+
+
+def _serve(conn):
+    # Worker process loop: (func, args) in, (ok, result or exception) out, None to stop
+    conn.send(("ready", None))
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        func, args = job
+        try:
+            reply = (True, func(*args))
+        except Exception as exc:
+            reply = (False, exc)
+        try:
+            conn.send(reply)
+        except Exception as exc:
+            # An unpicklable result or exception still has to answer the call
+            conn.send((False, RuntimeError(f"{type(exc).__name__}: {exc}")))
+
+
+class SymbolicWorker:
+    """
+    One long-lived child process that runs time-limited SymPy calls.
+
+    SymPy cannot be interrupted from another thread, so a runaway simplify or
+    integrate runs where it can be terminated. The process is started once
+    (with "spawn": forking the multithreaded Qt app is unsafe) and reused, so
+    its imports are paid for once per session rather than per call; only a
+    call that runs out of time kills it, and the next call starts a new one.
+    Time spent starting up never counts against a call's timeout.
+    """
+
+    def __init__(self, startup_timeout=WORKER_STARTUP_TIMEOUT):
+        self.startup_timeout = startup_timeout
+        self.context = multiprocessing.get_context("spawn")
+        self.process = None
+        self.conn = None
+        self.ready = False
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start the process if it is not running; returns without waiting for it to be ready."""
+        if self.process is not None and self.process.is_alive():
+            return
+        self.stop()
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(target=_serve, args=(child_conn,), daemon=True,
+                                            name="graphique-sympy")
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def stop(self):
+        if self.process is not None:
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process.join()
+            self.process = None
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        self.ready = False
+
+    def _wait_ready(self):
+        if self.ready:
+            return
+        if not self.conn.poll(self.startup_timeout):
+            self.stop()
+            raise SymbolicTimeout(f"the SymPy worker did not start within {self.startup_timeout:g} s")
+        self.conn.recv()
+        self.ready = True
+
+    def call(self, func, args, timeout):
+        """
+        Call func(*args) in the worker and stop it after timeout seconds.
+
+        func, args and the result must be picklable.
+
+        Raises:
+            SymbolicTimeout: If the call did not finish in time
+        """
+        name = getattr(func, '__name__', 'call')
+        with self.lock:
+            self.start()
+            self._wait_ready()
+            self.conn.send((func, args))
+            if not self.conn.poll(timeout):
+                self.stop()
+                raise SymbolicTimeout(f"{name} took longer than {timeout:g} s")
+            try:
+                ok, value = self.conn.recv()
+            except EOFError:
+                self.stop()
+                raise SymbolicTimeout(f"{name} exited without a result")
+        if not ok:
+            raise value
+        return value
+
+
+_worker = SymbolicWorker()
+
+
+def start_worker():
+    """Start the shared SymPy worker ahead of its first call, e.g. at app startup."""
+    with _worker.lock:
+        _worker.start()
+
+
+def run_with_timeout(func, args, timeout):
+    """
+    Call func(*args) in the shared SymPy worker and stop it after timeout seconds.
+
+    Raises:
+        SymbolicTimeout: If the call did not finish in time
+    """
+    return _worker.call(func, args, timeout)
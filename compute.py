@@ -0,0 +1,356 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import sympy as sp
+from scipy.integrate import cumulative_trapezoid
+from parsing import parse_text
+
+# -----------------------------------------------
+# Vectorized Evaluation
+# -----------------------------------------------
+
+# Number of grid points used for every plotted curve
+SAMPLE_COUNT = 400
+
+
+class JobCancelled(Exception):
+    """Raised inside a compute job once its input has gone stale."""
+
+
+def check_cancelled(cancel_event):
+    """Raise JobCancelled if the given event (may be None) has been set."""
+    if cancel_event is not None and cancel_event.is_set():
+        raise JobCancelled()
+
+
+def parse_expression(func_str):
+    """
+    Parse user text into a SymPy expression of x.
+
+    Args:
+        func_str (str): The raw function text (e.g., "3*x**2 + 2*x - 4")
+
+    Returns:
+        tuple: (expression, x symbol)
+
+    Raises:
+        parsing.ParseError: If the text is not a valid expression (a sp.SympifyError)
+    """
+    return parse_text(func_str), sp.Symbol('x')
+
+
+# Separates the functions of an overlay in the function input ("sin(x); cos(x)")
+EXPRESSION_SEPARATOR = ";"
+
+
+def split_expressions(func_text):
+    """
+    Split the function input into one text per plotted function.
+
+    Returns:
+        list: The non-empty, stripped expression texts, in order
+    """
+    parts = (part.strip() for part in func_text.split(EXPRESSION_SEPARATOR))
+    return [part for part in parts if part]
+
+
+def compile_function(expr, x, dtype=np.float64):
+    """
+    Compile a SymPy expression into a NumPy function evaluated over a whole grid.
+
+    Args:
+        expr (sp.Expr): The expression to compile
+        x (sp.Symbol): The independent variable
+        dtype: Floating type used for the evaluation (float64 by default)
+
+    Returns:
+        callable: f(x_vals) -> array of dtype with the same shape as x_vals.
+            Points where the expression is complex or undefined become NaN.
+    """
+    func = sp.lambdify(x, expr, modules='numpy')
+
+    def evaluate(x_vals):
+        x_vals = np.asarray(x_vals, dtype=dtype)
+        with np.errstate(all='ignore'):
+            y_vals = np.asarray(func(x_vals))
+        # Constant expressions come back as scalars
+        return _as_real(y_vals, x_vals.shape, dtype)
+
+    return evaluate
+
+
+def _as_real(y_vals, shape, dtype):
+    if np.iscomplexobj(y_vals):
+        y_vals = np.where(np.abs(y_vals.imag) < 1e-12, y_vals.real, np.nan)
+    return np.broadcast_to(y_vals, shape).astype(dtype)
+
+
+class FusedKernel:
+    """
+    Several expressions of x compiled into one NumPy function.
+
+    SymPy's common-subexpression elimination runs across the whole family
+    before code generation, so a term shared by f, f', f'' ... (exp(x**2),
+    sin(x), a repeated power) is evaluated once per grid instead of once per
+    curve. Calling the kernel returns one array per expression.
+    """
+
+    def __init__(self, exprs, x, dtype=np.float64):
+        self.exprs = tuple(exprs)
+        self.dtype = dtype
+        self.func = sp.lambdify(x, list(self.exprs), modules='numpy', cse=True)
+
+    def __len__(self):
+        return len(self.exprs)
+
+    def __call__(self, *args):
+        # One array per variable; they are broadcast against each other
+        args = [np.asarray(arg, dtype=self.dtype) for arg in args]
+        shape = np.broadcast_shapes(*(arg.shape for arg in args))
+        with np.errstate(all='ignore'):
+            results = self.func(*args)
+        # Complex points become NaN and constant members come back as scalars
+        return [_as_real(np.asarray(y_vals), shape, self.dtype) for y_vals in results]
+
+
+def compile_family(exprs, x, dtype=np.float64):
+    """
+    Compile [f, f', ..., f^(n)] (or any list of expressions) into one fused kernel.
+
+    Args:
+        exprs (list): The expressions to compile together
+        x (sp.Symbol): The independent variable, or a tuple of variables for
+            a kernel of several arguments (e.g. (x, y) for implicit curves)
+        dtype: Floating type used for the evaluation (float64 by default)
+
+    Returns:
+        FusedKernel: kernel(x_vals) -> list of arrays, one per expression
+    """
+    return FusedKernel(exprs, x, dtype)
+
+
+def evaluate_all(funcs, x_vals):
+    """Evaluate a kernel (FusedKernel or any callable returning a list) or a list of compiled callables."""
+    if callable(funcs):
+        return funcs(x_vals)
+    return [func(x_vals) for func in funcs]
+
+
+class PlotData:
+    """Sampled values of a function, its derivatives and its running integral."""
+
+    def __init__(self, derivatives, x_vals, y_vals_list, dy_vals_list, int_vals):
+        self.derivatives = derivatives
+        self.x_vals = x_vals
+        self.y_vals_list = y_vals_list
+        self.dy_vals_list = dy_vals_list
+        self.int_vals = int_vals
+
+
+# -----------------------------------------------
+# Chunked Evaluation for Very Large Grids
+# -----------------------------------------------
+
+# Grid points evaluated per block (8 MiB per float64 column)
+CHUNK_SIZE = 1 << 20
+
+
+def grid_slice(x_min, x_max, num_points, start, stop):
+    """Rows start..stop of np.linspace(x_min, x_max, num_points), without building the whole grid."""
+    step = (x_max - x_min) / (num_points - 1) if num_points > 1 else 0.0
+    x_block = x_min + step * np.arange(start, stop, dtype=np.float64)
+    if stop == num_points and num_points > 1:
+        x_block[-1] = x_max
+    return x_block
+
+
+# -----------------------------------------------
+# Parallel Sampling
+# -----------------------------------------------
+
+# Below this many points per worker, splitting costs more than it saves
+MIN_POINTS_PER_WORKER = 1 << 14
+
+
+def _split(start, stop, parts):
+    bounds = np.linspace(start, stop, parts + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def _sample_span(funcs, columns, x_min, x_max, num_points, offset, start, stop):
+    """
+    Evaluate rows start..stop of the global grid into columns[:, start-offset:stop-offset].
+
+    The last column receives the integral measured from the previous grid point
+    (or from the span's own first point when start == offset), so spans can be
+    stitched afterwards by adding the running totals of the spans before them.
+
+    Returns:
+        float: The integral over this span
+    """
+    lo = start - 1 if start > offset else start
+    x_vals = grid_slice(x_min, x_max, num_points, lo, stop)
+    y_vals_list = evaluate_all(funcs, x_vals)
+    local = cumulative_trapezoid(y_vals_list[0], x_vals, initial=0)
+
+    skip = start - lo
+    rows = slice(start - offset, stop - offset)
+    columns[0][rows] = x_vals[skip:]
+    for i, y_vals in enumerate(y_vals_list):
+        columns[1 + i][rows] = y_vals[skip:]
+    columns[-1][rows] = local[skip:]
+    return float(local[-1])
+
+
+def _stitch(columns, spans, totals, offset):
+    # Add the integral of every earlier span to each span's local integral
+    running = 0.0
+    for (start, stop), total in zip(spans, totals):
+        if running:
+            columns[-1][start - offset:stop - offset] += running
+        running += total
+
+
+def sample_parallel(funcs, x_min, x_max, num_points, start=0, stop=None, workers=None, out=None):
+    """
+    Sample compiled functions over (part of) a grid with a thread pool.
+
+    The range is split into one span per worker. NumPy releases the GIL
+    inside its kernels, so the spans evaluate concurrently, and each worker
+    writes straight into its slice of the shared output arrays. The running
+    integral is computed per span and stitched together at the end.
+
+    Args:
+        funcs: A FusedKernel or a list of compiled callables [f, f', ...]
+        x_min (float): Left end of the domain
+        x_max (float): Right end of the domain
+        num_points (int): Size of the whole grid
+        start (int): First grid row to sample
+        stop (int): One past the last grid row (defaults to num_points)
+        workers (int): Thread count (defaults to the CPU count)
+        out (list): Optional preallocated (e.g. memory-mapped) output columns
+
+    Returns:
+        list: [x, f, f1, ..., integral measured from row start]
+    """
+    stop = num_points if stop is None else stop
+    rows = stop - start
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, rows // MIN_POINTS_PER_WORKER))
+
+    columns = out if out is not None else [np.empty(rows) for _ in range(len(funcs) + 2)]
+    spans = _split(start, stop, workers)
+
+    if len(spans) == 1:
+        totals = [_sample_span(funcs, columns, x_min, x_max, num_points, start, start, stop)]
+    else:
+        with ThreadPoolExecutor(max_workers=len(spans)) as executor:
+            futures = [executor.submit(_sample_span, funcs, columns, x_min, x_max, num_points, start, a, b)
+                       for a, b in spans]
+            totals = [future.result() for future in futures]
+
+    _stitch(columns, spans, totals, start)
+    return columns
+
+
+class GridTable:
+    """
+    A function, its derivatives and its running integral on a very large grid,
+    evaluated block by block instead of all at once.
+
+    Only one block of x and of each curve exists at a time, so memory stays
+    bounded by chunk_size no matter how many points are requested. The
+    cumulative trapezoid integral is carried across block boundaries.
+    """
+
+    def __init__(self, funcs, x_min, x_max, num_points, chunk_size=CHUNK_SIZE, workers=1):
+        """
+        Args:
+            funcs: A FusedKernel or a list of compiled callables [f, f', ..., f^(n)]
+            x_min (float): Left end of the domain
+            x_max (float): Right end of the domain
+            num_points (int): Total number of grid points
+            chunk_size (int): Grid points per block
+            workers (int): Threads used to evaluate each block (see sample_parallel)
+        """
+        self.funcs = funcs
+        self.x_min = x_min
+        self.x_max = x_max
+        self.num_rows = num_points
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.names = ["x", "f"] + [f"f{i}" for i in range(1, len(funcs))] + ["integral"]
+
+    def evaluate_block(self, start, stop):
+        """
+        Returns:
+            list: [x, f, f1, ..., integral from the block's first point] for rows start..stop
+        """
+        if self.workers > 1:
+            return sample_parallel(self.funcs, self.x_min, self.x_max, self.num_rows,
+                                   start=start, stop=stop, workers=self.workers)
+        x_block = grid_slice(self.x_min, self.x_max, self.num_rows, start, stop)
+        y_blocks = evaluate_all(self.funcs, x_block)
+        return [x_block] + y_blocks + [cumulative_trapezoid(y_blocks[0], x_block, initial=0)]
+
+    def blocks(self, chunk_rows=None, cancel_event=None):
+        """
+        Yield (start, stop, [x, f, f1, ..., integral]) blocks in order.
+
+        Args:
+            chunk_rows (int): Override the block size
+            cancel_event (threading.Event): Optional flag checked between blocks
+        """
+        chunk_rows = chunk_rows or self.chunk_size
+        running_total = 0.0
+        last_x = None
+        last_y = None
+
+        for start in range(0, self.num_rows, chunk_rows):
+            check_cancelled(cancel_event)
+            stop = min(start + chunk_rows, self.num_rows)
+            values = self.evaluate_block(start, stop)
+            x_block, y_vals = values[0], values[1]
+
+            if last_x is not None:
+                # Trapezoid across the seam between the previous block and this one
+                running_total += 0.5 * (last_y + y_vals[0]) * (x_block[0] - last_x)
+            values[-1] += running_total
+            running_total = values[-1][-1]
+            last_x = x_block[-1]
+            last_y = y_vals[-1]
+
+            yield start, stop, values
+
+    def evaluate(self, out_dir=None, dtype=np.float64, cancel_event=None, progress=None):
+        """
+        Materialize every column, optionally as memory-mapped .npy files.
+
+        Args:
+            out_dir (str): If given, each column is written to <out_dir>/<name>.npy
+                through a memory map, so results larger than RAM can be produced
+            dtype: Output dtype (e.g. np.float32 to halve the size)
+            cancel_event (threading.Event): Optional flag checked between blocks
+            progress (callable): Called with a 0-100 integer after each block
+
+        Returns:
+            dict: Column name -> array (np.memmap when out_dir is given)
+        """
+        columns = {}
+        for name in self.names:
+            if out_dir is None:
+                columns[name] = np.empty(self.num_rows, dtype=dtype)
+            else:
+                path = os.path.join(out_dir, f"{name}.npy")
+                columns[name] = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(self.num_rows,))
+
+        for start, stop, values in self.blocks(cancel_event=cancel_event):
+            for name, block in zip(self.names, values):
+                columns[name][start:stop] = block
+            if progress is not None:
+                progress(int(100 * stop / self.num_rows))
+
+        for array in columns.values():
+            if isinstance(array, np.memmap):
+                array.flush()
+        return columns
@@ -0,0 +1,245 @@
+import numpy as np
+import sympy as sp
+from compute import SAMPLE_COUNT, check_cancelled, compile_family, split_expressions
+from parsing import parse_text
+
+# -----------------------------------------------
+# Parametric, Polar and Implicit Curves
+# -----------------------------------------------
+
+# Plot modes offered next to the function input
+CURVE_MODES = ("function", "parametric", "polar", "implicit")
+
+# Parameter symbols of the parametric and polar modes
+T = sp.Symbol('t')
+THETA = sp.Symbol('theta')
+
+# Implicit curves: cells of the coarse grid per axis, then the factor by which
+# each cell the curve passes through is subdivided, per refinement level
+IMPLICIT_GRID = 96
+IMPLICIT_REFINE = 4
+IMPLICIT_LEVELS = 2
+
+
+class CurveData:
+    """
+    A sampled plane curve with its slope and signed curvature at every point.
+
+    Implicit curves come back as separate segments joined by NaN rows, so the
+    whole curve is still one polyline for Matplotlib.
+    """
+
+    def __init__(self, mode, x_vals, y_vals, slope, curvature, exprs, params=None):
+        self.mode = mode
+        self.x_vals = x_vals
+        self.y_vals = y_vals
+        # dy/dx and curvature at each point
+        self.slope = slope
+        self.curvature = curvature
+        # Symbolic pieces for the Details panel (name -> expression)
+        self.exprs = exprs
+        # Parameter value (t or theta) of each point, None for implicit curves
+        self.params = params
+
+
+def parse_curve(mode, func_text):
+    """
+    Parse the function input for one of the curve modes.
+
+    parametric: "x(t); y(t)"   polar: "r(theta)"   implicit: "F(x, y)" or "lhs = rhs"
+
+    Returns:
+        list: The parsed expressions ([x, y], [r] or [F])
+
+    Raises:
+        sp.SympifyError: If the text does not fit the mode
+    """
+    if mode == "parametric":
+        parts = split_expressions(func_text)
+        if len(parts) != 2:
+            raise sp.SympifyError(func_text)
+        return [parse_text(parts[0], ("t",)), parse_text(parts[1], ("t",))]
+    if mode == "polar":
+        return [parse_text(func_text, ("theta",))]
+    if mode == "implicit":
+        if func_text.count("=") == 1:
+            lhs, rhs = func_text.split("=")
+            return [parse_text(lhs, ("x", "y")) - parse_text(rhs, ("x", "y"))]
+        return [parse_text(func_text, ("x", "y"))]
+    raise ValueError(f"Unknown curve mode: {mode}")
+
+
+def _signed_curvature(dx, dy, ddx, ddy):
+    with np.errstate(all='ignore'):
+        return (dx * ddy - dy * ddx) / (dx ** 2 + dy ** 2) ** 1.5
+
+
+def sample_parametric(x_expr, y_expr, t, t_min, t_max, num_points=SAMPLE_COUNT, mode="parametric"):
+    """
+    Sample (x(t), y(t)) together with dy/dx = y'/x' and the signed curvature.
+
+    x, y and their first two derivatives go through one fused kernel, so the
+    terms they share are evaluated once per grid.
+
+    Returns:
+        CurveData: The sampled curve
+    """
+    dx, dy = sp.diff(x_expr, t), sp.diff(y_expr, t)
+    ddx, ddy = sp.diff(dx, t), sp.diff(dy, t)
+
+    t_vals = np.linspace(t_min, t_max, num_points)
+    x_vals, y_vals, dx_vals, dy_vals, ddx_vals, ddy_vals = compile_family(
+        [x_expr, y_expr, dx, dy, ddx, ddy], t)(t_vals)
+
+    with np.errstate(all='ignore'):
+        slope = dy_vals / dx_vals
+    curvature = _signed_curvature(dx_vals, dy_vals, ddx_vals, ddy_vals)
+
+    exprs = {
+        "x": x_expr,
+        "y": y_expr,
+        "dy/dx": dy / dx,
+        "curvature": (dx * ddy - dy * ddx) / (dx ** 2 + dy ** 2) ** sp.Rational(3, 2),
+    }
+    return CurveData(mode, x_vals, y_vals, slope, curvature, exprs, t_vals)
+
+
+def sample_polar(r_expr, theta_min, theta_max, num_points=SAMPLE_COUNT):
+    """Sample r(theta) as the parametric curve (r cos(theta), r sin(theta))."""
+    curve = sample_parametric(r_expr * sp.cos(THETA), r_expr * sp.sin(THETA), THETA,
+                              theta_min, theta_max, num_points, mode="polar")
+    curve.exprs = dict(r=r_expr, **curve.exprs)
+    return curve
+
+
+def _subdivide(func, x0, y0, width, height, factor):
+    """
+    Split each cell (x0, y0, width, height arrays) into factor x factor subcells.
+
+    F is evaluated once per subgrid node, all cells at a time.
+
+    Returns:
+        tuple: (x0, y0, width, height, corners) of the subcells, with corners an
+            (n, 4) array of F at (x0, y0), (x1, y0), (x1, y1), (x0, y1)
+    """
+    steps = np.arange(factor + 1) / factor
+    grid_x = x0[:, None, None] + width[:, None, None] * steps[None, None, :]
+    grid_y = y0[:, None, None] + height[:, None, None] * steps[None, :, None]
+    values = func(grid_x, grid_y)
+
+    shape = (len(x0), factor, factor)
+    sub_x0 = np.broadcast_to(grid_x[:, :, :-1], shape).ravel()
+    sub_y0 = np.broadcast_to(grid_y[:, :-1, :], shape).ravel()
+    sub_width = np.repeat(width / factor, factor * factor)
+    sub_height = np.repeat(height / factor, factor * factor)
+    corners = np.stack([values[:, :-1, :-1].ravel(), values[:, :-1, 1:].ravel(),
+                        values[:, 1:, 1:].ravel(), values[:, 1:, :-1].ravel()], axis=1)
+    return sub_x0, sub_y0, sub_width, sub_height, corners
+
+
+def _crossed(corners):
+    # Cells whose corners are all defined and straddle (or touch) zero
+    finite = np.all(np.isfinite(corners), axis=1)
+    with np.errstate(invalid='ignore'):
+        return finite & (np.min(corners, axis=1) <= 0) & (np.max(corners, axis=1) >= 0)
+
+
+def marching_squares(x0, y0, width, height, corners):
+    """
+    Vectorized marching squares over a set of cells.
+
+    Each cell edge whose end values differ in sign gets a crossing point by
+    linear interpolation. Cells with two crossings give one segment. Saddle
+    cells (four crossings) are resolved with the value at the cell center.
+
+    Returns:
+        np.ndarray: (m, 2, 2) segment end points
+    """
+    above = corners > 0
+    # Edge k runs from corner k to corner k+1: bottom, right, top (right to left), left (top to bottom)
+    start, end = corners, np.roll(corners, -1, axis=1)
+    crossing = above != np.roll(above, -1, axis=1)
+    with np.errstate(all='ignore'):
+        frac = np.where(crossing, start / (start - end), 0.0)
+
+    x1, y1 = x0 + width, y0 + height
+    points_x = np.stack([x0 + frac[:, 0] * width, x1, x1 - frac[:, 2] * width, x0], axis=1)
+    points_y = np.stack([y0, y0 + frac[:, 1] * height, y1, y1 - frac[:, 3] * height], axis=1)
+
+    count = crossing.sum(axis=1)
+    segments = []
+
+    # Two crossings: join them
+    simple = np.flatnonzero(count == 2)
+    if simple.size:
+        edges = np.nonzero(crossing[simple])[1].reshape(-1, 2)
+        a, b = edges[:, 0], edges[:, 1]
+        segments.append(np.stack([
+            np.stack([points_x[simple, a], points_y[simple, a]], axis=1),
+            np.stack([points_x[simple, b], points_y[simple, b]], axis=1)], axis=1))
+
+    # Saddles: if the center is on corner 0's side, corners 1 and 3 are cut off, else 0 and 2
+    saddle = np.flatnonzero(count == 4)
+    if saddle.size:
+        center_above = corners[saddle].mean(axis=1) > 0
+        joined = center_above == above[saddle, 0]
+        pairs = np.where(joined[:, None, None], [[0, 1], [2, 3]], [[3, 0], [1, 2]])
+        for k in range(2):
+            a, b = pairs[:, k, 0], pairs[:, k, 1]
+            segments.append(np.stack([
+                np.stack([points_x[saddle, a], points_y[saddle, a]], axis=1),
+                np.stack([points_x[saddle, b], points_y[saddle, b]], axis=1)], axis=1))
+
+    if not segments:
+        return np.empty((0, 2, 2))
+    return np.concatenate(segments)
+
+
+def sample_implicit(f_expr, x_min, x_max, y_min, y_max, grid=IMPLICIT_GRID, refine=IMPLICIT_REFINE,
+                    levels=IMPLICIT_LEVELS, cancel_event=None):
+    """
+    Trace F(x, y) = 0 over a rectangle.
+
+    F is evaluated on a coarse grid, only the cells the curve passes through are
+    subdivided (refine x refine per level), and marching squares runs on the
+    finest cells. Slope -F_x/F_y and curvature come from one fused kernel of
+    F's partial derivatives evaluated at the curve points.
+
+    Returns:
+        CurveData: Segments joined by NaN rows
+    """
+    x, y = sp.Symbol('x'), sp.Symbol('y')
+    f_func = compile_family([f_expr], (x, y))
+
+    def evaluate(grid_x, grid_y):
+        return f_func(grid_x, grid_y)[0]
+
+    # The whole rectangle is one cell, split into grid x grid
+    cells = _subdivide(evaluate, np.array([float(x_min)]), np.array([float(y_min)]),
+                       np.array([float(x_max - x_min)]), np.array([float(y_max - y_min)]), grid)
+    for _ in range(levels):
+        check_cancelled(cancel_event)
+        keep = _crossed(cells[4])
+        cells = _subdivide(evaluate, *(part[keep] for part in cells[:4]), refine)
+
+    keep = _crossed(cells[4])
+    segments = marching_squares(*(part[keep] for part in cells))
+
+    # Segment ends, each segment followed by a NaN row so the polyline breaks
+    points = np.concatenate([segments, np.full((len(segments), 1, 2), np.nan)], axis=1).reshape(-1, 2)
+    x_vals, y_vals = points[:, 0], points[:, 1]
+
+    fx, fy = sp.diff(f_expr, x), sp.diff(f_expr, y)
+    fxx, fxy, fyy = sp.diff(fx, x), sp.diff(fx, y), sp.diff(fy, y)
+    fx_vals, fy_vals, fxx_vals, fxy_vals, fyy_vals = compile_family([fx, fy, fxx, fxy, fyy], (x, y))(x_vals, y_vals)
+    with np.errstate(all='ignore'):
+        slope = -fx_vals / fy_vals
+        curvature = ((fy_vals ** 2 * fxx_vals - 2 * fx_vals * fy_vals * fxy_vals + fx_vals ** 2 * fyy_vals)
+                     / (fx_vals ** 2 + fy_vals ** 2) ** 1.5)
+
+    exprs = {
+        "F": f_expr,
+        "dy/dx": -fx / fy,
+        "curvature": (fy ** 2 * fxx - 2 * fx * fy * fxy + fx ** 2 * fyy) / (fx ** 2 + fy ** 2) ** sp.Rational(3, 2),
+    }
+    return CurveData("implicit", x_vals, y_vals, slope, curvature, exprs)
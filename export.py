@@ -0,0 +1,537 @@
+import io
+import os
+import zlib
+import struct
+import tempfile
+import threading
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+from matplotlib.contour import ContourSet
+from matplotlib.transforms import Bbox
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+from applog import get_logger
+from compute import JobCancelled, check_cancelled
+from surface import draw_surface
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    # Parquet export is optional
+    pa = None
+    pq = None
+
+logger = get_logger("export")
+
+# -----------------------------------------------
+# Figure Snapshots
+# -----------------------------------------------
+
+# Formats rendered in one pass by savefig; "tiled-png" is handled separately
+VECTOR_FORMATS = ("svg", "pdf")
+RASTER_FORMATS = ("png", "jpg", "jpeg")
+
+
+class ExportCancelled(JobCancelled):
+    """Raised when an export job is cancelled before it finishes."""
+
+
+def snapshot_figure(figure, ax, surface=None):
+    """
+    Copy everything needed to redraw a plot into plain Python/NumPy data.
+
+    The snapshot holds no references to live artists, so it can be rendered
+    on another thread while the GUI keeps changing the on-screen figure.
+
+    Args:
+        figure (Figure): The on-screen figure
+        ax (Axes): The plot axes
+        surface (dict): The displayed mesh of a two-variable plot (x, y, z, view),
+            redrawn with draw_surface instead of being copied artist by artist
+
+    Returns:
+        dict: Lines, filled areas, labels, limits and figure geometry, plus the
+            lines of any further axes on the figure
+    """
+    lines = _snapshot_lines(ax)
+
+    fills = []
+    for collection in ax.collections:
+        if isinstance(collection, ContourSet):
+            continue
+        polygons = [path.vertices.copy() for path in collection.get_paths()]
+        if not polygons:
+            continue
+        fills.append({
+            "polygons": polygons,
+            "facecolor": collection.get_facecolor().copy(),
+            "edgecolor": collection.get_edgecolor().copy(),
+            "linewidth": collection.get_linewidth().copy(),
+            "alpha": collection.get_alpha(),
+        })
+
+    legend = ax.get_legend()
+    return {
+        "size_inches": tuple(figure.get_size_inches()),
+        "position": ax.get_position().bounds,
+        "xlim": ax.get_xlim(),
+        "ylim": ax.get_ylim(),
+        "aspect": ax.get_aspect(),
+        "title": ax.get_title(),
+        "xlabel": ax.get_xlabel(),
+        "ylabel": ax.get_ylabel(),
+        "lines": lines,
+        "fills": fills,
+        "legend": legend is not None,
+        "surface": surface,
+        # Secondary axes (e.g. a convergence plot), lines only
+        "insets": [_snapshot_inset(other) for other in figure.axes if other is not ax],
+    }
+
+
+def _snapshot_lines(ax):
+    lines = []
+    for line in ax.get_lines():
+        x_vals, y_vals = line.get_data()
+        lines.append({
+            "x": np.array(x_vals, dtype=np.float64),
+            "y": np.array(y_vals, dtype=np.float64),
+            "color": line.get_color(),
+            "linewidth": line.get_linewidth(),
+            "linestyle": line.get_linestyle(),
+            "marker": line.get_marker(),
+            "markersize": line.get_markersize(),
+            "markeredgecolor": line.get_markeredgecolor(),
+            "label": line.get_label(),
+            "zorder": line.get_zorder(),
+            "transform_is_data": line.get_transform() == ax.transData,
+        })
+    return lines
+
+
+def _snapshot_inset(ax):
+    return {
+        "position": ax.get_position().bounds,
+        "xlim": ax.get_xlim(),
+        "ylim": ax.get_ylim(),
+        "xscale": ax.get_xscale(),
+        "yscale": ax.get_yscale(),
+        "title": ax.get_title(),
+        "xlabel": ax.get_xlabel(),
+        "ylabel": ax.get_ylabel(),
+        "lines": _snapshot_lines(ax),
+        "legend": ax.get_legend() is not None,
+    }
+
+
+def _draw_lines(ax, lines):
+    for line in lines:
+        if line["transform_is_data"]:
+            ax.plot(line["x"], line["y"], color=line["color"], linewidth=line["linewidth"],
+                    linestyle=line["linestyle"], marker=line["marker"], markersize=line["markersize"],
+                    markeredgecolor=line["markeredgecolor"], label=line["label"], zorder=line["zorder"])
+        elif np.allclose(line["x"], line["x"][0]):
+            ax.axvline(line["x"][0], color=line["color"], linewidth=line["linewidth"], zorder=line["zorder"])
+        else:
+            ax.axhline(line["y"][0], color=line["color"], linewidth=line["linewidth"], zorder=line["zorder"])
+
+
+def _style_axes(ax):
+    for spine in ax.spines.values():
+        spine.set_color('#ddd')
+        spine.set_linewidth(0.8)
+
+
+def build_figure(snapshot):
+    """
+    Rebuild a snapshot on a new, unshared Agg figure.
+
+    Returns:
+        Figure: A figure styled like PlotWidget's plots
+    """
+    figure = Figure(figsize=snapshot["size_inches"], dpi=100)
+    FigureCanvasAgg(figure)
+    draw_snapshot(figure, snapshot)
+    return figure
+
+
+def draw_snapshot(figure, snapshot):
+    """
+    Draw a snapshot onto an empty figure (also used to show a plot from the session history).
+
+    Returns:
+        Axes: The main plot axes
+    """
+    figure.patch.set_facecolor('white')
+    ax = figure.add_axes(snapshot["position"])
+    ax.set_facecolor('white')
+
+    if snapshot["surface"] is not None:
+        surface = snapshot["surface"]
+        draw_surface(ax, surface["x"], surface["y"], surface["z"], surface["view"])
+
+    for fill in snapshot["fills"]:
+        ax.add_collection(PolyCollection(fill["polygons"], facecolors=fill["facecolor"],
+                                         edgecolors=fill["edgecolor"], alpha=fill["alpha"],
+                                         linewidths=fill["linewidth"]))
+
+    _draw_lines(ax, snapshot["lines"])
+
+    ax.set_xlim(snapshot["xlim"])
+    ax.set_ylim(snapshot["ylim"])
+    ax.set_aspect(snapshot["aspect"], adjustable='datalim')
+    ax.set_title(snapshot["title"], fontsize=14, fontweight='bold', pad=15)
+    ax.set_xlabel(snapshot["xlabel"], fontsize=12, labelpad=10)
+    ax.set_ylabel(snapshot["ylabel"], fontsize=12, labelpad=10)
+    # Grid lines would cut through a contour or heatmap view
+    if snapshot["surface"] is None:
+        ax.grid(True, linestyle='--', alpha=0.7)
+    else:
+        ax.grid(False)
+    _style_axes(ax)
+
+    if snapshot["legend"]:
+        ax.legend(loc='best', fontsize=10, frameon=True, framealpha=0.95,
+                  facecolor='white', edgecolor='#ddd', borderpad=1, labelspacing=1.2)
+
+    for inset in snapshot["insets"]:
+        inset_ax = figure.add_axes(inset["position"])
+        inset_ax.set_facecolor('white')
+        _draw_lines(inset_ax, inset["lines"])
+        inset_ax.set_xscale(inset["xscale"])
+        inset_ax.set_yscale(inset["yscale"])
+        inset_ax.set_xlim(inset["xlim"])
+        inset_ax.set_ylim(inset["ylim"])
+        inset_ax.set_title(inset["title"], fontsize=11)
+        inset_ax.set_xlabel(inset["xlabel"], fontsize=10)
+        inset_ax.set_ylabel(inset["ylabel"], fontsize=10)
+        inset_ax.grid(True, linestyle='--', alpha=0.7)
+        _style_axes(inset_ax)
+        if inset["legend"]:
+            inset_ax.legend(loc='best', fontsize=9, frameon=True, framealpha=0.95,
+                            facecolor='white', edgecolor='#ddd')
+
+    return ax
+
+
+# -----------------------------------------------
+# Renderers
+# -----------------------------------------------
+
+def _mark_opened(opened):
+    # Lets a cancelled job tell its own partial file from one that was there before
+    if opened is not None:
+        opened.set()
+
+
+def _png_chunk(tag, data):
+    chunk = tag + data
+    return struct.pack(">I", len(data)) + chunk + struct.pack(">I", zlib.crc32(chunk) & 0xFFFFFFFF)
+
+
+def export_tiled_png(figure, file_name, dpi, strip_height=512, progress=None, cancel_event=None, opened=None):
+    """
+    Write a very-high-DPI PNG by rendering the figure in horizontal strips.
+
+    Each strip is rendered with savefig(bbox_inches=...) so Agg only allocates
+    that strip, and its rows are streamed through zlib into the PNG file.
+    Peak memory is one strip instead of the whole raster.
+
+    Args:
+        figure (Figure): The figure to render
+        file_name (str): Output path
+        dpi (int): Output resolution
+        strip_height (int): Rows rendered per pass
+        progress (callable): Called with a 0-100 integer after each strip
+        cancel_event (threading.Event): Optional flag checked between strips
+        opened (threading.Event): Optional flag set just before the file is created or truncated
+    """
+    width_in, height_in = figure.get_size_inches()
+    width = int(round(width_in * dpi))
+    height = int(round(height_in * dpi))
+
+    compressor = zlib.compressobj(6)
+    check_cancelled(cancel_event)
+    _mark_opened(opened)
+    with open(file_name, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        # 8-bit RGBA, no interlace
+        f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)))
+
+        for top in range(0, height, strip_height):
+            if cancel_event is not None and cancel_event.is_set():
+                raise ExportCancelled()
+
+            bottom = min(top + strip_height, height)
+            # Bbox is in inches from the bottom-left corner of the figure
+            bbox = Bbox([[0, (height - bottom) / dpi], [width / dpi, (height - top) / dpi]])
+            buffer = io.BytesIO()
+            figure.savefig(buffer, format="raw", dpi=dpi, bbox_inches=bbox, pad_inches=0)
+
+            rows = bottom - top
+            strip = np.frombuffer(buffer.getvalue(), dtype=np.uint8)
+            strip_width = strip.size // 4 // max(rows, 1)
+            strip = strip[:rows * strip_width * 4].reshape(-1, strip_width, 4)
+
+            # Rounding can make a strip a pixel off; crop or pad to the exact size
+            out = np.full((rows, width, 4), 255, dtype=np.uint8)
+            h = min(rows, strip.shape[0])
+            w = min(width, strip.shape[1])
+            out[:h, :w] = strip[:h, :w]
+
+            # Filter type 0 (None) byte in front of every row
+            filtered = np.concatenate([np.zeros((rows, 1), dtype=np.uint8), out.reshape(rows, -1)], axis=1)
+            data = compressor.compress(filtered.tobytes())
+            if data:
+                f.write(_png_chunk(b"IDAT", data))
+
+            if progress is not None:
+                progress(int(100 * bottom / height))
+
+        f.write(_png_chunk(b"IDAT", compressor.flush()))
+        f.write(_png_chunk(b"IEND", b""))
+
+
+def export_snapshot(snapshot, file_name, fmt, dpi=300, progress=None, cancel_event=None, opened=None):
+    """
+    Render a snapshot to a file.
+
+    Args:
+        snapshot (dict): The result of snapshot_figure()
+        file_name (str): Output path
+        fmt (str): "png", "jpg", "svg", "pdf" or "tiled-png"
+        dpi (int): Raster resolution (ignored by vector formats except for embedded images)
+        progress (callable): Called with a 0-100 integer as the export advances
+        cancel_event (threading.Event): Optional flag checked between steps
+        opened (threading.Event): Optional flag set just before the file is created or truncated
+    """
+    report = progress or (lambda value: None)
+    report(0)
+
+    figure = build_figure(snapshot)
+    report(10)
+    if cancel_event is not None and cancel_event.is_set():
+        raise ExportCancelled()
+
+    if fmt == "tiled-png":
+        export_tiled_png(figure, file_name, dpi,
+                         progress=lambda value: report(10 + value * 90 // 100),
+                         cancel_event=cancel_event, opened=opened)
+    elif fmt in VECTOR_FORMATS:
+        _mark_opened(opened)
+        figure.savefig(file_name, format=fmt, bbox_inches='tight')
+    elif fmt in RASTER_FORMATS:
+        _mark_opened(opened)
+        figure.savefig(file_name, format=fmt, dpi=dpi, bbox_inches='tight')
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    report(100)
+
+
+def format_from_file_name(file_name, default="png"):
+    extension = file_name.rsplit(".", 1)[-1].lower() if "." in file_name else ""
+    if extension in VECTOR_FORMATS or extension in RASTER_FORMATS or extension in DATA_FORMATS:
+        return extension
+    return default
+
+
+# -----------------------------------------------
+# Data Export
+# -----------------------------------------------
+
+DATA_FORMATS = ("csv", "npy", "npz", "parquet")
+
+# Rows written per chunk by the streaming writers
+CHUNK_ROWS = 1 << 16
+
+
+class ArrayTable:
+    """
+    Named columns that are already in memory, served in row blocks.
+
+    Has the same blocks() interface as compute.GridTable, which evaluates
+    its blocks on the fly, so every writer below streams either one.
+    """
+
+    def __init__(self, columns):
+        self.names = [name for name, _ in columns]
+        self.arrays = [values for _, values in columns]
+        self.num_rows = len(self.arrays[0])
+
+    def blocks(self, chunk_rows=CHUNK_ROWS, cancel_event=None):
+        for start in range(0, self.num_rows, chunk_rows):
+            check_cancelled(cancel_event)
+            stop = min(start + chunk_rows, self.num_rows)
+            yield start, stop, [values[start:stop] for values in self.arrays]
+
+
+def curve_columns(x_vals, y_vals_list, int_vals):
+    """
+    Name the sampled arrays of a plot as table columns.
+
+    The arrays are used as-is (no copies, no re-evaluation).
+
+    Returns:
+        ArrayTable: Columns x, f, f1 ... fn, integral
+    """
+    columns = [("x", x_vals), ("f", y_vals_list[0])]
+    for i in range(1, len(y_vals_list)):
+        columns.append((f"f{i}", y_vals_list[i]))
+    if int_vals is not None:
+        columns.append(("integral", int_vals))
+    return ArrayTable(columns)
+
+
+def _report(progress, stop, num_rows):
+    if progress is not None:
+        progress(int(100 * stop / max(num_rows, 1)))
+
+
+def export_csv(table, file_name, progress=None, cancel_event=None, opened=None):
+    check_cancelled(cancel_event)
+    _mark_opened(opened)
+    with open(file_name, "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(table.names) + "\n")
+        for start, stop, values in table.blocks(CHUNK_ROWS, cancel_event):
+            np.savetxt(f, np.column_stack(values), delimiter=",", fmt="%.17g")
+            _report(progress, stop, table.num_rows)
+
+
+def export_npy(table, file_name, progress=None, cancel_event=None, opened=None):
+    """Write one (rows, columns) float64 array, filled block by block through a memory map."""
+    check_cancelled(cancel_event)
+    _mark_opened(opened)
+    out = np.lib.format.open_memmap(file_name, mode="w+", dtype=np.float64,
+                                    shape=(table.num_rows, len(table.names)))
+    try:
+        for start, stop, values in table.blocks(CHUNK_ROWS, cancel_event):
+            for j, block in enumerate(values):
+                out[start:stop, j] = block
+            _report(progress, stop, table.num_rows)
+        out.flush()
+    finally:
+        del out
+
+
+def export_npz(table, file_name, progress=None, cancel_event=None, opened=None):
+    """
+    Write one named array per column.
+
+    Streamed tables are first evaluated into temporary memory-mapped columns,
+    which np.savez then copies into the archive in buffered pieces.
+    """
+    if isinstance(table, ArrayTable):
+        check_cancelled(cancel_event)
+        _mark_opened(opened)
+        np.savez(file_name, **dict(zip(table.names, table.arrays)))
+        _report(progress, 1, 1)
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        columns = table.evaluate(out_dir=temp_dir, cancel_event=cancel_event,
+                                 progress=lambda value: progress(value * 9 // 10) if progress else None)
+        check_cancelled(cancel_event)
+        _mark_opened(opened)
+        np.savez(file_name, **columns)
+        del columns
+    _report(progress, 1, 1)
+
+
+def export_parquet(table, file_name, progress=None, cancel_event=None, opened=None):
+    """Write a Parquet file with one row group per block. Needs the optional pyarrow package."""
+    if pq is None:
+        raise RuntimeError("Parquet export needs the pyarrow package (pip install pyarrow).")
+    schema = pa.schema([(name, pa.float64()) for name in table.names])
+    check_cancelled(cancel_event)
+    _mark_opened(opened)
+    with pq.ParquetWriter(file_name, schema) as writer:
+        for start, stop, values in table.blocks(CHUNK_ROWS, cancel_event):
+            writer.write_table(pa.table(dict(zip(table.names, values)), schema=schema))
+            _report(progress, stop, table.num_rows)
+
+
+def export_data(table, file_name, fmt, progress=None, cancel_event=None, opened=None):
+    """
+    Write sampled curves to a data file without holding more than one block at a time.
+
+    Args:
+        table: An ArrayTable (see curve_columns) or a compute.GridTable
+        file_name (str): Output path
+        fmt (str): "csv", "npy", "npz" or "parquet"
+        progress (callable): Called with a 0-100 integer as blocks are written
+        cancel_event (threading.Event): Optional flag checked between blocks
+        opened (threading.Event): Optional flag set just before the file is created or truncated
+    """
+    writers = {"csv": export_csv, "npy": export_npy, "npz": export_npz, "parquet": export_parquet}
+    if fmt not in writers:
+        raise ValueError(f"Unsupported data format: {fmt}")
+    writers[fmt](table, file_name, progress=progress, cancel_event=cancel_event, opened=opened)
+
+
+# -----------------------------------------------
+# Background Export Jobs
+# -----------------------------------------------
+
+class ExportSignals(QObject):
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal(str)
+
+
+class ExportJob(QRunnable):
+    """
+    Write a figure snapshot or sampled data columns to disk on a worker thread.
+
+    Pass a snapshot_figure() dict for image formats, and an ArrayTable
+    (curve_columns) or compute.GridTable for data formats.
+    """
+
+    def __init__(self, payload, file_name, fmt, dpi=300):
+        super().__init__()
+        self.payload = payload
+        self.file_name = file_name
+        self.fmt = fmt
+        self.dpi = dpi
+        self.cancel_event = threading.Event()
+        # Set by the writer once it creates or truncates file_name
+        self.output_opened = threading.Event()
+        self.signals = ExportSignals()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def remove_partial_output(self):
+        # A cancelled export must not leave a truncated file behind, nor delete one it never touched
+        if not self.output_opened.is_set():
+            return
+        try:
+            os.remove(self.file_name)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Could not remove partial export %s: %s", self.file_name, e)
+
+    def run(self):
+        try:
+            if self.fmt in DATA_FORMATS:
+                export_data(self.payload, self.file_name, self.fmt,
+                            progress=self.signals.progress.emit,
+                            cancel_event=self.cancel_event, opened=self.output_opened)
+            else:
+                export_snapshot(self.payload, self.file_name, self.fmt, self.dpi,
+                                progress=self.signals.progress.emit,
+                                cancel_event=self.cancel_event, opened=self.output_opened)
+        except JobCancelled:
+            logger.info("Export cancelled: %s", self.file_name)
+            self.remove_partial_output()
+            self.signals.cancelled.emit(self.file_name)
+            return
+        except Exception as e:
+            logger.exception("Export failed: %s", self.file_name)
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(self.file_name)
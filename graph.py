@@ -2,7 +2,18 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-import matplotlib.animation as animation
+from matplotlib.collections import PolyCollection
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtCore import Qt
+from profiling import Profiler
+from export import draw_snapshot, snapshot_figure
+from surface import downsample, draw_surface
+from quadrature import OUTLINE_PANELS
+from reveal import MAX_ANIMATED_POINTS, RevealAnimation
+
+# Line colors of the functions overlaid on the primary one
+OVERLAY_COLORS = ['#00B894', '#E17055', '#0984E3', '#D63031', '#636E72', '#A29BFE']
+
 
 class PlotWidget(FigureCanvas):
     def __init__(self, parent=None):
@@ -20,10 +31,66 @@ class PlotWidget(FigureCanvas):
         self.x_data = None
         self.y_data = None
 
-    def plot_function(self, x_vals, y_vals_list, dy_vals_list, int_vals, title="Function Visualization"):
-        # Clear the figure before plotting
+        # Root/extremum/inflection marker artists on the current axes
+        self.markers = []
+
+        # Overlaid functions: label -> (PlotData, artists) on the current axes
+        self.overlaid = {}
+
+        # Displayed (downsampled) mesh of a two-variable plot: dict(x, y, z, view)
+        self.surface = None
+
+        # Left-to-right reveal of the last plot (kept here so it is not garbage
+        # collected mid-run); off, or too many points, means plots appear at once
+        self.animation = None
+        self.animations_enabled = True
+
+        # Draw/hover timings and points drawn, plus the optional overlay showing them
+        self.profiler = Profiler("plot_widget")
+        self.overlay = QLabel(self)
+        self.overlay.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.overlay.setStyleSheet("""
+            background-color: rgba(255, 255, 255, 0.85);
+            color: #55557D;
+            border: 1px solid #ddd;
+            border-radius: 6px;
+            padding: 6px;
+            font-family: 'Consolas', 'Courier New', monospace;
+            font-size: 11px;
+        """)
+        self.overlay.move(10, 10)
+        self.overlay.hide()
+
+    def set_overlay_visible(self, visible):
+        self.overlay.setVisible(visible)
+        if visible:
+            self.overlay.raise_()
+
+    def set_overlay_text(self, text):
+        self.overlay.setText(text)
+        self.overlay.adjustSize()
+
+    def clear_axes(self):
+        """Start a new plot: one fresh axes, and nothing left over from the previous plot."""
+        # A reveal still running belongs to the old axes
+        if self.animation is not None:
+            self.animation.cancel()
+            self.animation = None
         self.figure.clear()
         self.ax = self.figure.add_subplot(111)
+        self.markers = []
+        self.overlaid = {}
+        self.surface = None
+        self.annotation = None
+
+    def plot_function(self, x_vals, y_vals_list, dy_vals_list, int_vals, title="Function Visualization"):
+        with self.profiler.stage('draw'):
+            self._plot_function(x_vals, y_vals_list, dy_vals_list, int_vals, title)
+        self.profiler.count('points_drawn', len(x_vals) * (len(y_vals_list) + (int_vals is not None)))
+
+    def _plot_function(self, x_vals, y_vals_list, dy_vals_list, int_vals, title):
+        # Clear the figure before plotting
+        self.clear_axes()
         
         # Set modern style for the plot
         plt.style.use('seaborn-v0_8-whitegrid')
@@ -95,12 +162,223 @@ class PlotWidget(FigureCanvas):
         # Drawing the plot
         self.draw()
 
+    def plot_curve(self, curve, label, title="Curve Visualization"):
+        """
+        Draw a parametric, polar or implicit curve with equal axis scales.
+
+        Args:
+            curve (curves.CurveData): The sampled curve
+            label (str): Legend text
+        """
+        with self.profiler.stage('draw'):
+            self.clear_axes()
+            self.figure.patch.set_facecolor('white')
+            self.ax.set_facecolor('white')
+
+            self.ax.plot(curve.x_vals, curve.y_vals, label=label, color='#8E87F4', linewidth=2.5)
+            self.x_data = curve.x_vals
+            self.y_data = curve.y_vals
+
+            self.ax.axhline(0, color='#ddd', linewidth=0.8, zorder=0)
+            self.ax.axvline(0, color='#ddd', linewidth=0.8, zorder=0)
+            self.ax.set_aspect('equal', adjustable='datalim')
+            self.ax.set_title(title, fontsize=14, fontweight='bold', pad=15)
+            self.ax.set_xlabel("x", fontsize=12, fontweight='medium', labelpad=10)
+            self.ax.set_ylabel("y", fontsize=12, fontweight='medium', labelpad=10)
+            self.ax.grid(True, linestyle='--', alpha=0.7)
+            for spine in self.ax.spines.values():
+                spine.set_color('#ddd')
+                spine.set_linewidth(0.8)
+            self.ax.legend(loc='upper right', fontsize=10, frameon=True, framealpha=0.95,
+                           facecolor='white', edgecolor='#ddd', borderpad=1, labelspacing=1.2)
+            self.figure.tight_layout(pad=3.0)
+            self.draw()
+        self.profiler.count('points_drawn', len(curve.x_vals))
+
+    def plot_series(self, series, label, title="Taylor Series"):
+        """
+        Draw f, its Taylor polynomials about the center and the error |f - T_n|.
+
+        The y range follows f, not the polynomials, which grow without bound
+        away from the center; the error curve leaves the view where the
+        approximation stops being useful.
+
+        Args:
+            series (series.SeriesData): f and the polynomials on the grid
+            label (str): Legend text of f
+        """
+        with self.profiler.stage('draw'):
+            self.clear_axes()
+            self.figure.patch.set_facecolor('white')
+            self.ax.set_facecolor('white')
+
+            x_vals = series.x_vals
+            self.ax.plot(x_vals, series.f_vals, label=label, color='#8E87F4', linewidth=2.5)
+            self.x_data = x_vals
+            self.y_data = series.f_vals
+
+            # Lower orders fade out, the requested order is drawn solid
+            orders = sorted(series.polynomials)
+            for rank, order in enumerate(orders):
+                newest = order == series.order
+                self.ax.plot(x_vals, series.polynomials[order], label=f'T{order}(x)',
+                             color='#00B894' if newest else '#636E72',
+                             linewidth=2 if newest else 1.2, linestyle='-' if newest else '--',
+                             alpha=1.0 if newest else 0.35 + 0.5 * rank / len(orders))
+            self.ax.plot(x_vals, series.error, label=f'|f - T{series.order}|', color='#D63031',
+                         linewidth=1.5, linestyle=':')
+            # The expansion point (a, f(a)), where every polynomial touches f
+            self.ax.plot([series.center], [series.coefficients[0]], linestyle='none', marker='o', markersize=7, color='#55557D',
+                         markeredgecolor='white', label='_nolegend_', zorder=5)
+
+            finite = series.f_vals[np.isfinite(series.f_vals)]
+            if finite.size:
+                low, high = finite.min(), finite.max()
+                pad = 0.15 * (high - low) or 1.0
+                self.ax.set_ylim(min(low, 0) - pad, high + pad)
+
+            self.ax.axhline(0, color='#ddd', linewidth=0.8, zorder=0)
+            self.ax.axvline(0, color='#ddd', linewidth=0.8, zorder=0)
+            self.ax.set_title(title, fontsize=14, fontweight='bold', pad=15)
+            self.ax.set_xlabel("x", fontsize=12, fontweight='medium', labelpad=10)
+            self.ax.set_ylabel("y", fontsize=12, fontweight='medium', labelpad=10)
+            self.ax.grid(True, linestyle='--', alpha=0.7)
+            for spine in self.ax.spines.values():
+                spine.set_color('#ddd')
+                spine.set_linewidth(0.8)
+            self.ax.legend(loc='upper right', fontsize=10, frameon=True, framealpha=0.95,
+                           facecolor='white', edgecolor='#ddd', borderpad=1, labelspacing=1.2)
+            self.figure.tight_layout(pad=3.0)
+            self.draw()
+        self.profiler.count('points_drawn', len(x_vals) * (len(series.polynomials) + 2))
+
+    def plot_quadrature(self, quadrature, x_vals, f_vals, label, title="Quadrature"):
+        """
+        Draw the panels of a Riemann sum or quadrature rule under f, and below
+        it the rule's error against the number of subintervals.
+
+        All panels are one PolyCollection, so tens of thousands of them cost a
+        single artist.
+
+        Args:
+            quadrature (quadrature.QuadratureData): The rule applied to f
+            x_vals, f_vals (np.ndarray): f sampled on the plot grid
+            label (str): Legend text of f
+        """
+        with self.profiler.stage('draw'):
+            self.clear_axes()
+            self.figure.delaxes(self.ax)
+            grid = self.figure.add_gridspec(2, 1, height_ratios=(3, 1), hspace=0.45)
+            self.ax = self.figure.add_subplot(grid[0])
+            convergence_ax = self.figure.add_subplot(grid[1])
+            self.figure.patch.set_facecolor('white')
+            self.ax.set_facecolor('white')
+
+            outline = len(quadrature.panels) <= OUTLINE_PANELS
+            panels = PolyCollection(quadrature.panels, facecolors='#8E87F4', alpha=0.3,
+                                    edgecolors='#6C5CE7' if outline else 'none', linewidths=0.6 if outline else 0)
+            self.ax.add_collection(panels)
+            self.ax.plot(x_vals, f_vals, label=label, color='#8E87F4', linewidth=2.5)
+            self.x_data = x_vals
+            self.y_data = f_vals
+
+            self.ax.axhline(0, color='#ddd', linewidth=0.8, zorder=0)
+            self.ax.axvline(0, color='#ddd', linewidth=0.8, zorder=0)
+            self.ax.set_title(title, fontsize=14, fontweight='bold', pad=15)
+            self.ax.set_xlabel("x", fontsize=12, fontweight='medium', labelpad=10)
+            self.ax.set_ylabel("y", fontsize=12, fontweight='medium', labelpad=10)
+            self.ax.grid(True, linestyle='--', alpha=0.7)
+            self.ax.legend(loc='upper right', fontsize=10, frameon=True, framealpha=0.95,
+                           facecolor='white', edgecolor='#ddd', borderpad=1, labelspacing=1.2)
+
+            # Error of the rule as n grows, and where the drawn n sits on it
+            with np.errstate(invalid='ignore'):
+                errors = np.abs(quadrature.sums - quadrature.reference)
+            convergence_ax.set_facecolor('white')
+            convergence_ax.loglog(quadrature.sizes, np.where(errors > 0, errors, np.nan),
+                                  color='#E17055', linewidth=1.5, marker='.', label='|sum - integral|')
+            if quadrature.error > 0:
+                convergence_ax.loglog([quadrature.n], [quadrature.error], linestyle='none', marker='o',
+                                      markersize=7, color='#55557D', markeredgecolor='white', label=f'n = {quadrature.n}')
+            convergence_ax.set_xlabel("subintervals n", fontsize=10)
+            convergence_ax.set_ylabel("error", fontsize=10)
+            convergence_ax.grid(True, linestyle='--', alpha=0.7)
+            convergence_ax.legend(loc='best', fontsize=9, frameon=True, framealpha=0.95,
+                                  facecolor='white', edgecolor='#ddd')
+            for axes in (self.ax, convergence_ax):
+                for spine in axes.spines.values():
+                    spine.set_color('#ddd')
+                    spine.set_linewidth(0.8)
+            self.draw()
+        self.profiler.count('points_drawn', len(x_vals) + quadrature.panels.shape[0] * quadrature.panels.shape[1])
+
+    def plot_surface(self, surface, view, title="Surface Visualization"):
+        """
+        Draw f(x, y) as filled contours or a heatmap.
+
+        Meshes larger than surface.DISPLAY_GRID per axis are strided down for
+        drawing; the full mesh stays in the SurfaceData for integrals and export.
+
+        Args:
+            surface (surface.SurfaceData): The sampled surface
+            view (str): "contour" or "heatmap"
+        """
+        with self.profiler.stage('draw'):
+            self.clear_axes()
+            self.figure.patch.set_facecolor('white')
+            self.ax.set_facecolor('white')
+
+            x_vals, y_vals, z_vals = downsample(surface.x_vals, surface.y_vals, surface.z_vals)
+            self.surface = {"x": x_vals, "y": y_vals, "z": z_vals, "view": view}
+            draw_surface(self.ax, x_vals, y_vals, z_vals, view)
+            # Hover reads the mesh instead of a curve
+            self.x_data = None
+            self.y_data = None
+
+            self.ax.set_aspect('equal', adjustable='box')
+            self.ax.grid(False)
+            self.ax.set_title(title, fontsize=14, fontweight='bold', pad=15)
+            self.ax.set_xlabel("x", fontsize=12, fontweight='medium', labelpad=10)
+            self.ax.set_ylabel("y", fontsize=12, fontweight='medium', labelpad=10)
+            for spine in self.ax.spines.values():
+                spine.set_color('#ddd')
+                spine.set_linewidth(0.8)
+            self.figure.tight_layout(pad=3.0)
+            self.draw()
+        self.profiler.count('points_drawn', z_vals.size)
+
+    def _hover_surface(self, event):
+        x_vals, y_vals, z_vals = self.surface["x"], self.surface["y"], self.surface["z"]
+        col = int(np.clip(np.searchsorted(x_vals, event.xdata), 0, len(x_vals) - 1))
+        row = int(np.clip(np.searchsorted(y_vals, event.ydata), 0, len(y_vals) - 1))
+        text = f"x: {event.xdata:.2f}\ny: {event.ydata:.2f}\nf: {z_vals[row, col]:.4g}"
+        if self.annotation is None:
+            self.annotation = self.ax.annotate(
+                text, xy=(event.xdata, event.ydata), xytext=(20, 20), textcoords="offset points",
+                bbox=dict(boxstyle="round,pad=0.5", fc="white", alpha=0.8, ec="#ddd"))
+        else:
+            self.annotation.xy = (event.xdata, event.ydata)
+            self.annotation.set_text(text)
+            self.annotation.set_visible(True)
+        self.draw_idle()
+
     def on_hover(self, event):
+        with self.profiler.stage('hover'):
+            self._on_hover(event)
+
+    def _on_hover(self, event):
+        if self.surface is not None:
+            if event.inaxes == self.ax:
+                self._hover_surface(event)
+            return
+
         # Only show data cursor if we're inside the axes
         if event.inaxes == self.ax and self.x_data is not None and self.y_data is not None:
             # Find the closest point
             x, y = event.xdata, event.ydata
             distances = np.sqrt((self.x_data - x)**2 + (self.y_data - y)**2)
+            # Undefined points (and the breaks between implicit-curve segments) are NaN
+            distances[~np.isfinite(distances)] = np.inf
             index = np.argmin(distances)
             
             # Only show if we're close enough to a point
@@ -139,30 +417,29 @@ class PlotWidget(FigureCanvas):
     def animate_plot(self, x_vals, y_vals_list, dy_vals_list, int_vals):
         """Create an animated transition when plotting."""
         # Clear the figure
-        self.figure.clear()
-        self.ax = self.figure.add_subplot(111)
+        self.clear_axes()
         
         # Set up the plot with styling
         plt.style.use('seaborn-v0_8-whitegrid')
         self.figure.patch.set_facecolor('white')
         self.ax.set_facecolor('white')
         
-        # Set up empty lines
+        # Lines hold their full data; the reveal shows growing views of it
         lines = []
-        line_original, = self.ax.plot([], [], label='Original Function', 
+        line_original, = self.ax.plot(x_vals, y_vals_list[0], label='Original Function', 
                                     color='#8E87F4', linewidth=2.5)
         lines.append(line_original)
         
         colors = ['#FD8FD4', '#FF9E6D', '#74C7EC']
         for i in range(1, len(y_vals_list)):
-            line_deriv, = self.ax.plot([], [], 
+            line_deriv, = self.ax.plot(x_vals, y_vals_list[i], 
                                     label=f'{i}th Derivative', 
                                     color=colors[(i-1) % len(colors)],
                                     linewidth=2, linestyle='--')
             lines.append(line_deriv)
         
         if int_vals is not None:
-            line_integral, = self.ax.plot([], [], label='Integral', 
+            line_integral, = self.ax.plot(x_vals, int_vals, label='Integral', 
                                         color='#6C5CE7', linewidth=2, linestyle=':')
             lines.append(line_integral)
         
@@ -174,16 +451,18 @@ class PlotWidget(FigureCanvas):
         self.ax.set_ylabel("y", fontsize=12, fontweight='medium', labelpad=10)
         self.ax.grid(True, linestyle='--', alpha=0.7)
         
-        # Set axis limits
+        # Set axis limits from the finite values (points outside the domain are NaN);
+        # Matplotlib autoscales when there are none or they are all equal
         all_y_values = np.concatenate(y_vals_list)
         if int_vals is not None:
             all_y_values = np.concatenate([all_y_values, int_vals])
-        
-        y_min, y_max = np.min(all_y_values), np.max(all_y_values)
-        y_range = y_max - y_min
-        
+        all_y_values = all_y_values[np.isfinite(all_y_values)]
+
         self.ax.set_xlim(np.min(x_vals), np.max(x_vals))
-        self.ax.set_ylim(y_min - 0.1 * y_range, y_max + 0.1 * y_range)
+        if all_y_values.size and np.ptp(all_y_values) > 0:
+            y_min, y_max = np.min(all_y_values), np.max(all_y_values)
+            y_range = y_max - y_min
+            self.ax.set_ylim(y_min - 0.1 * y_range, y_max + 0.1 * y_range)
 
         # Add shaded area under the integral curve (if integral data exists)
         if int_vals is not None:
@@ -201,40 +480,135 @@ class PlotWidget(FigureCanvas):
             labelspacing=1.2
         )
         
-        # Animation function
-        def init():
-            for line in lines:
-                line.set_data([], [])
-            return lines
-        
-        def animate(frame):
-            # Calculate the number of points to show in this frame
-            n_points = int((frame + 1) * len(x_vals) / 20)
-            
-            # Update each line with the data up to n_points
-            lines[0].set_data(x_vals[:n_points], y_vals_list[0][:n_points])
-            
-            for i in range(1, len(y_vals_list)):
-                lines[i].set_data(x_vals[:n_points], y_vals_list[i][:n_points])
-            
-            if int_vals is not None:
-                lines[-1].set_data(x_vals[:n_points], int_vals[:n_points])
-            
-            return lines
-        
-        # Create animation
-        ani = animation.FuncAnimation(
-            self.figure, animate, frames=20, 
-            init_func=init, blit=True, interval=50,
-            repeat=False  # Animation stops after one full playthrough
-        )
-        
         # Store data for hover functionality
         self.x_data = x_vals
         self.y_data = y_vals_list[0]
-        
-        self.draw()
-        return ani
+
+        with self.profiler.stage('draw'):
+            if self.animations_enabled and len(x_vals) * len(lines) <= MAX_ANIMATED_POINTS:
+                self.animation = RevealAnimation(self, self.ax, lines, self.profiler)
+                self.animation.start()
+            else:
+                self.draw()
+        self.profiler.count('points_drawn', len(x_vals) * len(lines))
+
+    def mark_points(self, critical):
+        """
+        Mark roots, extrema and inflection points on the original function.
+
+        Each kind is one Line2D with all its points, so thousands of roots on an
+        oscillatory function cost a single artist. Passing None removes the markers.
+
+        Args:
+            critical (analysis.CriticalPoints): The points to mark
+        """
+        for artist in self.markers:
+            artist.remove()
+        self.markers = []
+
+        if critical is not None:
+            # Kept out of the legend; the Details panel lists the points
+            kinds = [
+                (critical.roots, 'o', '#55557D'),
+                (critical.maxima, '^', '#E17055'),
+                (critical.minima, 'v', '#00B894'),
+                (critical.inflections, 'D', '#FDCB6E'),
+            ]
+            for points, marker, color in kinds:
+                if len(points):
+                    artist, = self.ax.plot(points[:, 0], points[:, 1], linestyle='none', marker=marker,
+                                           markersize=6, color=color, markeredgecolor='white',
+                                           label='_nolegend_', zorder=5)
+                    self.markers.append(artist)
+        self.draw_idle()
+
+    def set_overlaid(self, curves):
+        """
+        Overlay further functions on the current axes without redrawing the plot.
+
+        Only functions that are new or whose data changed get new artists; the
+        ones that are gone are removed, and the rest are left untouched.
+
+        Args:
+            curves (list): (label, PlotData) pairs, in display order
+        """
+        wanted = dict(curves)
+        changed = False
+        for label in list(self.overlaid):
+            data, artists = self.overlaid[label]
+            if wanted.get(label) is not data:
+                for artist in artists:
+                    artist.remove()
+                del self.overlaid[label]
+                changed = True
+
+        for index, (label, data) in enumerate(curves):
+            if label in self.overlaid:
+                continue
+            color = OVERLAY_COLORS[index % len(OVERLAY_COLORS)]
+            artists = self.ax.plot(data.x_vals, data.y_vals_list[0], label=label, color=color, linewidth=2)
+            for i in range(1, len(data.y_vals_list)):
+                artists += self.ax.plot(data.x_vals, data.y_vals_list[i], label=f'{label}, {i}th Derivative',
+                                        color=color, linewidth=1.5, linestyle='--', alpha=0.8)
+            if data.int_vals is not None:
+                artists += self.ax.plot(data.x_vals, data.int_vals, label=f'{label}, Integral',
+                                        color=color, linewidth=1.5, linestyle=':', alpha=0.8)
+            self.overlaid[label] = (data, artists)
+            self.profiler.count('points_drawn', len(data.x_vals) * len(artists))
+            changed = True
+
+            # Widen (never shrink) the y range so the new curves are visible
+            values = np.concatenate([line.get_ydata() for line in artists])
+            values = values[np.isfinite(values)]
+            if values.size:
+                y_min, y_max = self.ax.get_ylim()
+                self.ax.set_ylim(min(y_min, values.min()), max(y_max, values.max()))
+
+        if changed:
+            self.ax.legend(loc='best', fontsize=10, frameon=True, framealpha=0.95, facecolor='white',
+                           edgecolor='#ddd', borderpad=1, labelspacing=1.2)
+            self.draw_idle()
+
+    def snapshot(self, finish_animation=True):
+        """
+        Copy the plotted data for a background export (see export.ExportJob).
+
+        Args:
+            finish_animation (bool): Jump a running reveal to its end first; if
+                False it keeps running and the snapshot still holds the full curves
+        """
+        # Export the whole curves, not the part revealed so far
+        running = self.animation is not None and self.animation.running
+        if running and finish_animation:
+            self.animation.finish()
+            running = False
+        snapshot = snapshot_figure(self.figure, self.ax, self.surface)
+        if running:
+            full = {line: data for line, data in zip(self.animation.lines, self.animation.data)}
+            for line, entry in zip(self.ax.get_lines(), snapshot["lines"]):
+                if line in full:
+                    x_vals, y_vals = full[line]
+                    entry["x"] = np.array(x_vals, dtype=np.float64)
+                    entry["y"] = np.array(y_vals, dtype=np.float64)
+        return snapshot
+
+    def show_snapshot(self, snapshot):
+        """Redraw a plot from a snapshot (a session history entry) without any sampling."""
+        with self.profiler.stage('draw'):
+            self.clear_axes()
+            self.figure.clear()
+            self.ax = draw_snapshot(self.figure, snapshot)
+            self.surface = snapshot["surface"]
+            # Hover follows the first curve, as it does for a fresh plot
+            self.x_data = None
+            self.y_data = None
+            for line in snapshot["lines"]:
+                if line["transform_is_data"] and len(line["x"]) > 2:
+                    self.x_data = line["x"]
+                    self.y_data = line["y"]
+                    break
+            self.draw()
+        self.profiler.count('points_drawn', sum(len(line["x"]) for line in snapshot["lines"]))
 
     def save_plot(self, file_name):
         # Save the current figure as an image with higher quality
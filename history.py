@@ -0,0 +1,260 @@
+import json
+import time
+import numpy as np
+
+# -----------------------------------------------
+# Session History
+# -----------------------------------------------
+
+# Bytes of plot data kept in memory; the oldest plots are dropped past this
+HISTORY_MEMORY_LIMIT = 64 * 1024 * 1024
+
+# Entries kept regardless of size
+MAX_ENTRIES = 500
+
+# Version written to saved sessions, checked on load
+SESSION_VERSION = 1
+
+# Arrays whose values match np.linspace(first, last, n) to this relative
+# tolerance are stored as just (first, last, n)
+GRID_TOLERANCE = 1e-12
+
+
+class SessionError(Exception):
+    """A session file is missing, damaged or from an incompatible version."""
+
+
+def _compact_array(values, grids):
+    # float64 samples -> float32, uniform grids -> ("grid", first, last, n);
+    # equal grids share one descriptor, so every curve of a plot stores x once
+    values = np.asarray(values)
+    if values.dtype.kind != 'f' or values.ndim != 1:
+        return values.copy()
+    n = len(values)
+    if n > 2 and np.isfinite(values[0]) and np.isfinite(values[-1]):
+        key = (float(values[0]), float(values[-1]), n)
+        if key in grids:
+            return grids[key]
+        grid = np.linspace(values[0], values[-1], n)
+        scale = max(abs(values[0]), abs(values[-1]), 1.0)
+        if np.allclose(values, grid, rtol=0, atol=GRID_TOLERANCE * scale):
+            grids[key] = {"grid": list(key)}
+            return grids[key]
+    return values.astype(np.float32)
+
+
+def compact_snapshot(snapshot):
+    """
+    Shrink a figure snapshot (see export.snapshot_figure) for the history.
+
+    Sampled values are kept as float32, which is far below what a plot can
+    show, and evenly spaced x arrays are replaced by their end points and
+    length. expand_snapshot restores float64 arrays.
+    """
+    grids = {}
+
+    def compact(value):
+        if isinstance(value, np.ndarray):
+            if value.dtype.kind == 'f' and value.ndim == 1:
+                return _compact_array(value, grids)
+            if value.dtype == np.float64:
+                return value.astype(np.float32)
+            return value.copy()
+        if isinstance(value, dict):
+            return {key: compact(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(compact(item) for item in value)
+        return value
+
+    return compact(snapshot)
+
+
+def expand_snapshot(snapshot):
+    """Undo compact_snapshot: float64 arrays and rebuilt grids, ready for export.draw_snapshot."""
+    def expand(value):
+        if isinstance(value, np.ndarray):
+            return value.astype(np.float64) if value.dtype == np.float32 else value
+        if isinstance(value, dict):
+            if set(value) == {"grid"}:
+                first, last, n = value["grid"]
+                return np.linspace(first, last, int(n))
+            return {key: expand(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(expand(item) for item in value)
+        return value
+
+    return expand(snapshot)
+
+
+def _nbytes(value, seen):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        # Shared grid descriptors are counted once
+        if id(value) in seen:
+            return 0
+        seen.add(id(value))
+        return sum(_nbytes(item, seen) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(item, seen) for item in value)
+    if isinstance(value, str):
+        return len(value)
+    return 8
+
+
+class HistoryEntry:
+    """
+    One plotted job, enough to show it again without computing anything.
+
+    Attributes:
+        inputs (dict): The input fields as typed (mode, function, x_min, x_max, order, precision)
+        snapshot (dict): The compacted figure snapshot
+        details_html (str): The Details panel as it was rendered
+        timestamp (float): When the job was plotted (seconds since the epoch)
+    """
+
+    def __init__(self, inputs, snapshot, details_html, timestamp=None):
+        self.inputs = dict(inputs)
+        self.snapshot = snapshot
+        self.details_html = details_html
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        self.nbytes = _nbytes(snapshot, set()) + len(details_html) + _nbytes(self.inputs, set())
+
+    def describe(self):
+        """One line for the history list, e.g. "14:02:11  function  sin(x)  [-10, 10]  order 2"."""
+        inputs = self.inputs
+        clock = time.strftime("%H:%M:%S", time.localtime(self.timestamp))
+        return (f"{clock}  {inputs.get('mode', '')}  {inputs.get('function', '')}  "
+                f"[{inputs.get('x_min', '')}, {inputs.get('x_max', '')}]  order {inputs.get('order', '') or 0}")
+
+
+class SessionHistory:
+    """
+    Plotted jobs in order, with an undo/redo position and a memory cap.
+
+    Adding a plot after undoing drops the entries that were undone, like an
+    editor's undo stack. When the entries take more than memory_limit bytes,
+    the oldest are dropped (the newest is always kept).
+    """
+
+    def __init__(self, memory_limit=HISTORY_MEMORY_LIMIT, max_entries=MAX_ENTRIES):
+        self.memory_limit = memory_limit
+        self.max_entries = max_entries
+        self.entries = []
+        self.index = -1
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def nbytes(self):
+        return sum(entry.nbytes for entry in self.entries)
+
+    @property
+    def current(self):
+        return self.entries[self.index] if 0 <= self.index < len(self.entries) else None
+
+    def push(self, entry):
+        """
+        Add a plotted job after the current position.
+
+        Returns:
+            bool: False if it repeats the current entry's inputs (nothing added)
+        """
+        if self.current is not None and self.current.inputs == entry.inputs:
+            return False
+        del self.entries[self.index + 1:]
+        self.entries.append(entry)
+        self._evict()
+        self.index = len(self.entries) - 1
+        return True
+
+    def _evict(self):
+        total = self.nbytes
+        while len(self.entries) > 1 and (total > self.memory_limit or len(self.entries) > self.max_entries):
+            total -= self.entries.pop(0).nbytes
+
+    def undo(self):
+        """Step back one plot. Returns: HistoryEntry or None at the start."""
+        if self.index <= 0:
+            return None
+        self.index -= 1
+        return self.entries[self.index]
+
+    def redo(self):
+        """Step forward one plot. Returns: HistoryEntry or None at the end."""
+        if self.index >= len(self.entries) - 1:
+            return None
+        self.index += 1
+        return self.entries[self.index]
+
+    def recall(self, index):
+        """Jump to entry index. Returns: HistoryEntry"""
+        self.index = index
+        return self.entries[index]
+
+    def save(self, file_name):
+        """
+        Write every entry to one compressed .npz file.
+
+        The structure goes into a JSON header and the arrays alongside it, so
+        loading needs no pickle.
+        """
+        arrays = {}
+
+        def encode(value):
+            if isinstance(value, np.ndarray):
+                name = f"a{len(arrays)}"
+                arrays[name] = value
+                return {"__array__": name}
+            if isinstance(value, dict):
+                return {key: encode(item) for key, item in value.items()}
+            if isinstance(value, (list, tuple)):
+                return [encode(item) for item in value]
+            if isinstance(value, np.generic):
+                return value.item()
+            return value
+
+        header = {
+            "version": SESSION_VERSION,
+            "index": self.index,
+            "entries": [{"inputs": entry.inputs, "snapshot": encode(entry.snapshot),
+                         "details_html": entry.details_html, "timestamp": entry.timestamp}
+                        for entry in self.entries],
+        }
+        with open(file_name, "wb") as file:
+            np.savez_compressed(file, header=np.array(json.dumps(header)), **arrays)
+
+    @classmethod
+    def load(cls, file_name, memory_limit=HISTORY_MEMORY_LIMIT):
+        """
+        Read a session written by save().
+
+        Raises:
+            SessionError: If the file cannot be read or is not a session
+        """
+        try:
+            with np.load(file_name, allow_pickle=False) as data:
+                header = json.loads(str(data["header"]))
+                arrays = {name: data[name] for name in data.files if name != "header"}
+        except (OSError, ValueError, KeyError) as e:
+            raise SessionError(f"Cannot read session file: {e}") from e
+        if header.get("version") != SESSION_VERSION:
+            raise SessionError(f"Unsupported session version: {header.get('version')}")
+
+        def decode(value):
+            if isinstance(value, dict):
+                if set(value) == {"__array__"}:
+                    return arrays[value["__array__"]]
+                return {key: decode(item) for key, item in value.items()}
+            if isinstance(value, list):
+                return [decode(item) for item in value]
+            return value
+
+        history = cls(memory_limit)
+        for item in header["entries"]:
+            history.entries.append(HistoryEntry(item["inputs"], decode(item["snapshot"]),
+                                                item["details_html"], item["timestamp"]))
+        history._evict()
+        history.index = min(header.get("index", len(history.entries) - 1), len(history.entries) - 1)
+        return history
@@ -0,0 +1,163 @@
+import os
+from functools import lru_cache
+import numpy as np
+import sympy as sp
+from applog import get_logger
+from compute import compile_family, compile_function
+
+try:
+    import numexpr
+except ImportError:
+    # The numexpr backend is optional
+    numexpr = None
+
+try:
+    import numba
+except ImportError:
+    # The numba backend is optional
+    numba = None
+
+logger = get_logger("kernels")
+
+# -----------------------------------------------
+# Optional JIT Evaluation Backends
+# -----------------------------------------------
+
+# "auto" is the fused NumPy kernel, which evaluates the shared subexpressions
+# of f, f', ... once. numexpr and numba compile each curve separately and are
+# only used when asked for; numba's first compile also takes a noticeable moment.
+BACKENDS = ("auto", "numpy", "numexpr", "numba")
+
+# Compiled kernels kept across functions, so returning to an earlier
+# expression (undo, zoom back, a batch job) skips code generation
+KERNEL_CACHE_SIZE = 256
+
+# Small grid every new kernel is run on once, so backend failures surface
+# at compile time and the expression falls back to NumPy
+_PROBE = np.linspace(-1.0, 1.0, 5)
+
+
+def available_backends():
+    """Returns: list: The backend names usable in this environment."""
+    backends = ["numpy"]
+    if numexpr is not None:
+        backends.append("numexpr")
+    if numba is not None:
+        backends.append("numba")
+    return backends
+
+
+def default_backend():
+    """The backend named by $GRAPHIQUE_KERNEL_BACKEND, or "auto"."""
+    backend = os.environ.get("GRAPHIQUE_KERNEL_BACKEND", "auto").lower()
+    return backend if backend in BACKENDS else "auto"
+
+
+def resolve_backend(backend):
+    """Map "auto" (or an uninstalled backend) to one that is actually available."""
+    if backend not in available_backends():
+        return "numpy"
+    return backend
+
+
+def _compile_numexpr(expr, x):
+    # numexpr evaluates the whole expression in one blocked loop without
+    # full-size temporaries; the printer rejects functions it cannot express
+    func = sp.lambdify(x, expr, modules='numexpr')
+
+    def evaluate(x_vals):
+        x_vals = np.ascontiguousarray(x_vals, dtype=np.float64)
+        with np.errstate(all='ignore'):
+            y_vals = np.asarray(func(x_vals))
+        if np.iscomplexobj(y_vals):
+            y_vals = np.where(np.abs(y_vals.imag) < 1e-12, y_vals.real, np.nan)
+        return np.broadcast_to(y_vals, x_vals.shape).astype(np.float64)
+
+    return evaluate
+
+
+def _compile_numba(expr, x):
+    # A scalar math-module function, jitted, driven by a jitted loop.
+    # error_model='numpy' turns division by zero into inf/NaN instead of raising.
+    scalar = numba.njit(error_model='numpy')(sp.lambdify(x, expr, modules='math'))
+
+    @numba.njit(error_model='numpy')
+    def loop(x_vals, out):
+        for i in range(x_vals.shape[0]):
+            out[i] = scalar(x_vals[i])
+
+    def evaluate(x_vals):
+        x_vals = np.asarray(x_vals, dtype=np.float64)
+        flat = np.ascontiguousarray(x_vals).ravel()
+        out = np.empty_like(flat)
+        loop(flat, out)
+        return out.reshape(x_vals.shape)
+
+    return evaluate
+
+
+@lru_cache(maxsize=KERNEL_CACHE_SIZE)
+def compile_expression(expr, x, backend):
+    """
+    Compile one expression with the given (resolved) backend, cached per expression.
+
+    Falls back to compile_function when the backend cannot handle the
+    expression (an unsupported function, a typing failure in numba, ...).
+
+    Returns:
+        callable: f(x_vals) -> float64 array with the shape of x_vals
+    """
+    if backend == "numexpr":
+        compiler = _compile_numexpr
+    elif backend == "numba":
+        compiler = _compile_numba
+    else:
+        return compile_function(expr, x)
+
+    try:
+        func = compiler(expr, x)
+        func(_PROBE)
+        return func
+    except Exception as e:
+        logger.debug("%s backend cannot compile %s (%s); using NumPy", backend, expr, e)
+        return compile_function(expr, x)
+
+
+class KernelFamily:
+    """
+    One backend kernel per expression, called together like a FusedKernel.
+
+    numexpr and numba already fuse each expression into a single loop, so the
+    family is evaluated curve by curve rather than through a shared CSE body.
+    """
+
+    def __init__(self, exprs, funcs, backend):
+        self.exprs = tuple(exprs)
+        self.funcs = funcs
+        self.backend = backend
+
+    def __len__(self):
+        return len(self.funcs)
+
+    def __call__(self, x_vals):
+        return [func(x_vals) for func in self.funcs]
+
+
+def compile_kernel(exprs, x, backend="auto"):
+    """
+    Compile [f, f', ...] with the requested evaluation backend.
+
+    Args:
+        exprs (list): The expressions to compile together
+        x (sp.Symbol): The independent variable
+        backend (str): One of BACKENDS; unavailable backends fall back to NumPy
+
+    Returns:
+        callable: kernel(x_vals) -> list of float64 arrays, one per expression
+            (a FusedKernel for NumPy, a KernelFamily otherwise)
+    """
+    backend = resolve_backend(backend)
+    if backend == "numpy":
+        return compile_family(exprs, x)
+    funcs = [compile_expression(expr, x, backend) for expr in exprs]
+    return KernelFamily(exprs, funcs, backend)
@@ -1,16 +1,94 @@
 import sys
 import os
 import glob
+import multiprocessing
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QPushButton, QLabel, QLineEdit, 
-                             QTabWidget, QFrame, QSizePolicy, QStackedWidget, QTextEdit, QStackedLayout, QDesktopWidget, QSpacerItem, QMessageBox, QFileDialog)
-from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QRect, QEasingCurve
-from PyQt5.QtGui import QPalette, QColor, QFont, QFontDatabase, QLinearGradient, QBrush, QPainter, QPainterPath, QIcon, QPixmap, QCursor
+                             QTabWidget, QFrame, QSizePolicy, QStackedWidget, QTextEdit, QStackedLayout, QDesktopWidget, QSpacerItem, QMessageBox, QFileDialog, QShortcut, QProgressDialog, QInputDialog, QComboBox)
+from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QRect, QEasingCurve, QThreadPool
+from PyQt5.QtGui import QPalette, QColor, QFont, QFontDatabase, QLinearGradient, QBrush, QPainter, QPainterPath, QIcon, QPixmap, QCursor, QKeySequence
 from datetime import datetime
 import numpy as np
 import sympy as sp
 from scipy.integrate import quad, cumulative_trapezoid
 from graph import PlotWidget 
+from pipeline import OverlayPipeline, Pipeline
+from compute import GridTable, split_expressions
+from parsing import ParseError
+from complexity import DERIVATIVE_NODES, start_worker, tree_stats
+from preview import PreviewJob
+from curves import T, parse_curve, sample_implicit, sample_parametric, sample_polar
+from surface import SURFACE_VIEWS, parse_surface, sample_surface
+from series import MAX_SERIES_ORDER, format_polynomial, parse_series
+from quadrature import MAX_SUBINTERVALS, QUADRATURE_RULES, apply_rule
+from typeset import MathTextEdit, expression_html, latex, math_html
+from history import HistoryEntry, SessionError, SessionHistory, compact_snapshot, expand_snapshot
+from export import DATA_FORMATS, ArrayTable, ExportJob, curve_columns, format_from_file_name
+from profiling import enable_perf_log, format_profile, log_snapshot
+from memory import MemoryTracker, trim_caches
+import typeset
+import kernels
+import parsing
+import applog
+from applog import configure_logging, get_logger
+
+# Quiet by default; see applog.configure_logging for the environment overrides
+configure_logging()
+logger = get_logger("app")
+
+# Points of each kind (roots, maxima, ...) listed in the Details panel
+CRITICAL_POINTS_SHOWN = 20
+
+# Mode selector entries: (mode, label, function placeholder, range label)
+PLOT_MODES = [
+    ("function", "y = f(x)", "Enter function (e.g., x**2 + 2*x; sin(x) to overlay)", "  X-Range (min, max)"),
+    ("parametric", "Parametric x(t); y(t)", "Enter x(t); y(t) (e.g., cos(3*t); sin(2*t))", "  T-Range (min, max)"),
+    ("polar", "Polar r(theta)", "Enter r(theta) (e.g., 1 + cos(theta))", "  Theta-Range (min, max)"),
+    ("series", "Taylor Series about x = a", "Enter f(x); a (e.g., exp(x); 0), blank a for 0", "  X-Range (min, max)"),
+    ("left", "Riemann Sum, Left Endpoints", "Enter f(x) (e.g., sin(x)); n goes in Subintervals", "  X-Range (min, max)"),
+    ("right", "Riemann Sum, Right Endpoints", "Enter f(x) (e.g., sin(x)); n goes in Subintervals", "  X-Range (min, max)"),
+    ("midpoint", "Riemann Sum, Midpoints", "Enter f(x) (e.g., sin(x)); n goes in Subintervals", "  X-Range (min, max)"),
+    ("trapezoid", "Trapezoid Rule", "Enter f(x) (e.g., sin(x)); n goes in Subintervals", "  X-Range (min, max)"),
+    ("simpson", "Simpson's Rule", "Enter f(x) (e.g., sin(x)); n goes in Subintervals", "  X-Range (min, max)"),
+    ("implicit", "Implicit F(x, y) = 0", "Enter F(x, y) (e.g., x**2 + y**2 = 4)", "  X/Y-Range (min, max)"),
+    ("contour", "Surface f(x, y), Contours", "Enter f(x, y) (e.g., sin(x)*cos(y))", "  X/Y-Range (min, max)"),
+    ("heatmap", "Surface f(x, y), Heatmap", "Enter f(x, y) (e.g., exp(-(x**2 + y**2)))", "  X/Y-Range (min, max)"),
+]
+MODE_INFO = {mode: (label, placeholder, range_text) for mode, label, placeholder, range_text in PLOT_MODES}
+
+# What the order field holds outside y = f(x) mode
+ORDER_LABELS = {"series": "  Series Order", **{rule: "  Subintervals (n)" for rule in QUADRATURE_RULES}}
+
+
+def syntax_message(hint, error):
+    """A syntax warning, with the parser's message and column when it has one."""
+    if isinstance(error, ParseError):
+        return f"{hint}\n\n{error}"
+    return hint
+
+
+# LaTeX for the expression names of the curve and surface Details
+DETAILS_TEX = {
+    "dy/dx": r"\frac{dy}{dx}",
+    "curvature": r"\kappa",
+    "∂f/∂x": r"\frac{\partial f}{\partial x}",
+    "∂f/∂y": r"\frac{\partial f}{\partial y}",
+    "|∇f|": r"|\nabla f|",
+}
+
+
+def details_header(title, first=False):
+    """A section title of the Details panel."""
+    margin = 0 if first else 15
+    return (f'<div style="color: #55557D; font-family: \'Roboto\'; font-size: 26px; font-weight: bold; '
+            f'margin-top: {margin}px; margin-bottom: 5px;">{title}</div>')
+
+
+def details_body(html, note=False):
+    """An indented line of the Details panel; note=True for the small grey remarks."""
+    style = "color: #8A8AA8; font-size: 16px;" if note else "color: #55557D; font-size: 22px;"
+    return f'<div style="{style} font-family: \'Roboto\'; margin-left: 15px; margin-top: 0;">{html}</div>'
+
 
 # -----------------------------------------------
 # Resource Manager and Finder
@@ -33,8 +111,8 @@ class AssetManager:
         # Map to cache resolved asset paths
         self.asset_cache = {}
         
-        # Print the base directory for debugging
-        print(f"Base directory: {self.get_base_dir()}")
+        # Log the base directory for debugging
+        logger.debug("Base directory: %s", self.get_base_dir())
         
         # Pre-scan assets to populate cache
         self.scan_assets()
@@ -55,14 +133,14 @@ class AssetManager:
         Scan all asset directories and populate the asset cache.
         """
         base_dir = self.get_base_dir()
-        print(f"Scanning assets in: {base_dir}")
+        logger.debug("Scanning assets in: %s", base_dir)
         
         # Scan each asset directory
         for asset_dir in self.asset_dirs:
             full_dir_path = os.path.join(base_dir, asset_dir)
             
             if os.path.exists(full_dir_path):
-                print(f"Found asset directory: {full_dir_path}")
+                logger.debug("Found asset directory: %s", full_dir_path)
                 
                 # Scan all files in this directory and subdirectories
                 for root, _, files in os.walk(full_dir_path):
@@ -78,11 +156,11 @@ class AssetManager:
                         simple_path = os.path.join(asset_dir, file).replace('\\', '/')
                         self.asset_cache[simple_path] = full_path
                         
-                        print(f"Cached asset: {normalized_path} -> {full_path}")
+                        logger.debug("Cached asset: %s -> %s", normalized_path, full_path)
             else:
-                print(f"Asset directory not found: {full_dir_path}")
+                logger.warning("Asset directory not found: %s", full_dir_path)
         
-        print(f"Total assets cached: {len(self.asset_cache)}")
+        logger.debug("Total assets cached: %d", len(self.asset_cache))
         
         # Try to find assets with recursive glob pattern (fallback method)
         self.find_assets_with_glob()
@@ -145,7 +223,7 @@ class AssetManager:
                 return full_path
         
         # Asset not found
-        print(f"Asset not found: {asset_path}")
+        logger.warning("Asset not found: %s", asset_path)
         return None
     
     def load_asset(self, asset_path):
@@ -172,18 +250,18 @@ class AssetManager:
         """
         resolved_path = self.resolve_asset(image_path)
         if not resolved_path:
-            print(f"Image not found: {image_path}")
+            logger.warning("Image not found: %s", image_path)
             return QPixmap()
         
         pixmap = QPixmap(resolved_path)
         if pixmap.isNull():
-            print(f"Failed to load image as pixmap: {resolved_path}")
+            logger.warning("Failed to load image as pixmap: %s", resolved_path)
             
             # Try alternative paths
             filename = os.path.basename(image_path)
             for key, path in self.asset_cache.items():
                 if filename in key and key != image_path:
-                    print(f"Trying alternative path: {path}")
+                    logger.debug("Trying alternative path: %s", path)
                     alt_pixmap = QPixmap(path)
                     if not alt_pixmap.isNull():
                         return alt_pixmap
@@ -203,21 +281,21 @@ class AssetManager:
         font_dir = os.path.join(self.get_base_dir(), "Assets", "Fonts")
         
         if not os.path.exists(font_dir):
-            print(f"Font directory not found: {font_dir}")
+            logger.warning("Font directory not found: %s", font_dir)
             # Try to find fonts using the asset cache
             for key, path in self.asset_cache.items():
                 if "Fonts" in key and path.lower().endswith(('.ttf', '.otf')):
                     font_id = QFontDatabase.addApplicationFont(path)
                     if font_id != -1:
                         families = QFontDatabase.applicationFontFamilies(font_id)
-                        print(f"Loaded font: {path} → {families}")
+                        logger.debug("Loaded font: %s -> %s", path, families)
                         loaded_families.extend(families)
                     else:
-                        print(f"Failed to load font: {path}")
+                        logger.warning("Failed to load font: %s", path)
             
             return loaded_families
         
-        print(f"Loading fonts from: {font_dir}")
+        logger.debug("Loading fonts from: %s", font_dir)
         
         # Find all font files
         font_files = []
@@ -229,10 +307,10 @@ class AssetManager:
             font_id = QFontDatabase.addApplicationFont(font_path)
             if font_id != -1:
                 families = QFontDatabase.applicationFontFamilies(font_id)
-                print(f"Loaded font: {font_path} → {families}")
+                logger.debug("Loaded font: %s -> %s", font_path, families)
                 loaded_families.extend(families)
             else:
-                print(f"Failed to load font: {font_path}")
+                logger.warning("Failed to load font: %s", font_path)
         
         return loaded_families
     
@@ -288,7 +366,7 @@ class CircleButtonBack(QPushButton):
         icon_path = asset_manager.load_asset("Assets/Icons/back_icon.png")
         icon = QIcon(icon_path)
         if icon.isNull():
-            print(f"Failed to load icon: {icon_path}")
+            logger.warning("Failed to load icon: %s", icon_path)
         else:
             self.setIcon(icon)
 
@@ -320,9 +398,9 @@ class CircleButtonInfo(QPushButton):
         
         icon_path = asset_manager.load_asset("Assets/Icons/group_icon.png")  # Ensure this points to the correct image path
         icon = QIcon(icon_path)
-        print(f"Resolved icon path: {icon_path}")
+        logger.debug("Resolved icon path: %s", icon_path)
         if icon.isNull():
-            print(f"Failed to load icon: {icon_path}")
+            logger.warning("Failed to load icon: %s", icon_path)
         else:
             self.setIcon(icon)
         
@@ -354,6 +432,28 @@ class CircleButtonInfo(QPushButton):
 class GraphiqueApp(QMainWindow):
     def __init__(self):
         super().__init__()
+        # Cached compute stages shared by Plot and the live preview
+        self.pipeline = Pipeline()
+        # Further functions ("f; g; h") overlaid on the primary one, sampled in one batch
+        self.overlay_pipeline = OverlayPipeline(self.pipeline)
+        self.rendered = None
+        # Last parametric/polar/implicit curve drawn, when not in y = f(x) mode
+        self.rendered_curve = None
+        # Last two-variable surface drawn, in the contour and heatmap modes
+        self.rendered_surface = None
+        # Last Taylor series drawn, in series mode
+        self.rendered_series = None
+        # Last Riemann sum or quadrature rule drawn
+        self.rendered_quadrature = None
+        self.details_key = None
+        # Plotted jobs of this session, for undo/redo and recall without recomputing
+        self.history = SessionHistory()
+        # Function -> highest derivative order the user agreed to run despite a cost warning
+        self.confirmed_orders = {}
+        # Per-plot memory samples, when started with GRAPHIQUE_MEMORY_DIAGNOSTICS
+        self.memory = MemoryTracker.from_environment()
+        # The splash screen the back button returns to, created once and reused
+        self.splash = None
         self.initUI()
     
     def initUI(self):
@@ -387,6 +487,60 @@ class GraphiqueApp(QMainWindow):
         
         self.set_image_background(asset_manager.load_asset("Assets/Screens/main_screen.png"))
 
+        # Live preview while typing
+        self.setup_live_preview()
+
+        # Exports render on their own thread so the UI stays responsive
+        self.export_pool = QThreadPool()
+        self.export_jobs = []
+
+        # Performance overlay on the graph (Ctrl+Shift+P)
+        self.profile_overlay_visible = False
+        self.profile_shortcut = QShortcut(QKeySequence("Ctrl+Shift+P"), self)
+        self.profile_shortcut.activated.connect(self.toggle_profile_overlay)
+
+        # Save the in-memory diagnostics log (Ctrl+Shift+L)
+        self.log_shortcut = QShortcut(QKeySequence("Ctrl+Shift+L"), self)
+        self.log_shortcut.activated.connect(self.dump_diagnostics_log)
+
+        # Memory use over the last plots (Ctrl+Shift+M)
+        self.memory_shortcut = QShortcut(QKeySequence("Ctrl+Shift+M"), self)
+        self.memory_shortcut.activated.connect(self.show_memory_report)
+
+        # Step the Taylor series order up and down (Ctrl+Up / Ctrl+Down)
+        self.series_up_shortcut = QShortcut(QKeySequence("Ctrl+Up"), self)
+        self.series_up_shortcut.activated.connect(lambda: self.step_series_order(1))
+        self.series_down_shortcut = QShortcut(QKeySequence("Ctrl+Down"), self)
+        self.series_down_shortcut.activated.connect(lambda: self.step_series_order(-1))
+
+        # Session history: back/forward (Alt+Left / Alt+Right), pick from a list (Ctrl+H),
+        # save and open a session (Ctrl+Shift+S / Ctrl+Shift+O)
+        self.undo_shortcut = QShortcut(QKeySequence("Alt+Left"), self)
+        self.undo_shortcut.activated.connect(self.undo_plot)
+        self.redo_shortcut = QShortcut(QKeySequence("Alt+Right"), self)
+        self.redo_shortcut.activated.connect(self.redo_plot)
+        self.history_shortcut = QShortcut(QKeySequence("Ctrl+H"), self)
+        self.history_shortcut.activated.connect(self.show_history)
+        self.save_session_shortcut = QShortcut(QKeySequence("Ctrl+Shift+S"), self)
+        self.save_session_shortcut.activated.connect(self.save_session)
+        self.load_session_shortcut = QShortcut(QKeySequence("Ctrl+Shift+O"), self)
+        self.load_session_shortcut.activated.connect(self.load_session)
+
+    def setup_live_preview(self):
+        self.preview_job = None
+        self.preview_job_id = 0
+        self.preview_pool = QThreadPool()
+        self.preview_pool.setMaxThreadCount(1)
+
+        # Debounce keystrokes so only a pause in typing starts a compute
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(300)
+        self.preview_timer.timeout.connect(self.start_preview)
+
+        for field in (self.function_input, self.x_min_entry, self.x_max_entry, self.derivative_input, self.precision_input):
+            field.textChanged.connect(self.schedule_preview)
+
     def resize_window_to_percentage(self):
         # Get the screen's dimensions
         screen = QDesktopWidget().screenGeometry()
@@ -520,16 +674,21 @@ class GraphiqueApp(QMainWindow):
         function_label.setStyleSheet("color: #55557D; background-color: rgba(145, 145, 220, 0)")
         control_layout.addWidget(function_label)
         
-        function_input = self.create_input_field("Enter function (e.g., x**2 + 2*x)", "Enter Function")
+        function_input = self.create_input_field(PLOT_MODES[0][2], "Enter Function")
         self.function_input = function_input
         control_layout.addWidget(function_input)
 
+        # Plot mode: y = f(x), parametric, polar or implicit
+        self.mode_selector = self.create_mode_selector()
+        control_layout.addWidget(self.mode_selector)
+
         control_layout.addSpacing(15)
 
         # X-Range inputs
-        range_label = QLabel("  X-Range (min, max)")
+        range_label = QLabel(PLOT_MODES[0][3])
         range_label.setFont(QFont("Roboto", 18, QFont.Bold))
         range_label.setStyleSheet("color: #55557D; background-color: rgba(145, 145, 220, 0)")
+        self.range_label = range_label
         control_layout.addWidget(range_label)
 
         range_layout = self.create_range_inputs()
@@ -539,6 +698,7 @@ class GraphiqueApp(QMainWindow):
 
         # Derivative order input
         derivative_label = QLabel("  Derivative Order")
+        self.derivative_label = derivative_label
         derivative_label.setFont(QFont("Roboto", 18, QFont.Bold))
         derivative_label.setStyleSheet("color: #55557D; background-color: rgba(145, 145, 220, 0)")
         control_layout.addWidget(derivative_label)
@@ -547,6 +707,18 @@ class GraphiqueApp(QMainWindow):
         self.derivative_input = derivative_input
         control_layout.addWidget(derivative_input)
 
+        control_layout.addSpacing(15)
+
+        # Precision input (optional)
+        precision_label = QLabel("  Precision Digits")
+        precision_label.setFont(QFont("Roboto", 18, QFont.Bold))
+        precision_label.setStyleSheet("color: #55557D; background-color: rgba(145, 145, 220, 0)")
+        control_layout.addWidget(precision_label)
+
+        precision_input = self.create_input_field("Optional (e.g., 50), blank for standard", "Precision Digits")
+        self.precision_input = precision_input
+        control_layout.addWidget(precision_input)
+
         control_layout.addSpacing(10)
 
         separator = QFrame()
@@ -624,6 +796,37 @@ class GraphiqueApp(QMainWindow):
         input_field.setMinimumHeight(40)
         return input_field
 
+    def create_mode_selector(self): # Plot mode drop-down styled like the input fields
+        mode_selector = QComboBox()
+        for _, label, _, _ in PLOT_MODES:
+            mode_selector.addItem(label)
+        mode_selector.setStyleSheet("""
+            QComboBox {
+                border-radius: 10px;
+                padding: 8px 10px;
+                background-color: rgba(145, 145, 220, 0.25);
+                font-family: 'Roboto Medium';
+                font-size: 14px;
+                color: #7777B2;
+            }
+        """)
+        mode_selector.setMinimumHeight(36)
+        mode_selector.currentIndexChanged.connect(self.on_mode_changed)
+        return mode_selector
+
+    def on_mode_changed(self, index):
+        _, _, placeholder, range_text = PLOT_MODES[index]
+        self.function_input.setPlaceholderText(placeholder)
+        self.range_label.setText(range_text)
+        # The order field is the Taylor order in series mode and n for the quadrature rules
+        self.derivative_label.setText(ORDER_LABELS.get(PLOT_MODES[index][0], "  Derivative Order"))
+        # The live preview only covers y = f(x)
+        self.preview_timer.stop()
+        self.cancel_preview()
+
+    def plot_mode(self):
+        return PLOT_MODES[self.mode_selector.currentIndex()][0]
+
     def create_range_inputs(self): # X-range input fields styling
         range_layout = QHBoxLayout()
         range_layout.setSpacing(15)
@@ -709,7 +912,7 @@ class GraphiqueApp(QMainWindow):
         # Create the layout for the details_tab
         details_layout = QVBoxLayout(details_tab)
 
-        self.result_box = QTextEdit()
+        self.result_box = MathTextEdit()
         self.result_box.setReadOnly(True)
         self.result_box.setPlaceholderText("Function details will appear here...")
         self.result_box.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -770,8 +973,12 @@ class GraphiqueApp(QMainWindow):
         self.datetime_label.setText(current_time)
     
     def back_to_splash(self):   # Back button logic
-        self.close()
-        self.splash = SplashScreen()
+        # Hide rather than close: the splash shows this same window again, so a
+        # session of round trips keeps one pipeline, history and figure
+        self.hide()
+        if self.splash is None:
+            self.splash = SplashScreen()
+            self.splash.main = self
         self.splash.show()
 
     def show_info_dialog(self): # Info button logic
@@ -816,35 +1023,199 @@ class GraphiqueApp(QMainWindow):
 
 
     # Reading the function input logic
-    def parse_function(self, func_str):
-        x = sp.Symbol('x')
+    # Parse f and check its cost before a plot job takes the pipeline. The lock is only
+    # held for parsing: dialogs must never be open while a preview job waits on it
+    def prepare_function(self, func_str, derivative_order=None):
+        plan = None
+        with self.pipeline.lock:
+            self.pipeline.profiler.reset()
+            self.plot_widget.profiler.reset()
+            try:
+                func = self.pipeline.parse(func_str)
+            except sp.SympifyError as e:
+                func = None
+                error = syntax_message("Invalid function syntax.\nExample: 3*x**2 + 2*x - 4", e)
+            else:
+                if derivative_order is not None:
+                    plan = self.pipeline.plan(derivative_order)
+        if func is None:
+            self.warning(warning=error)
+            return None
+        if plan is not None and not self.confirm_cost(func, plan, derivative_order):
+            return None
+        return func
+
+
+    # Ask before a job the cost model predicts to be slow; once per function and order
+    def confirm_cost(self, func, plan, derivative_order):
+        if not plan.expensive or derivative_order <= self.confirmed_orders.get(func, -1):
+            return True
+        question = ("This computation is predicted to be slow:\n"
+                    f"{plan.describe()}\n\n"
+                    "Continue anyway?")
+        if not self.confirm(question):
+            return False
+        self.confirmed_orders[func] = derivative_order
+        return True
+
+
+    # Precision digits for the mpmath refinement, or None for plain float64
+    def read_precision(self):
+        text = self.precision_input.text().strip()
+        if not text:
+            return None
+        dps = int(text)
+        if not 16 <= dps <= 1000:
+            raise ValueError(text)
+        return dps
+
+
+    # Live preview: restart the debounce timer and drop any stale job
+    def schedule_preview(self):
+        self.cancel_preview()
+        if self.plot_mode() == "function":
+            self.preview_timer.start()
+
+
+    def cancel_preview(self):
+        if self.preview_job is not None:
+            self.preview_job.cancel()
+            self.preview_job = None
+
+
+    # Live preview: start a background compute for the current inputs
+    def start_preview(self):
+        func_strs = split_expressions(self.function_input.text())
         try:
-            func = sp.sympify(func_str)
-            return func, x
-        except sp.SympifyError:
-            self.warning(warning="Invalid function syntax.\nExample: 3*x**2 + 2*x - 4")
-            return None, None
-    
+            x_min = float(self.x_min_entry.text())
+            x_max = float(self.x_max_entry.text())
+            derivative_text = self.derivative_input.text().strip()
+            derivative_order = int(derivative_text) if derivative_text else 0
+            dps = self.read_precision()
+        except ValueError:
+            return  # Incomplete input while typing, wait for the next edit
+
+        if not func_strs or x_min >= x_max or derivative_order < 0:
+            return
+
+        self.preview_job_id += 1
+        job = PreviewJob(self.preview_job_id, self.overlay_pipeline, func_strs,
+                         x_min, x_max, derivative_order, dps)
+        job.signals.finished.connect(self.on_preview_finished)
+        job.signals.failed.connect(self.on_preview_failed)
+        self.preview_job = job
+        self.preview_pool.start(job)
+
+
+    def on_preview_finished(self, job_id, data_list):
+        # Results of superseded jobs are ignored
+        if self.preview_job is None or job_id != self.preview_job.job_id:
+            return
+        profile = self.preview_job.profile
+        func_strs = self.preview_job.func_strs
+        self.preview_job = None
+        self.plot_widget.profiler.reset()
+        self.render_plot(data_list[0], animated=False)
+        self.plot_widget.set_overlaid(list(zip(func_strs[1:], data_list[1:])))
+        self.report_profile("preview", profile)
+
+
+    # Input that is mid-edit often fails to parse or sample; the explicit Plot reports errors
+    def on_preview_failed(self, job_id, error):
+        if self.preview_job is not None and job_id == self.preview_job.job_id:
+            self.preview_job = None
+        logger.debug("Preview %d failed: %s", job_id, error)
+
+
+    # Show the last job's stage timings and log them for offline analysis
+    def report_profile(self, event, pipeline_profile):
+        widget_profile = self.plot_widget.profiler.snapshot()
+        inputs = {
+            "function": self.function_input.text(),
+            "x_min": self.x_min_entry.text(),
+            "x_max": self.x_max_entry.text(),
+            "derivative_order": self.derivative_input.text(),
+        }
+        log_snapshot(event, "pipeline", pipeline_profile, inputs=inputs, backend=self.pipeline.backend)
+        log_snapshot(event, "plot_widget", widget_profile)
+        self.plot_widget.set_overlay_text(f"[{event}]\n" + format_profile(pipeline_profile, widget_profile))
+        self.track_memory(event)
+
+
+    # Keep SymPy's caches bounded, and sample memory after each plot in diagnostics mode
+    def track_memory(self, event):
+        trim_caches()
+        if self.memory is None:
+            return
+        self.memory.record(f"{event}: {self.function_input.text()}", self.plot_widget.figure, self.cache_sizes(),
+                           count_figures=event == "plot")
+
+
+    def cache_sizes(self):
+        formulas, formula_bytes = typeset.cache_info()
+        return {
+            "history": f"{len(self.history)} ({self.history.nbytes / 1e6:.1f} MB)",
+            "formulas": f"{formulas} ({formula_bytes / 1e6:.1f} MB)",
+            "kernels": kernels.compile_expression.cache_info().currsize,
+            "parsed": parsing._parse_cached.cache_info().currsize,
+        }
+
+
+    def show_memory_report(self):
+        if self.memory is None:
+            QMessageBox.information(self, "Memory",
+                                    "Memory diagnostics are disabled.\nStart the app with GRAPHIQUE_MEMORY_DIAGNOSTICS=1 to enable them.")
+            return
+        QMessageBox.information(self, "Memory", self.memory.report())
+
+
+    def toggle_profile_overlay(self):
+        self.profile_overlay_visible = not self.profile_overlay_visible
+        self.plot_widget.set_overlay_visible(self.profile_overlay_visible)
+
+
+    # Redraw the graph only when the sampled data or the drawing mode changed
+    def render_plot(self, data, animated):
+        if self.rendered == (data, animated):
+            return
+        self.rendered = (data, animated)
+        self.rendered_curve = None
+        self.rendered_surface = None
+        self.rendered_series = None
+        self.rendered_quadrature = None
+        if animated:
+            self.plot_widget.animate_plot(data.x_vals, data.y_vals_list, data.dy_vals_list, data.int_vals)
+        else:
+            self.plot_widget.plot_function(data.x_vals, data.y_vals_list, data.dy_vals_list, data.int_vals)
 
-    # Translates derivative function logic
-    def numerical_derivative(self, func, x_val, dx=1e-5):
-        return (func.subs('x', x_val + dx).evalf() - func.subs('x', x_val - dx).evalf()) / (2 * dx)
-    
 
     # Plotting of graph logic
     def plot(self):
-        func_str = self.function_input.text()
+        # An explicit plot supersedes any pending preview
+        self.preview_timer.stop()
+        self.cancel_preview()
+
+        func_strs = split_expressions(self.function_input.text())
         try:
             x_min = float(self.x_min_entry.text())
             x_max = float(self.x_max_entry.text())
         except ValueError:
             self.warning(warning="Invalid range input.")
             return
-        
-        func, x = self.parse_function(func_str)
-        if func is None:
-            return
 
+        if self.plot_mode() in SURFACE_VIEWS:
+            self.plot_surface(self.plot_mode(), x_min, x_max)
+            return
+        if self.plot_mode() == "series":
+            self.plot_series(x_min, x_max)
+            return
+        if self.plot_mode() in QUADRATURE_RULES:
+            self.plot_quadrature(self.plot_mode(), x_min, x_max)
+            return
+        if self.plot_mode() != "function":
+            self.plot_curve(self.plot_mode(), x_min, x_max)
+            return
+        
         # Get the derivative order from the input
         try:
             derivative_order = int(self.derivative_input.text())
@@ -852,98 +1223,600 @@ class GraphiqueApp(QMainWindow):
             self.warning(warning="Invalid derivative order input.")
             return
 
-        # List to store all derivatives and their numerical values
-        derivatives = [func]
-        x_vals = np.linspace(x_min, x_max, 400)
+        try:
+            dps = self.read_precision()
+        except ValueError:
+            self.warning(warning="Invalid precision input.\nEnter a number of digits from 16 to 1000, or leave it blank.")
+            return
 
-        # Initialize lists for the values of the function and its derivatives
-        y_vals_list = []
-        dy_vals_list = []
+        func = self.prepare_function(func_strs[0] if func_strs else "", derivative_order)
+        if func is None:
+            return
 
-        # Calculate the original function's values for each x_val
-        y_vals_list.append(np.array([float(func.subs(x, val).evalf()) for val in x_vals], dtype=np.float64))
-        dy_vals_list.append(np.array([self.numerical_derivative(func, val) for val in x_vals], dtype=np.float64))
+        # Hold the pipeline so a finishing preview job cannot swap the function in between;
+        # a failure is only reported once it is released
+        error = None
+        with self.pipeline.lock:
+            # Differentiate and sample every function and its derivatives on one grid,
+            # reusing every pipeline stage whose inputs did not change (f itself comes
+            # from the parse cache, in case a cancelled preview parsed another function)
+            try:
+                data_list = self.overlay_pipeline.sample(func_strs, x_min, x_max, derivative_order, dps=dps)
+            except sp.SympifyError as e:
+                error = syntax_message("Invalid function syntax.\nSeparate several functions with ';', e.g. sin(x); cos(x)", e)
+            else:
+                data = data_list[0]
+                critical = self.find_critical_points(x_min, x_max)
+
+                details_key = (func, derivative_order, x_min, x_max)
+                if details_key != self.details_key:
+                    self.update_details(data.derivatives, derivative_order, x_min, x_max, critical)
+                    self.details_key = details_key
+
+                # Plot the original function and all derivatives, then mark its roots and turning points
+                self.render_plot(data, animated=True)
+                self.plot_widget.set_overlaid(list(zip(func_strs[1:], data_list[1:])))
+                self.plot_widget.mark_points(critical)
+                pipeline_profile = self.pipeline.profiler.snapshot()
+        if error is not None:
+            self.warning(warning=error)
+            return
 
-        # Calculate derivatives from 1 up to the desired order and add them to lists
-        for i in range(1, derivative_order + 1):
-            func_diff = sp.diff(derivatives[-1], x)  # Calculate next derivative
-            derivatives.append(func_diff)
+        self.record_history()
+        self.report_profile("plot", pipeline_profile)
+
+
+    # Parametric, polar and implicit curves; the range fields hold the t/theta or x/y range
+    def plot_curve(self, mode, range_min, range_max):
+        if range_min >= range_max:
+            self.warning(warning="Invalid range input.")
+            return
+        try:
+            exprs = parse_curve(mode, self.function_input.text())
+        except sp.SympifyError as e:
+            self.warning(warning=syntax_message(f"Invalid curve syntax.\n{MODE_INFO[mode][1]}", e))
+            return
 
-            # Calculate the numerical values for the derivative
-            dy_vals = np.array([self.numerical_derivative(derivatives[i], val) for val in x_vals], dtype=np.float64)
-            dy_vals_list.append(dy_vals)
+        profiler = self.pipeline.profiler
+        profiler.reset()
+        self.plot_widget.profiler.reset()
+        try:
+            with profiler.stage('sample_curve'):
+                if mode == "parametric":
+                    curve = sample_parametric(exprs[0], exprs[1], T, range_min, range_max, self.pipeline.num_points)
+                elif mode == "polar":
+                    curve = sample_polar(exprs[0], range_min, range_max, self.pipeline.num_points)
+                else:
+                    curve = sample_implicit(exprs[0], range_min, range_max, range_min, range_max)
+        except (NameError, TypeError, ValueError, NotImplementedError) as e:
+            logger.warning("Curve sampling failed: %s", e)
+            self.warning(warning=f"This curve cannot be evaluated numerically.\n{MODE_INFO[mode][1]}")
+            return
+        profiler.count('evaluations', len(curve.x_vals))
+
+        # Switching back to y = f(x) must redraw even if that data is unchanged
+        self.rendered = None
+        self.details_key = None
+        self.rendered_curve = curve
+        self.rendered_surface = None
+        self.rendered_series = None
+        self.rendered_quadrature = None
+        self.plot_widget.plot_curve(curve, self.function_input.text(), title=MODE_INFO[mode][0])
+        self.update_curve_details(curve)
+        self.record_history()
+        self.report_profile("plot", profiler.snapshot())
+
+
+    # Taylor polynomials of f about x = a; the order field holds the highest order
+    def plot_series(self, x_min, x_max):
+        if x_min >= x_max:
+            self.warning(warning="Invalid range input.")
+            return
+        try:
+            func_text, center = parse_series(self.function_input.text())
+        except sp.SympifyError as e:
+            self.warning(warning=syntax_message(f"Invalid series syntax.\n{MODE_INFO['series'][1]}", e))
+            return
+        try:
+            order = int(self.derivative_input.text())
+        except ValueError:
+            order = -1
+        if not 0 <= order <= MAX_SERIES_ORDER:
+            self.warning(warning=f"Invalid series order input.\nEnter an order from 0 to {MAX_SERIES_ORDER}.")
+            return
+
+        func = self.prepare_function(func_text, order)
+        if func is None:
+            return
+
+        # Dialogs wait until the pipeline is released
+        error = None
+        with self.pipeline.lock:
+            # A cache hit, unless a cancelled preview parsed another function meanwhile
+            self.pipeline.parse(func_text)
+            try:
+                series = self.pipeline.series(x_min, x_max, center, order)
+            except (NameError, TypeError, ValueError, NotImplementedError) as e:
+                logger.warning("Taylor series failed: %s", e)
+                error = "No Taylor series is available for this function."
+            else:
+                if not np.all(np.isfinite(series.coefficients)):
+                    error = f"f or one of its derivatives is undefined at x = {center:g}.\nChoose another center."
+            if error is None:
+                self.rendered = None
+                self.rendered_curve = None
+                self.rendered_surface = None
+                self.rendered_series = series
+                self.rendered_quadrature = None
+                self.plot_widget.plot_series(series, func_text, title=f"Taylor Series about x = {center:g}")
+
+                details_key = ("series", func, center, order)
+                if details_key != self.details_key:
+                    self.update_series_details(series)
+                    self.details_key = details_key
+                pipeline_profile = self.pipeline.profiler.snapshot()
+        if error is not None:
+            self.warning(warning=error)
+            return
 
-            # Also add the values for the current derivative
-            y_vals_list.append(np.array([float(derivatives[i].subs(x, val).evalf()) for val in x_vals], dtype=np.float64))
+        self.record_history()
+        self.report_profile("plot", pipeline_profile)
+
+
+    # Ctrl+Up / Ctrl+Down in series mode; the lower orders are all cached
+    def step_series_order(self, step):
+        if self.plot_mode() != "series":
+            return
+        try:
+            order = int(self.derivative_input.text()) + step
+        except ValueError:
+            order = 1
+        if 0 <= order <= MAX_SERIES_ORDER:
+            self.derivative_input.setText(str(order))
+            self.plot()
+
+
+    def update_series_details(self, series):
+        coefficients = ", ".join(f"{c:.6g}" for c in series.coefficients)
+        finite = series.error[np.isfinite(series.error)]
+        max_error = f"{finite.max():.3g}" if finite.size else "undefined"
+        self.show_details([
+            ("function", details_header("Original Function:", first=True)
+             + details_body(expression_html("f(x) = ", self.pipeline.simplify(self.pipeline.func), "f(x) = "))),
+            ("polynomial", details_header(f"Taylor Polynomial T<sub>{series.order}</sub> about x = {series.center:g}:")
+             + details_body(f"T{series.order}(x) = {format_polynomial(series.coefficients, series.center)}")),
+            ("coefficients", details_header("Coefficients f<sup>(k)</sup>(a)/k!:") + details_body(coefficients)),
+            ("error", details_header("Largest Error on the Range:")
+             + details_body(f"max |f(x) - T{series.order}(x)| = {max_error}")),
+        ])
+
+
+    # Riemann sums and the trapezoid/Simpson rules; the order field holds n
+    def plot_quadrature(self, rule, x_min, x_max):
+        if x_min >= x_max:
+            self.warning(warning="Invalid range input.")
+            return
+        try:
+            n = int(self.derivative_input.text())
+        except ValueError:
+            n = 0
+        if not 1 <= n <= MAX_SUBINTERVALS:
+            self.warning(warning=f"Invalid number of subintervals.\nEnter n from 1 to {MAX_SUBINTERVALS}.")
+            return
+
+        func_text = self.function_input.text()
+        func = self.prepare_function(func_text)
+        if func is None:
+            return
+
+        # Dialogs wait until the pipeline is released
+        error = None
+        with self.pipeline.lock:
+            # A cache hit, unless a cancelled preview parsed another function meanwhile
+            self.pipeline.parse(func_text)
+            try:
+                data = self.pipeline.sample(x_min, x_max, 0)
+                with self.pipeline.profiler.stage('quadrature'):
+                    quadrature = apply_rule(rule, self.pipeline.compile(func), x_min, x_max, n)
+            except (NameError, TypeError, ValueError, NotImplementedError) as e:
+                logger.warning("Quadrature failed: %s", e)
+                error = "This function cannot be evaluated numerically."
+            else:
+                self.pipeline.profiler.count('evaluations', int(quadrature.sizes.sum()) + quadrature.n)
+
+                self.rendered = None
+                self.details_key = None
+                self.rendered_curve = None
+                self.rendered_surface = None
+                self.rendered_series = None
+                self.rendered_quadrature = quadrature
+                self.plot_widget.plot_quadrature(quadrature, data.x_vals, data.y_vals_list[0], func_text,
+                                                 title=f"{MODE_INFO[rule][0]}, n = {quadrature.n}")
+                self.update_quadrature_details(quadrature, x_min, x_max)
+                pipeline_profile = self.pipeline.profiler.snapshot()
+        if error is not None:
+            self.warning(warning=error)
+            return
+
+        self.record_history()
+        self.report_profile("plot", pipeline_profile)
+
+
+    def update_quadrature_details(self, quadrature, x_min, x_max):
+        order = quadrature.observed_order()
+        order_text = f"{order:.2f}" if np.isfinite(order) else "not measurable (already exact)"
+        rows = [
+            ("Sum", f"{quadrature.value:.12g}"),
+            ("Integral (adaptive quadrature)", f"{quadrature.reference:.12g}"),
+            ("Error", f"{quadrature.error:.3g}"),
+            ("Observed order (error ~ n<sup>-p</sup>)", f"p ≈ {order_text}"),
+        ]
+        title = f"{MODE_INFO[quadrature.rule][0]} on [{x_min}, {x_max}], n = {quadrature.n}:"
+        self.show_details([("title", details_header(title, first=True))]
+                          + [(name, details_body(f"{name}: {value}")) for name, value in rows])
+
+
+    # Two-variable functions over the square [min, max] x [min, max]
+    def plot_surface(self, view, range_min, range_max):
+        if range_min >= range_max:
+            self.warning(warning="Invalid range input.")
+            return
+        try:
+            f_expr = parse_surface(self.function_input.text())
+        except sp.SympifyError as e:
+            self.warning(warning=syntax_message(f"Invalid function syntax.\n{MODE_INFO[view][1]}", e))
+            return
+
+        profiler = self.pipeline.profiler
+        profiler.reset()
+        self.plot_widget.profiler.reset()
+        try:
+            with profiler.stage('sample_surface'):
+                surface = sample_surface(f_expr, range_min, range_max, range_min, range_max)
+        except (NameError, TypeError, ValueError, NotImplementedError) as e:
+            logger.warning("Surface sampling failed: %s", e)
+            self.warning(warning=f"This function cannot be evaluated numerically.\n{MODE_INFO[view][1]}")
+            return
+        profiler.count('evaluations', surface.z_vals.size)
+
+        self.rendered = None
+        self.details_key = None
+        self.rendered_curve = None
+        self.rendered_surface = surface
+        self.rendered_series = None
+        self.rendered_quadrature = None
+        self.plot_widget.plot_surface(surface, view, title=MODE_INFO[view][0])
+        self.update_surface_details(surface, range_min, range_max)
+        self.record_history()
+        self.report_profile("plot", profiler.snapshot())
+
+
+    def update_surface_details(self, surface, range_min, range_max):
+        sections = [("title", details_header("Surface f(x, y):", first=True))]
+        for name, expr in surface.exprs.items():
+            sections.append((name, details_body(self.expression_details(name, expr))))
+        if np.isfinite(surface.integral):
+            integral_text = f"{surface.integral:.10g} ± {surface.integral_error:.2g}"
+        else:
+            integral_text = "undefined (f is not finite everywhere on the region)"
+        region = f"[{range_min}, {range_max}]"
+        sections.append(("integral", details_header("Double Integral:")
+                         + details_body(f"∬<sub>{region}×{region}</sub> f dA ≈ {integral_text}")))
+        self.show_details(sections)
+
+
+    def update_curve_details(self, curve):
+        sections = [("title", details_header(f"{MODE_INFO[curve.mode][0]}:", first=True))]
+        for name, expr in curve.exprs.items():
+            sections.append((name, details_body(self.expression_details(name, expr))))
+        self.show_details(sections)
+
+
+    # "name = expr" of a curve or surface, simplified and typeset
+    def expression_details(self, name, expr):
+        return expression_html(DETAILS_TEX.get(name, name) + " = ", self.pipeline.simplify(expr), f"{name} = ")
+
+
+    # Roots, extrema and inflection points; None if f' or f'' has no numeric form
+    def find_critical_points(self, x_min, x_max):
+        try:
+            return self.pipeline.critical_points(x_min, x_max)
+        except (NameError, TypeError, ValueError, NotImplementedError) as e:
+            logger.warning("Critical point search failed: %s", e)
+            return None
+
+
+    def critical_points_html(self, critical):
+        if critical is None:
+            return "Not available for this function."
+
+        def listing(points, with_y=True):
+            shown = ", ".join(f"({x_val:.6g}, {y_val:.6g})" if with_y else f"{x_val:.6g}"
+                              for x_val, y_val in points[:CRITICAL_POINTS_SHOWN])
+            if len(points) > CRITICAL_POINTS_SHOWN:
+                shown += f" ... and {len(points) - CRITICAL_POINTS_SHOWN} more"
+            return shown or "None"
+
+        html = (f"<b>Roots</b> ({len(critical.roots)}): {'x = ' if len(critical.roots) else ''}"
+                f"{listing(critical.roots, with_y=False)}<br>"
+                f"<b>Maxima</b> ({len(critical.maxima)}): {listing(critical.maxima)}<br>"
+                f"<b>Minima</b> ({len(critical.minima)}): {listing(critical.minima)}<br>"
+                f"<b>Inflection Points</b> ({len(critical.inflections)}): {listing(critical.inflections)}")
+        if critical.truncated:
+            html += "<br>(search stopped early; narrow the x range to see every point)"
+        return html
+
+
+    # Symbolic Details panel, one keyed section per item so unchanged ones are not rebuilt
+    def update_details(self, derivatives, derivative_order, x_min, x_max, critical=None):
+        func = derivatives[0]
+        # The cost model decides which symbolic work runs, and for how long
+        plan = self.pipeline.plan(0)
+        numeric = plan.strategy == "numeric"
 
         # Calculate the indefinite integral of the original function
-        func_indefinite_integral = sp.integrate(func, x)
+        func_indefinite_integral = None if numeric else self.pipeline.antiderivative(plan.timeout)
         # Calculate the definite integral from x_min to x_max
-        func_definite_integral = sp.integrate(func, (x, x_min, x_max))
-        
-        # Calculate the integral values
-        indef_int_vals = cumulative_trapezoid(y_vals_list[0], x_vals, initial=0)
-
-        # Update the result box with the original function, derivatives, and integral
-        derivative_text = ""
+        func_definite_integral = self.pipeline.definite_integral(x_min, x_max, plan.timeout, numeric)
+
+        # Simplify the function
+        simplified_func = func if numeric else self.pipeline.simplify(func, plan.timeout)
+        sections = [
+            ("function", details_header("Original Function:", first=True)
+             + details_body(expression_html("f(x) = ", simplified_func, "f(x) = "))),
+            ("derivatives", details_header("Derivatives:")),
+        ]
         for i in range(1, derivative_order + 1):
-            if i < derivative_order:
-                derivative_text += f"<b>Derivative [{i}]</b>:<br>  f^{i}(x) = {sp.simplify(derivatives[i])}<br><br>"
-            else:
-                derivative_text += f"<b>Derivative [{i}]</b>:<br>  f^{i}(x) = {sp.simplify(derivatives[i])}"
-
-        # Simplify the function and derivative text
-        simplified_func = sp.simplify(func)
-        simplified_indefinite_integral = sp.expand(func_indefinite_integral)
-        simplified_definite_integral = sp.simplify(func_definite_integral)
-
-        # Convert the expression to string and replace symbols
-        formatted_func = str(simplified_func).replace('**', '^').replace('*', '')
-        formatted_indefinite_integral = str(simplified_indefinite_integral).replace('**', '^').replace('*', '')
-        formatted_definite_integral = str(simplified_definite_integral).replace('**', '^').replace('*', '')
-
-        # Construct the derivative text similarly, if applicable
-        derivative_text = derivative_text.replace('**', '^').replace('*', '')
-
-        # Set the result box styles
-        self.result_box.setStyleSheet("QTextEdit { padding: 0px; margin: 0px; }")  # Remove padding and margin from QTextEdit
-
-        # Set the contents for result box with HTML styling
-        self.result_box.setHtml(
-            f"""
-            <div style="line-height: 1.6; color: #333; font-family: 'Roboto'; margin: 0; padding: 0;">
-                <!-- Original Function -->
-                <div style="color: #55557D; font-size: 26px; font-weight: bold; margin-bottom: 5px;">Original Function:</div>
-                <div style="color: #55557D; font-size: 22px; margin-left: 15px; margin-top: 0;">f(x) = {formatted_func}</div>
-
-                <!-- Derivatives -->
-                <div style="color: #55557D; font-size: 26px; font-weight: bold; margin-top: 15px; margin-bottom: 5px;">Derivatives:</div>
-                <div style="color: #55557D; margin-left: 15px; font-size: 22px; margin-top: 0;">{derivative_text}</div>
-
-                <!-- Indefinite Integral -->
-                <div style="color: #55557D; font-size: 26px; font-weight: bold; margin-top: 15px; margin-bottom: 5px;">Integral:</div>
-                <div style="color: #55557D; margin-left: 15px; font-size: 22px; margin-top: 0;">∫f(x)dx = {formatted_indefinite_integral} + C</div>
-
-                <!-- Definite Integral -->
-                <div style="color: #55557D; font-size: 26px; font-weight: bold; margin-top: 15px; margin-bottom: 5px;">Definite Integral:</div>
-                <div style="color: #55557D; margin-left: 15px; font-size: 22px; margin-top: 0;">∫<sub>{x_min}</sub><sup>{x_max}</sup> f(x) dx = {formatted_definite_integral}</div>
-            </div>
-            """
-        )
+            sections.append((f"derivative-{i}", details_body(
+                f"<b>Derivative [{i}]</b>:<br>{self.derivative_details(derivatives[i], i)}")))
+
+        if func_indefinite_integral is None:
+            integral_html = "∫f(x)dx: not attempted for a function this large"
+        elif func_indefinite_integral.has(sp.Integral) and plan.timeout:
+            integral_html = f"∫f(x)dx: no closed form found within {plan.timeout:g} s"
+        else:
+            if plan.timeout is None and not func_indefinite_integral.has(sp.Integral):
+                func_indefinite_integral = sp.expand(func_indefinite_integral)
+            integral_html = expression_html(r"\int f(x)\,dx = ", func_indefinite_integral, "∫f(x)dx = ", " + C")
+        sections.append(("integral", details_header("Integral:") + details_body(integral_html)))
+
+        definite_tex = rf"\int_{{{x_min}}}^{{{x_max}}} f(x)\,dx = "
+        definite_text = f"∫<sub>{x_min}</sub><sup>{x_max}</sup> f(x) dx = "
+        if func_definite_integral.is_Float:
+            value = f"{float(func_definite_integral):.12g}"
+            definite_html = math_html(definite_tex + value, definite_text + value)
+        else:
+            definite_html = expression_html(definite_tex, self.pipeline.simplify(func_definite_integral, plan.timeout),
+                                            definite_text)
+        sections.append(("definite", details_header("Definite Integral:") + details_body(definite_html)))
+
+        sections.append(("critical", details_header("Critical Points:")
+                         + details_body(self.critical_points_html(critical))))
+        sections.append(("method", details_body(f"Computed: {self.pipeline.plan(derivative_order).describe()}",
+                                                note=True)))
+        self.show_details(sections)
+
 
-        # Plot the original function and all derivatives
-        self.plot_widget.animate_plot(x_vals, y_vals_list, dy_vals_list, indef_int_vals)
+    # One derivative in Details; large ones are plotted but not simplified or shown
+    def derivative_details(self, derivative, order):
+        label = f"f<sup>({order})</sup>(x)"
+        if isinstance(derivative, sp.Derivative):
+            return f"{label}: evaluated numerically by automatic differentiation"
+        nodes = tree_stats(derivative, self.pipeline.x)[0]
+        if nodes > DERIVATIVE_NODES:
+            return f"{label}: not shown ({nodes} nodes, plotted numerically)"
+        simplified = self.pipeline.simplify(derivative, self.pipeline.plan(order).timeout)
+        return expression_html(f"f^{{({order})}}(x) = ", simplified, f"{label} = ")
+
+
+    # Show Details sections; MathTextEdit only re-lays out the ones that changed
+    def show_details(self, sections):
+        style = "QTextEdit { padding: 0px; margin: 0px; }"
+        if self.result_box.styleSheet() != style:
+            self.result_box.setStyleSheet(style)  # Remove padding and margin from QTextEdit
+        self.result_box.set_sections(sections)
 
 
     # Save current graph as image
     def save_plot(self):
         """Opens a file dialog to save the plot as an image."""
         options = QFileDialog.Options()
-        file_name, _ = QFileDialog.getSaveFileName(self, "Save Plot", "", "PNG Files (*.png);;JPEG Files (*.jpg);;All Files (*)", options=options)
+        tiled_filter = "PNG, Tiled 1200 DPI (*.png)"
+        file_name, selected_filter = QFileDialog.getSaveFileName(
+            self, "Save Plot", "",
+            f"PNG Files (*.png);;JPEG Files (*.jpg);;SVG Files (*.svg);;PDF Files (*.pdf);;{tiled_filter};;"
+            "CSV Data (*.csv);;NumPy Array (*.npy);;NumPy Archive (*.npz);;Parquet Data (*.parquet);;All Files (*)",
+            options=options)
         
         if file_name:
-            self.plot_widget.save_plot(file_name)
-            print(f"Plot saved as: {file_name}")
+            if selected_filter == tiled_filter:
+                self.export_plot(file_name, "tiled-png", dpi=1200)
+            else:
+                self.export_plot(file_name, format_from_file_name(file_name))
+
+
+    # Render a snapshot of the graph to disk in the background
+    def export_plot(self, file_name, fmt, dpi=300):
+        if fmt in DATA_FORMATS and self.rendered is None and self.rendered_quadrature is not None:
+            # The convergence table: one row per subinterval count
+            quadrature = self.rendered_quadrature
+            columns = [("n", quadrature.sizes), ("sum", quadrature.sums),
+                       ("error", np.abs(quadrature.sums - quadrature.reference))]
+            job = ExportJob(ArrayTable(columns), file_name, fmt)
+        elif fmt in DATA_FORMATS and self.rendered is None and self.rendered_series is not None:
+            series = self.rendered_series
+            columns = [("x", series.x_vals), ("f", series.f_vals)]
+            columns += [(f"T{order}", values) for order, values in sorted(series.polynomials.items())]
+            columns.append(("error", series.error))
+            job = ExportJob(ArrayTable(columns), file_name, fmt)
+        elif fmt in DATA_FORMATS and self.rendered is None and self.rendered_surface is not None:
+            # One row per mesh node
+            surface = self.rendered_surface
+            grid_x, grid_y = np.meshgrid(surface.x_vals, surface.y_vals)
+            columns = [("x", grid_x.ravel()), ("y", grid_y.ravel()), ("f", surface.z_vals.ravel()),
+                       ("fx", surface.fx_vals.ravel()), ("fy", surface.fy_vals.ravel())]
+            job = ExportJob(ArrayTable(columns), file_name, fmt)
+        elif fmt in DATA_FORMATS and self.rendered is None and self.rendered_curve is not None:
+            curve = self.rendered_curve
+            columns = [("x", curve.x_vals), ("y", curve.y_vals), ("dydx", curve.slope), ("curvature", curve.curvature)]
+            if curve.params is not None:
+                columns.insert(0, ("t", curve.params))
+            job = ExportJob(ArrayTable(columns), file_name, fmt)
+        elif fmt in DATA_FORMATS:
+            # Export the arrays behind the current graph, without re-evaluating
+            if self.rendered is None:
+                self.warning(warning="Plot a function before exporting its data.")
+                return
+            data = self.rendered[0]
+            num_points, ok = QInputDialog.getInt(
+                self, "Export Data", "Number of sample points:", len(data.x_vals), 2, 1_000_000_000)
+            if not ok:
+                return
+
+            if num_points == len(data.x_vals):
+                table = curve_columns(data.x_vals, data.y_vals_list, data.int_vals)
+            else:
+                # Larger tables are evaluated block by block while they are written
+                kernel = self.pipeline.compile_family(data.derivatives)
+                table = GridTable(kernel, float(data.x_vals[0]), float(data.x_vals[-1]), num_points,
+                                  workers=os.cpu_count() or 1)
+            job = ExportJob(table, file_name, fmt)
+        else:
+            job = ExportJob(self.plot_widget.snapshot(), file_name, fmt, dpi)
+
+        progress = QProgressDialog(f"Exporting {os.path.basename(file_name)}...", "Cancel", 0, 100, self)
+        progress.setWindowTitle("Save Plot")
+        progress.setWindowModality(Qt.NonModal)
+        progress.setMinimumDuration(500)
+        progress.canceled.connect(job.cancel)
+
+        def done():
+            progress.close()
+            self.export_jobs.remove(job)
+
+        job.signals.progress.connect(progress.setValue)
+        job.signals.finished.connect(lambda name: logger.info("Plot saved as: %s", name))
+        job.signals.failed.connect(lambda error: self.warning(warning=f"Could not save the plot.\n{error}"))
+        job.signals.finished.connect(done)
+        job.signals.failed.connect(done)
+        job.signals.cancelled.connect(done)
+
+        # Keep the job (and its signals) alive until it reports back
+        self.export_jobs.append(job)
+        self.export_pool.start(job)
+
+
+    # Input fields as typed, the key of a history entry
+    def current_inputs(self):
+        return {
+            "mode": self.plot_mode(),
+            "function": self.function_input.text(),
+            "x_min": self.x_min_entry.text(),
+            "x_max": self.x_max_entry.text(),
+            "order": self.derivative_input.text(),
+            "precision": self.precision_input.text(),
+        }
+
+
+    # Keep the plot just drawn (inputs, compacted figure data, Details) in the session history
+    def record_history(self):
+        snapshot = compact_snapshot(self.plot_widget.snapshot(finish_animation=False))
+        entry = HistoryEntry(self.current_inputs(), snapshot, self.result_box.toHtml())
+        if self.history.push(entry):
+            logger.debug("History: %d plots, %.1f MB", len(self.history), self.history.nbytes / 1e6)
+
+
+    # Show a past plot exactly as it was; nothing is parsed or sampled
+    def recall_history(self, entry):
+        if entry is None:
+            return
+        self.preview_timer.stop()
+        self.cancel_preview()
+        inputs = entry.inputs
+        modes = [mode[0] for mode in PLOT_MODES]
+        if inputs["mode"] in modes:
+            self.mode_selector.setCurrentIndex(modes.index(inputs["mode"]))
+        fields = [(self.function_input, "function"), (self.x_min_entry, "x_min"), (self.x_max_entry, "x_max"),
+                  (self.derivative_input, "order"), (self.precision_input, "precision")]
+        for field, name in fields:
+            # Setting the text must not start a live preview
+            field.blockSignals(True)
+            field.setText(inputs[name])
+            field.blockSignals(False)
+
+        self.plot_widget.profiler.reset()
+        self.plot_widget.show_snapshot(expand_snapshot(entry.snapshot))
+        self.result_box.setHtml(entry.details_html)
+        # The next Plot recomputes and redraws whatever it needs
+        self.rendered = None
+        self.rendered_curve = None
+        self.rendered_surface = None
+        self.rendered_series = None
+        self.rendered_quadrature = None
+        self.details_key = None
+
+
+    def undo_plot(self):
+        self.recall_history(self.history.undo())
+
+
+    def redo_plot(self):
+        self.recall_history(self.history.redo())
+
+
+    # Pick any plot of this session from a list, newest first
+    def show_history(self):
+        if not len(self.history):
+            QMessageBox.information(self, "History", "Nothing has been plotted yet.")
+            return
+        labels = [f"{i + 1}. {entry.describe()}" for i, entry in enumerate(self.history.entries)]
+        labels.reverse()
+        current = len(labels) - 1 - self.history.index
+        label, ok = QInputDialog.getItem(self, "History", "Show a previous plot:", labels, current, False)
+        if ok:
+            self.recall_history(self.history.recall(len(labels) - 1 - labels.index(label)))
+
+
+    def save_session(self):
+        if not len(self.history):
+            QMessageBox.information(self, "Save Session", "Nothing has been plotted yet.")
+            return
+        default_name = datetime.now().strftime("graphique-%Y%m%d-%H%M%S.session.npz")
+        file_name, _ = QFileDialog.getSaveFileName(self, "Save Session", default_name, "Graphique Sessions (*.npz)")
+        if not file_name:
+            return
+        try:
+            self.history.save(file_name)
+        except OSError as e:
+            self.warning(warning=f"Could not save the session:\n{e}")
+            return
+        logger.info("Session saved as: %s", file_name)
+
+
+    def load_session(self):
+        file_name, _ = QFileDialog.getOpenFileName(self, "Open Session", "", "Graphique Sessions (*.npz)")
+        if not file_name:
+            return
+        try:
+            self.history = SessionHistory.load(file_name)
+        except SessionError as e:
+            self.warning(warning=str(e))
+            return
+        self.recall_history(self.history.current)
+
+
+    # Save the recent log records kept by the ring buffer
+    def dump_diagnostics_log(self):
+        if applog.ring_buffer is None:
+            QMessageBox.information(self, "Diagnostics Log",
+                                    "The diagnostics buffer is disabled.\nStart the app with GRAPHIQUE_LOG_BUFFER=1000 to enable it.")
+            return
+
+        default_name = datetime.now().strftime("graphique-%Y%m%d-%H%M%S.log")
+        file_name, _ = QFileDialog.getSaveFileName(self, "Save Diagnostics Log", default_name, "Log Files (*.log);;All Files (*)")
+        if file_name:
+            applog.ring_buffer.dump_to_file(file_name)
+            logger.info("Diagnostics log saved as: %s", file_name)
 
 
     # Warning popup box
@@ -955,11 +1828,21 @@ class GraphiqueApp(QMainWindow):
         msg.setStandardButtons(QMessageBox.StandardButton.Ok)
         retval = msg.exec() 
 
+    def confirm(self, question):
+        msg = QMessageBox()
+        msg.setIcon(QMessageBox.Icon.Question)
+        msg.setText(question)
+        msg.setWindowTitle("Confirm")
+        msg.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        return msg.exec() == QMessageBox.StandardButton.Yes
+
 
 # Splash screen logic
 class SplashScreen(QWidget):
     def __init__(self):
         super().__init__()
+        # The main window, created on the first Start and reused afterwards
+        self.main = None
         self.load_custom_font()
         self.setWindowTitle("Welcome to Graphique")
         self.setWindowFlag(Qt.FramelessWindowHint)
@@ -979,9 +1862,9 @@ class SplashScreen(QWidget):
         splash_image = QPixmap(splash_path)
 
         if splash_image.isNull():
-            print(f"Failed to load image: {splash_path}")
+            logger.warning("Failed to load image: %s", splash_path)
         else:
-            print("Splash screen image loaded successfully.")
+            logger.debug("Splash screen image loaded successfully.")
 
         scaled_image = splash_image.scaled(window_width, window_height, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
 
@@ -1035,10 +1918,10 @@ class SplashScreen(QWidget):
     def load_custom_font(self):
         font_dir = asset_manager.load_asset("Assets/Fonts")
         if not font_dir or not os.path.exists(font_dir):
-            print(f"Font directory not found: {font_dir}")
+            logger.warning("Font directory not found: %s", font_dir)
             return
 
-        print(f"Loading fonts from: {font_dir}")
+        logger.debug("Loading fonts from: %s", font_dir)
         loaded_families = []
 
         # Use glob to find all .ttf files recursively
@@ -1048,17 +1931,17 @@ class SplashScreen(QWidget):
             font_id = QFontDatabase.addApplicationFont(font_path)
             if font_id != -1:
                 families = QFontDatabase.applicationFontFamilies(font_id)
-                print(f"Loaded font: {font_path} → {families}")
+                logger.debug("Loaded font: %s -> %s", font_path, families)
                 loaded_families.extend(families)
             else:
-                print(f"Failed to load font: {font_path}")
+                logger.warning("Failed to load font: %s", font_path)
 
         if loaded_families:
             font = QFont(loaded_families[6])
             QApplication.setFont(font)
-            print(f"Application font set to: {loaded_families[6]}")
+            logger.debug("Application font set to: %s", loaded_families[6])
         else:
-            print("No fonts were loaded.")
+            logger.warning("No fonts were loaded.")
 
 
     # Simple button animation
@@ -1081,11 +1964,23 @@ class SplashScreen(QWidget):
 
     # Splash screen show logic
     def launch_main(self):
-        self.close()
-        self.main = GraphiqueApp()
+        self.hide()
+        if self.main is None:
+            self.main = GraphiqueApp()
+            self.main.splash = self
         self.main.show()
 
 if __name__ == "__main__":
+    # Needed for the time-limited SymPy worker process in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
+
+    # Per-stage timings as JSON lines, for offline analysis
+    if os.environ.get("GRAPHIQUE_PERF_LOG"):
+        enable_perf_log(os.environ["GRAPHIQUE_PERF_LOG"])
+
+    # Start the time-limited SymPy worker now, so its imports are done before the first plot needs it
+    start_worker()
+
     app = QApplication(sys.argv)
     splash = SplashScreen()
     splash.show()
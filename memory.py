@@ -0,0 +1,224 @@
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+from matplotlib.figure import Figure
+from sympy.core import cache as sympy_cache
+from applog import get_logger
+
+logger = get_logger("memory")
+
+# -----------------------------------------------
+# Memory Diagnostics and Cache Limits
+# -----------------------------------------------
+
+# Set to a number of traceback frames (e.g. 1, or 10 for deeper call sites) to
+# trace allocations per plot; unset or 0 leaves tracemalloc off
+MEMORY_DIAGNOSTICS_ENV = "GRAPHIQUE_MEMORY_DIAGNOSTICS"
+
+# Samples kept by a tracker, and allocation sites listed per sample
+SAMPLES_KEPT = 200
+TOP_ALLOCATIONS = 10
+
+# Entries across all of SymPy's internal caches before they are cleared.
+# Each cached function keeps up to SYMPY_CACHE_SIZE (1000) results, some of
+# them whole derivative trees, so the total can reach hundreds of MB
+SYMPY_CACHE_ENTRIES = 20_000
+
+# Allocations inside these files are bookkeeping, not the app's memory
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>",
+                  "<unknown>")
+
+
+def sympy_cache_entries():
+    """Results held by all of SymPy's @cacheit caches together."""
+    return sum(func.cache_info().currsize for func in sympy_cache.CACHE)
+
+
+def live_figures():
+    """Matplotlib Figures that are still reachable (a full gc pass; diagnostics only)."""
+    gc.collect()
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, Figure))
+
+
+def artist_count(figure):
+    """Artists in a figure: axes, lines, collections, texts, annotations, ticks."""
+    return sum(1 for _ in figure.findobj()) if figure is not None else 0
+
+
+def rss_bytes():
+    """Resident set size of this process, or None where it cannot be read cheaply."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class Counters(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            counters = Counters()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+        except (OSError, AttributeError):
+            pass
+    return None
+
+
+def trim_caches(limit=SYMPY_CACHE_ENTRIES):
+    """
+    Clear SymPy's internal caches once they hold more than limit results.
+
+    The app keeps its own caches of everything it needs (pipeline stages,
+    kernels, parsed inputs), so clearing SymPy's only costs some repeated
+    work inside the next symbolic call.
+
+    Returns:
+        int: Entries dropped (0 if under the limit)
+    """
+    entries = sympy_cache_entries()
+    if entries <= limit:
+        return 0
+    sympy_cache.clear_cache()
+    logger.debug("Cleared %d SymPy cache entries", entries)
+    return entries
+
+
+class MemorySample:
+    """
+    Memory state after one plot.
+
+    Attributes:
+        label (str): What was plotted
+        traced_bytes (int): Python allocations tracemalloc sees (None when tracing is off)
+        peak_bytes (int): Highest traced_bytes since the previous sample
+        rss_bytes (int): Resident set size of the process, or None
+        figures (int): Reachable Matplotlib Figures
+        artists (int): Artists in the plot widget's figure
+        sympy_entries (int): Results in SymPy's caches
+        caches (dict): Name -> size of the app's own caches
+        growth (list): (allocation site, bytes, count) with the largest growth since the previous sample
+    """
+
+    def __init__(self, label, traced_bytes, peak_bytes, rss, figures, artists, sympy_entries, caches, growth):
+        self.label = label
+        self.timestamp = time.time()
+        self.traced_bytes = traced_bytes
+        self.peak_bytes = peak_bytes
+        self.rss_bytes = rss
+        self.figures = figures
+        self.artists = artists
+        self.sympy_entries = sympy_entries
+        self.caches = caches
+        self.growth = growth
+
+    def as_dict(self):
+        return {
+            "label": self.label, "time": self.timestamp, "traced_bytes": self.traced_bytes,
+            "peak_bytes": self.peak_bytes, "rss_bytes": self.rss_bytes, "figures": self.figures,
+            "artists": self.artists, "sympy_cache": self.sympy_entries, "caches": dict(self.caches),
+            "growth": [{"site": site, "bytes": size, "count": count} for site, size, count in self.growth],
+        }
+
+    def describe(self):
+        """A few aligned lines for the diagnostics report."""
+        def megabytes(value):
+            return "n/a" if value is None else f"{value / 1e6:.1f} MB"
+
+        lines = [f"{self.label}",
+                 f"  traced {megabytes(self.traced_bytes)} (peak {megabytes(self.peak_bytes)}), "
+                 f"RSS {megabytes(self.rss_bytes)}",
+                 f"  figures {self.figures}, artists {self.artists}, SymPy cache {self.sympy_entries}"]
+        if self.caches:
+            lines.append("  " + ", ".join(f"{name} {size}" for name, size in self.caches.items()))
+        for site, size, count in self.growth:
+            lines.append(f"  {size / 1024:+10.1f} KiB {count:+7d}  {site}")
+        return "\n".join(lines)
+
+
+class MemoryTracker:
+    """
+    Per-plot memory samples for long-running sessions.
+
+    With tracing on, every record() takes a tracemalloc snapshot and lists the
+    allocation sites that grew most since the previous one; only that one
+    previous snapshot is kept, so the tracker itself stays small. Without
+    tracing, samples still hold RSS, figure, artist and cache counts.
+    """
+
+    def __init__(self, frames=0, samples_kept=SAMPLES_KEPT, top=TOP_ALLOCATIONS):
+        self.frames = frames
+        self.top = top
+        self.samples = deque(maxlen=samples_kept)
+        self.previous = None
+        if frames and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    @classmethod
+    def from_environment(cls):
+        """A tracker configured by $GRAPHIQUE_MEMORY_DIAGNOSTICS, or None when it is unset."""
+        try:
+            frames = int(os.environ.get(MEMORY_DIAGNOSTICS_ENV, "0"))
+        except ValueError:
+            frames = 1
+        return cls(frames) if frames > 0 else None
+
+    @property
+    def tracing(self):
+        return bool(self.frames) and tracemalloc.is_tracing()
+
+    def record(self, label, figure=None, caches=None, count_figures=True):
+        """
+        Take a sample after a plot.
+
+        Args:
+            label (str): What was plotted, for the report
+            figure (Figure): The plot widget's figure, whose artists are counted
+            caches (dict): Name -> current size of the app's caches
+            count_figures (bool): Run the gc pass that counts live Figures
+
+        Returns:
+            MemorySample
+        """
+        traced = peak = None
+        growth = []
+        if self.tracing:
+            traced, peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, pattern) for pattern in _IGNORED_FILES])
+            if self.previous is not None:
+                for stat in snapshot.compare_to(self.previous, "lineno")[:self.top]:
+                    frame = stat.traceback[0]
+                    growth.append((f"{frame.filename}:{frame.lineno}", stat.size_diff, stat.count_diff))
+            self.previous = snapshot
+
+        sample = MemorySample(label, traced, peak, rss_bytes(), live_figures() if count_figures else None,
+                              artist_count(figure), sympy_cache_entries(), caches or {}, growth)
+        self.samples.append(sample)
+        logger.info("Memory after %s: traced=%s rss=%s figures=%s artists=%d sympy_cache=%d",
+                    label, traced, sample.rss_bytes, sample.figures, sample.artists, sample.sympy_entries)
+        return sample
+
+    def report(self, last=5):
+        """The last few samples, newest first, as text."""
+        if not self.samples:
+            return "No plots recorded yet."
+        return "\n\n".join(sample.describe() for sample in reversed(list(self.samples)[-last:]))
+
+    def stop(self):
+        if self.tracing:
+            tracemalloc.stop()
+        self.previous = None
@@ -0,0 +1,295 @@
+import math
+import re
+from functools import lru_cache
+import sympy as sp
+
+# -----------------------------------------------
+# Restricted Expression Parser
+# -----------------------------------------------
+
+# Parsed expressions kept per input text, so re-plotting, undo and the live
+# preview never parse the same text twice
+PARSE_CACHE_SIZE = 512
+
+# Input limits: text length, tokens, nesting depth
+MAX_LENGTH = 2000
+MAX_TOKENS = 1000
+MAX_DEPTH = 64
+
+# Largest |n| allowed in a literal integer power (x**n, 2**n) and the most
+# digits an exact integer power may produce (10**10**10 is refused)
+MAX_EXPONENT = 1000
+MAX_RESULT_DIGITS = 1000
+
+# Largest integer factorial(n) and gamma(n) will evaluate exactly
+MAX_FACTORIAL = 1000
+
+# name -> (SymPy function, fewest arguments, most arguments)
+FUNCTIONS = {
+    "sin": (sp.sin, 1, 1), "cos": (sp.cos, 1, 1), "tan": (sp.tan, 1, 1),
+    "cot": (sp.cot, 1, 1), "sec": (sp.sec, 1, 1), "csc": (sp.csc, 1, 1),
+    "asin": (sp.asin, 1, 1), "acos": (sp.acos, 1, 1), "atan": (sp.atan, 1, 1), "atan2": (sp.atan2, 2, 2),
+    "acot": (sp.acot, 1, 1), "asec": (sp.asec, 1, 1), "acsc": (sp.acsc, 1, 1),
+    "sinh": (sp.sinh, 1, 1), "cosh": (sp.cosh, 1, 1), "tanh": (sp.tanh, 1, 1),
+    "coth": (sp.coth, 1, 1), "sech": (sp.sech, 1, 1), "csch": (sp.csch, 1, 1),
+    "asinh": (sp.asinh, 1, 1), "acosh": (sp.acosh, 1, 1), "atanh": (sp.atanh, 1, 1),
+    "exp": (sp.exp, 1, 1), "log": (sp.log, 1, 2), "ln": (sp.log, 1, 1),
+    "sqrt": (sp.sqrt, 1, 1), "cbrt": (sp.cbrt, 1, 1), "root": (sp.root, 2, 2),
+    "abs": (sp.Abs, 1, 1), "Abs": (sp.Abs, 1, 1), "sign": (sp.sign, 1, 1),
+    "floor": (sp.floor, 1, 1), "ceiling": (sp.ceiling, 1, 1), "ceil": (sp.ceiling, 1, 1),
+    "Min": (sp.Min, 1, 32), "Max": (sp.Max, 1, 32), "min": (sp.Min, 1, 32), "max": (sp.Max, 1, 32),
+    "factorial": (sp.factorial, 1, 1), "gamma": (sp.gamma, 1, 1), "loggamma": (sp.loggamma, 1, 1),
+    "erf": (sp.erf, 1, 1), "erfc": (sp.erfc, 1, 1), "Heaviside": (sp.Heaviside, 1, 2),
+    "Si": (sp.Si, 1, 1), "Ci": (sp.Ci, 1, 1), "Ei": (sp.Ei, 1, 1), "li": (sp.li, 1, 1),
+    "sinc": (sp.sinc, 1, 1), "besselj": (sp.besselj, 2, 2), "bessely": (sp.bessely, 2, 2),
+}
+
+CONSTANTS = {"pi": sp.pi, "E": sp.E, "I": sp.I, "oo": sp.oo}
+
+# Variables a plain function of x may use; other modes pass their own
+FUNCTION_SYMBOLS = ("x",)
+
+_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z][A-Za-z0-9_]*)
+  | (?P<op>\*\*|[-+*/^(),])
+""", re.VERBOSE)
+
+
+class ParseError(sp.SympifyError):
+    """
+    The input is not an expression of the supported grammar, or exceeds a limit.
+
+    A SympifyError, so every caller that handled sympify failures handles
+    these too; it also knows which part of the text is at fault.
+    """
+
+    def __init__(self, message, text, start, end=None):
+        super().__init__(text)
+        self.message = message
+        self.text = text
+        self.start = start
+        self.end = max(end if end is not None else start + 1, start + 1)
+
+    def __str__(self):
+        return f"{self.message} (column {self.start + 1})"
+
+    def describe(self):
+        """The message with the input and a ^~~ marker under the offending span."""
+        return f"{self.message}\n{self.text}\n{' ' * self.start}^{'~' * (self.end - self.start - 1)}"
+
+
+def tokenize(text):
+    """
+    Split text into (kind, value, start, end) tokens.
+
+    Raises:
+        ParseError: On a character outside the grammar
+    """
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise ParseError(f"Unexpected character '{text[position]}'", text, position)
+        kind = match.lastgroup
+        if kind != "space":
+            tokens.append((kind, match.group(), match.start(), match.end()))
+            if len(tokens) > MAX_TOKENS:
+                raise ParseError(f"Expression is too long (more than {MAX_TOKENS} tokens)", text, match.start())
+        position = match.end()
+    tokens.append(("end", "", len(text), len(text)))
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent over the token list, building SymPy objects directly.
+
+        sum     := product (('+' | '-') product)*
+        product := unary (('*' | '/') unary)*
+        unary   := ('+' | '-') unary | power
+        power   := atom (('**' | '^') unary)?          (right associative)
+        atom    := number | name | name '(' sum (',' sum)* ')' | '(' sum ')'
+    """
+
+    def __init__(self, text, symbols=FUNCTION_SYMBOLS):
+        self.text = text
+        self.symbols = symbols
+        self.tokens = tokenize(text)
+        self.index = 0
+        self.depth = 0
+
+    def peek(self):
+        return self.tokens[self.index]
+
+    def advance(self):
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def error(self, message, token=None):
+        kind, value, start, end = token or self.peek()
+        return ParseError(message, self.text, start, end)
+
+    def expect(self, value):
+        token = self.peek()
+        if token[1] != value or token[0] == "end":
+            if self.juxtaposed(token):
+                raise self.error(f"Missing operator before '{token[1]}' (write * for multiplication)")
+            found = f"'{token[1]}'" if token[0] != "end" else "end of input"
+            raise self.error(f"Expected '{value}' but found {found}")
+        return self.advance()
+
+    def juxtaposed(self, token):
+        # "2x", "x(x + 1)", "(x)(x)": an operand right after another one
+        return token[0] in ("name", "number") or token[1] == "("
+
+    def parse(self):
+        if self.peek()[0] == "end":
+            raise self.error("Empty expression")
+        expr = self.sum()
+        token = self.peek()
+        if token[0] != "end":
+            if self.juxtaposed(token):
+                raise self.error(f"Missing operator before '{token[1]}' (write * for multiplication)")
+            raise self.error(f"Unexpected '{token[1]}'")
+        return expr
+
+    def nested(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise self.error(f"Expression is nested too deeply (more than {MAX_DEPTH} levels)")
+
+    def sum(self):
+        terms = [self.product()]
+        while self.peek()[1] in ("+", "-") and self.peek()[0] == "op":
+            op = self.advance()[1]
+            term = self.product()
+            terms.append(term if op == "+" else -term)
+        return sp.Add(*terms) if len(terms) > 1 else terms[0]
+
+    def product(self):
+        result = self.unary()
+        while self.peek()[1] in ("*", "/") and self.peek()[0] == "op":
+            op = self.advance()[1]
+            factor = self.unary()
+            result = result * factor if op == "*" else result / factor
+        return result
+
+    def unary(self):
+        token = self.peek()
+        if token[0] == "op" and token[1] in ("+", "-"):
+            self.advance()
+            self.nested()
+            operand = self.unary()
+            self.depth -= 1
+            return -operand if token[1] == "-" else operand
+        return self.power()
+
+    def power(self):
+        base = self.atom()
+        token = self.peek()
+        if token[0] == "op" and token[1] in ("**", "^"):
+            self.advance()
+            self.nested()
+            exponent_token = self.peek()
+            exponent = self.unary()
+            self.depth -= 1
+            self.check_power(base, exponent, exponent_token)
+            return base ** exponent
+        return base
+
+    def check_power(self, base, exponent, token):
+        # Refuse powers whose exact value or symbolic expansion would be enormous;
+        # only 0 and ±1 stay small under any exponent
+        if not exponent.is_Integer or base in (sp.S.Zero, sp.S.One, sp.S.NegativeOne):
+            return
+        if abs(int(exponent)) > MAX_EXPONENT:
+            raise self.error(f"Exponent is too large (limit {MAX_EXPONENT})", token)
+        if base.is_Rational:
+            # Digits of p**e / q**e together
+            digits = abs(int(exponent)) * (math.log10(abs(int(base.p))) + math.log10(int(base.q)))
+            if digits > MAX_RESULT_DIGITS:
+                raise self.error(f"Number is too large (more than {MAX_RESULT_DIGITS} digits)", token)
+
+    def atom(self):
+        token = self.advance()
+        kind, value, start, end = token
+        if kind == "number":
+            if len(value) > MAX_RESULT_DIGITS:
+                raise self.error("Number has too many digits", token)
+            if any(c in value for c in ".eE"):
+                return sp.Float(value)
+            return sp.Integer(value)
+        if kind == "name":
+            if self.peek()[1] == "(":
+                return self.call(token)
+            if value in CONSTANTS:
+                return CONSTANTS[value]
+            if value in FUNCTIONS:
+                raise self.error(f"'{value}' is a function; write {value}(...)", token)
+            if value not in self.symbols:
+                allowed = ", ".join(self.symbols) if self.symbols else "no variables"
+                raise self.error(f"Unknown variable '{value}' (this input takes {allowed})", token)
+            return sp.Symbol(value)
+        if value == "(":
+            self.nested()
+            expr = self.sum()
+            self.expect(")")
+            self.depth -= 1
+            return expr
+        if kind == "end":
+            raise self.error("Unexpected end of input", token)
+        raise self.error(f"Unexpected '{value}'", token)
+
+    def call(self, name_token):
+        name = name_token[1]
+        if name not in FUNCTIONS:
+            raise self.error(f"Unknown function '{name}'", name_token)
+        func, fewest, most = FUNCTIONS[name]
+        self.expect("(")
+        self.nested()
+        args = [self.sum()]
+        while self.peek()[1] == "," and self.peek()[0] == "op":
+            self.advance()
+            args.append(self.sum())
+        close = self.expect(")")
+        self.depth -= 1
+        if not fewest <= len(args) <= most:
+            expected = str(fewest) if fewest == most else f"{fewest} to {most}"
+            raise ParseError(f"{name}() takes {expected} argument(s), got {len(args)}",
+                             self.text, name_token[2], close[3])
+        if func in (sp.factorial, sp.gamma) and args[0].is_Integer and args[0] > MAX_FACTORIAL:
+            raise ParseError(f"{name}() argument is too large (limit {MAX_FACTORIAL})",
+                             self.text, name_token[2], close[3])
+        return func(*args)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_cached(text, symbols):
+    return _Parser(text, symbols).parse()
+
+
+def parse_text(text, symbols=FUNCTION_SYMBOLS):
+    """
+    Parse calculus input into a SymPy expression without eval().
+
+    Only numbers, the variables in symbols, the constants in CONSTANTS,
+    + - * / ** ^, parentheses and the functions in FUNCTIONS are accepted;
+    anything else is a ParseError pointing at the offending span. Results
+    are cached per text and symbols.
+
+    Args:
+        text (str): The input
+        symbols (tuple): Names usable as variables, e.g. ("x", "y")
+
+    Raises:
+        ParseError: If the text is empty, malformed or over a limit
+    """
+    if text is None or not text.strip():
+        raise ParseError("Empty expression", text or "", 0)
+    if len(text) > MAX_LENGTH:
+        raise ParseError(f"Expression is too long (more than {MAX_LENGTH} characters)", text, MAX_LENGTH)
+    return _parse_cached(text, tuple(symbols))
@@ -0,0 +1,596 @@
+import math
+import threading
+import numpy as np
+import sympy as sp
+from scipy.integrate import cumulative_trapezoid
+from compute import SAMPLE_COUNT, PlotData, check_cancelled, compile_function, parse_expression
+from kernels import compile_kernel, default_backend, resolve_backend
+from profiling import Profiler
+from precision import compile_mpmath, sample_precise
+from analysis import find_critical_points
+from series import SERIES_SHOWN, SeriesData, horner
+from quadrature import reference_integral
+from complexity import SymbolicTimeout, estimate_cost, run_with_timeout
+from autodiff import TaylorFamily, TaylorKernel, compile_derivative
+
+# -----------------------------------------------
+# Dependency-Tracked Compute Pipeline
+# -----------------------------------------------
+
+class Pipeline:
+    """
+    Incremental version of the plot computation.
+
+    Every stage keeps its last output together with the inputs it was built
+    from, and is only recomputed when those inputs change:
+
+        parse -> derivative chain -> compile -> sample -> cumulative integral
+        parse -> antiderivative -> definite integral
+        sample (f, f', f'') -> critical points
+        derivative chain -> Taylor coefficients -> Taylor polynomials
+        parse -> cost estimate (per derivative order) -> strategy
+
+    All curves missing from the sample cache are compiled into one kernel
+    (a fused CSE NumPy kernel, or numexpr/numba when selected and installed)
+    and evaluated in a single pass. Once the antiderivative is known and
+    has no singularity on the grid, it joins that kernel and the running
+    integral becomes F(x) - F(x_min) instead of a trapezoid sum.
+
+    Changing only the x-range therefore costs one resample of each curve plus
+    one definite-integral evaluation, and raising the derivative order only
+    differentiates, compiles and samples the new orders.
+
+    The cost estimate (see complexity.py) decides how the symbolic stages
+    run: derivatives whose trees would explode are sampled by Taylor-mode AD
+    as unevaluated sp.Derivative placeholders, and simplify/integrate either
+    run unrestricted, in the worker process with a time limit, or not at all.
+
+    The pipeline is shared by the live preview worker and the GUI thread, so
+    every public method holds a re-entrant lock.
+    """
+
+    def __init__(self, num_points=SAMPLE_COUNT, backend=None):
+        self.num_points = num_points
+        # Evaluation backend for the sampled curves (see kernels.BACKENDS)
+        self.backend = resolve_backend(backend or default_backend())
+        self.x = sp.Symbol('x')
+        self.lock = threading.RLock()
+
+        # Per-job stage timings, cache hits and evaluation counts
+        self.profiler = Profiler("pipeline")
+
+        self.func_str = None
+        self.func = None
+        self._reset_function_stages()
+
+    def _reset_function_stages(self):
+        # Everything derived from the parsed function
+        self.derivative_chain = []
+        self.antiderivative_expr = None
+        self.compiled = {}
+        self.fused = {}
+        self.compiled32 = {}
+        self.compiled_mp = {}
+        self.simplified = {}
+        # Derivative order -> complexity.CostEstimate
+        self.plans = {}
+        # Expansion point -> Taylor coefficients c_0 ... c_n found so far
+        self.taylor = {}
+        self._reset_grid_stages()
+
+    def _reset_grid_stages(self):
+        # Everything derived from the sample grid
+        self.grid_key = None
+        self.x_vals = None
+        self.samples = {}
+        self.int_key = None
+        self.int_vals = None
+        self.definite_key = None
+        self.definite_value = None
+        self.plot_data_key = None
+        self.plot_data = None
+        self.critical_key = None
+        self.critical = None
+        # (expansion point, order) -> Taylor polynomial on the grid
+        self.polynomials = {}
+
+    def parse(self, func_str):
+        """
+        Parse the function text, reusing the previous expression if the text is unchanged.
+
+        Raises:
+            sp.SympifyError: If the text is not a valid expression
+        """
+        with self.lock:
+            if func_str != self.func_str:
+                with self.profiler.stage('parse'):
+                    func, _ = parse_expression(func_str)
+                if func != self.func:
+                    self.func = func
+                    self._reset_function_stages()
+                self.func_str = func_str
+            return self.func
+
+    def derivatives(self, derivative_order, cancel_event=None):
+        """Return [f, f', ..., f^(n)], extending the cached chain only as far as needed."""
+        with self.lock:
+            if not self.derivative_chain:
+                self.derivative_chain = [self.func]
+            while len(self.derivative_chain) <= derivative_order:
+                check_cancelled(cancel_event)
+                with self.profiler.stage('diff'):
+                    self.derivative_chain.append(sp.diff(self.derivative_chain[-1], self.x))
+            return self.derivative_chain[:max(derivative_order, 0) + 1]
+
+    def plan(self, derivative_order=0):
+        """Return the complexity.CostEstimate for the current function up to derivative_order, estimated once."""
+        with self.lock:
+            estimate = self.plans.get(derivative_order)
+            if estimate is None:
+                with self.profiler.stage('estimate_cost'):
+                    estimate = estimate_cost(self.func, self.x, derivative_order)
+                self.plans[derivative_order] = estimate
+            else:
+                self.profiler.count('cache_hits')
+            return estimate
+
+    def curves(self, derivative_order, cancel_event=None, dps=None):
+        """
+        Return the expressions sampled for f, f', ..., f^(n).
+
+        These are the symbolic derivatives, except under the autodiff strategy
+        where f' ... f^(n) are sp.Derivative placeholders that are never
+        expanded (mpmath refinement needs real expressions, so not with dps).
+        """
+        with self.lock:
+            if not dps and self.plan(derivative_order).strategy == "autodiff":
+                return [self.func] + [sp.Derivative(self.func, (self.x, k)) for k in range(1, derivative_order + 1)]
+            return self.derivatives(derivative_order, cancel_event)
+
+    def _symbolic(self, stage_name, func, args, timeout):
+        # Run a SymPy call, in the shared worker process that is stopped after timeout seconds if one is given
+        with self.profiler.stage(stage_name):
+            if timeout is None:
+                return func(*args)
+            try:
+                return run_with_timeout(func, args, timeout)
+            except SymbolicTimeout:
+                self.profiler.count('symbolic_timeouts')
+                return None
+
+    def antiderivative(self, timeout=None):
+        """
+        Return the symbolic indefinite integral of the current function.
+
+        Args:
+            timeout (float): Give up after this many seconds; the result is then
+                the unevaluated sp.Integral
+        """
+        with self.lock:
+            if self.antiderivative_expr is None:
+                result = self._symbolic('integrate', sp.integrate, (self.func, self.x), timeout)
+                self.antiderivative_expr = result if result is not None else sp.Integral(self.func, self.x)
+            else:
+                self.profiler.count('cache_hits')
+            return self.antiderivative_expr
+
+    def compile(self, expr):
+        """Return the vectorized callable for an expression, compiling it once."""
+        with self.lock:
+            func = self.compiled.get(expr)
+            if func is None:
+                with self.profiler.stage('compile'):
+                    if isinstance(expr, sp.Derivative):
+                        func = compile_derivative(expr, self.x)
+                    else:
+                        func = compile_function(expr, self.x)
+                self.compiled[expr] = func
+            else:
+                self.profiler.count('cache_hits')
+            return func
+
+    def compile_family(self, exprs):
+        """Return the kernel (fused CSE or JIT backend) for a tuple of expressions, compiling it once."""
+        with self.lock:
+            exprs = tuple(exprs)
+            kernel = self.fused.get(exprs)
+            if kernel is None:
+                if any(isinstance(expr, sp.Derivative) for expr in exprs):
+                    # AD placeholders: one Taylor pass, the rest through a plain kernel
+                    kernel = TaylorFamily(exprs, self.x, self.compile_family)
+                else:
+                    with self.profiler.stage('compile'):
+                        kernel = compile_kernel(exprs, self.x, self.backend)
+                self.fused[exprs] = kernel
+            else:
+                self.profiler.count('cache_hits')
+            return kernel
+
+    def simplify(self, expr, timeout=None):
+        """
+        Return sp.simplify(expr), cached per expression.
+
+        Args:
+            timeout (float): Give up after this many seconds and keep expr as it is
+        """
+        with self.lock:
+            result = self.simplified.get(expr)
+            if result is None:
+                result = self._symbolic('simplify', sp.simplify, (expr,), timeout)
+                if result is None:
+                    result = expr
+                self.simplified[expr] = result
+            else:
+                self.profiler.count('cache_hits')
+            return result
+
+    def grid(self, x_min, x_max, x_vals=None):
+        """
+        Return the sample grid for [x_min, x_max].
+
+        Args:
+            x_vals (np.ndarray): Use this array as the grid instead of building one
+                (OverlayPipeline shares a single grid between its functions)
+        """
+        with self.lock:
+            key = (x_min, x_max, self.num_points)
+            if key != self.grid_key:
+                self._reset_grid_stages()
+                self.grid_key = key
+                self.x_vals = x_vals if x_vals is not None else np.linspace(x_min, x_max, self.num_points)
+            return self.x_vals
+
+    def compile32(self, expr):
+        """Return the float32 callable used to estimate float64 rounding error, compiling it once."""
+        with self.lock:
+            func = self.compiled32.get(expr)
+            if func is None:
+                with self.profiler.stage('compile'):
+                    func = compile_function(expr, self.x, dtype=np.float32)
+                self.compiled32[expr] = func
+            else:
+                self.profiler.count('cache_hits')
+            return func
+
+    def compile_mp(self, expr):
+        """Return the mpmath callable for an expression, compiling it once."""
+        with self.lock:
+            func = self.compiled_mp.get(expr)
+            if func is None:
+                with self.profiler.stage('compile_mp'):
+                    func = compile_mpmath(expr, self.x)
+                self.compiled_mp[expr] = func
+            return func
+
+    def sample(self, x_min, x_max, derivative_order, cancel_event=None, dps=None, prefetched=None):
+        """
+        Sample the function and its derivatives on [x_min, x_max].
+
+        Args:
+            dps (int): If given, ill-conditioned points are re-evaluated with
+                mpmath at this many significant digits
+            prefetched (dict): Expression -> values already evaluated on this grid
+                (by OverlayPipeline's batched kernel); these are not evaluated again
+
+        Returns:
+            PlotData: The same object as the previous call if no input changed
+        """
+        with self.lock:
+            key = (x_min, x_max, derivative_order, dps)
+            if key == self.plot_data_key and self.plot_data is not None:
+                self.profiler.count('cache_hits')
+                return self.plot_data
+
+            derivatives = self.curves(derivative_order, cancel_event, dps)
+            x_vals = self.grid(x_min, x_max)
+
+            # The antiderivative is only worth evaluating once something else needed it
+            exact_integral = None
+            int_key = (self.grid_key, dps)
+            if self.int_key != int_key and self.antiderivative_expr is not None \
+                    and self._can_use_antiderivative(self.antiderivative_expr, x_min, x_max):
+                exact_integral = self.antiderivative_expr
+
+            missing = [expr for expr in derivatives if (expr, dps) not in self.samples]
+            evaluated = {expr: prefetched[expr] for expr in missing if prefetched and expr in prefetched}
+            unevaluated = [expr for expr in missing if expr not in evaluated]
+            family = unevaluated + ([exact_integral] if exact_integral is not None else [])
+            if family:
+                check_cancelled(cancel_event)
+                values = self._evaluate_family(family, x_vals, exact_integral is not None)
+                if values is None:
+                    # Not every antiderivative has a NumPy kernel (Si, li, ...)
+                    exact_integral = None
+                    family = unevaluated
+                    values = self._evaluate_family(family, x_vals, False) if family else []
+                self.profiler.count('evaluations', len(x_vals) * len(family))
+                evaluated.update(zip(unevaluated, values))
+
+            for expr in missing:
+                y_vals = evaluated[expr]
+                check_cancelled(cancel_event)
+                if dps:
+                    func_mp = self.compile_mp(expr)
+                    func32 = self.compile32(expr)
+                    with self.profiler.stage('sample_precise'):
+                        y_vals, mask = sample_precise(expr, self.x, x_vals, y_vals, dps, func_mp, func32=func32)
+                    self.profiler.count('precise_points', int(mask.sum()))
+                with np.errstate(all='ignore'):
+                    dy_vals = np.gradient(y_vals, x_vals)
+                self.samples[(expr, dps)] = (y_vals, dy_vals)
+
+            if exact_integral is not None and np.all(np.isfinite(values[-1])):
+                self.int_vals = values[-1] - values[-1][0]
+                self.int_key = int_key
+            self.profiler.count('cache_hits', len(derivatives) - len(missing))
+
+            y_vals_list = [self.samples[(expr, dps)][0] for expr in derivatives]
+            dy_vals_list = [self.samples[(expr, dps)][1] for expr in derivatives]
+
+            check_cancelled(cancel_event)
+            int_vals = self.cumulative_integral(x_vals, y_vals_list[0], dps)
+
+            self.plot_data = PlotData(derivatives, x_vals, y_vals_list, dy_vals_list, int_vals)
+            self.plot_data_key = key
+            return self.plot_data
+
+    def critical_points(self, x_min, x_max, cancel_event=None):
+        """
+        Roots, extrema and inflection points of the current function on [x_min, x_max].
+
+        Reuses the sampled f, f' and f'' when they are already cached (any plotted
+        derivative order of at least two) and samples only what is missing.
+
+        Returns:
+            analysis.CriticalPoints
+        """
+        with self.lock:
+            x_vals = self.grid(x_min, x_max)
+            if self.critical_key == self.grid_key and self.critical is not None:
+                self.profiler.count('cache_hits')
+                return self.critical
+
+            derivatives = self.curves(2, cancel_event)
+            funcs = [self.compile(expr) for expr in derivatives]
+            samples = []
+            for expr, func in zip(derivatives, funcs):
+                sample = self.samples.get((expr, None))
+                if sample is None:
+                    with self.profiler.stage('sample'):
+                        samples.append(func(x_vals))
+                    self.profiler.count('evaluations', len(x_vals))
+                else:
+                    self.profiler.count('cache_hits')
+                    samples.append(sample[0])
+
+            with self.profiler.stage('critical_points'):
+                self.critical = find_critical_points(funcs, x_vals, samples, cancel_event)
+            self.profiler.count('critical_points', len(self.critical))
+            self.critical_key = self.grid_key
+            return self.critical
+
+    def taylor_coefficients(self, center, order, cancel_event=None):
+        """
+        Return c_0 ... c_order of the Taylor series about center, c_k = f^(k)(center) / k!.
+
+        Coefficients already found for this center are kept; raising the order
+        only differentiates and evaluates the new derivatives, all of them at
+        once through one kernel (or one Taylor-mode AD pass under the autodiff
+        strategy).
+        """
+        with self.lock:
+            coefficients = self.taylor.setdefault(center, [])
+            if len(coefficients) > order:
+                self.profiler.count('cache_hits')
+                return coefficients[:order + 1]
+
+            center_vals = np.array([float(center)])
+            if self.plan(order).strategy == "autodiff":
+                # One Taylor pass at the center gives every order at once
+                check_cancelled(cancel_event)
+                with self.profiler.stage('taylor_coefficients'):
+                    values = TaylorKernel(self.func, self.x, order)(center_vals)[len(coefficients):]
+            else:
+                new = self.derivatives(order, cancel_event)[len(coefficients):]
+                check_cancelled(cancel_event)
+                with self.profiler.stage('taylor_coefficients'):
+                    values = self.compile_family(new)(center_vals)
+            for value in values:
+                coefficients.append(float(value[0]) / math.factorial(len(coefficients)))
+            self.profiler.count('evaluations', len(values))
+            return list(coefficients)
+
+    def series(self, x_min, x_max, center, order, cancel_event=None):
+        """
+        Taylor polynomials of the current function about center on [x_min, x_max].
+
+        Each polynomial is evaluated with Horner's scheme once per grid and
+        kept, so stepping the order up costs one new coefficient and one Horner
+        pass, and stepping it back down costs nothing.
+
+        Returns:
+            series.SeriesData: The highest SERIES_SHOWN orders up to order, and
+                the error of the highest one
+        """
+        with self.lock:
+            f_vals = self.sample(x_min, x_max, 0, cancel_event).y_vals_list[0]
+            x_vals = self.x_vals
+            coefficients = self.taylor_coefficients(center, order, cancel_event)
+
+            polynomials = {}
+            for n in range(max(order - SERIES_SHOWN + 1, 0), order + 1):
+                values = self.polynomials.get((center, n))
+                if values is None:
+                    check_cancelled(cancel_event)
+                    with self.profiler.stage('horner'):
+                        values = horner(coefficients[:n + 1], x_vals - center)
+                    self.profiler.count('evaluations', len(x_vals))
+                    self.polynomials[(center, n)] = values
+                else:
+                    self.profiler.count('cache_hits')
+                polynomials[n] = values
+
+            with np.errstate(invalid='ignore'):
+                error = np.abs(f_vals - polynomials[order])
+            return SeriesData(center, order, coefficients, x_vals, f_vals, polynomials, error)
+
+    def _evaluate_family(self, family, x_vals, has_antiderivative):
+        # Returns None instead of raising when the trailing antiderivative may be at fault
+        kernel = self.compile_family(family)
+        try:
+            with self.profiler.stage('sample'):
+                return kernel(x_vals)
+        except (NameError, TypeError):
+            if not has_antiderivative:
+                raise
+            return None
+
+    def cumulative_integral(self, x_vals, y_vals, dps=None):
+        with self.lock:
+            key = (self.grid_key, dps)
+            if self.int_key != key or self.int_vals is None:
+                with self.profiler.stage('cumulative_integral'):
+                    self.int_vals = cumulative_trapezoid(y_vals, x_vals, initial=0)
+                self.int_key = key
+            else:
+                self.profiler.count('cache_hits')
+            return self.int_vals
+
+    def definite_integral(self, x_min, x_max, timeout=None, numeric=False):
+        """
+        Integrate the current function over [x_min, x_max].
+
+        Uses the cached antiderivative when the function has no singularity in
+        the interval, falling back to a full sp.integrate otherwise.
+
+        Args:
+            timeout (float): Limit for each symbolic integration; past it the
+                value comes from adaptive quadrature instead
+            numeric (bool): Skip the symbolic work and use quadrature directly
+
+        Returns:
+            sp.Expr: The exact value, or an sp.Float from quadrature
+        """
+        with self.lock:
+            key = (x_min, x_max, numeric)
+            if key == self.definite_key:
+                self.profiler.count('cache_hits')
+                return self.definite_value
+
+            value = None
+            if not numeric:
+                antiderivative = self.antiderivative(timeout)
+                with self.profiler.stage('definite_integral'):
+                    if self._can_use_antiderivative(antiderivative, x_min, x_max):
+                        value = antiderivative.subs(self.x, x_max) - antiderivative.subs(self.x, x_min)
+                    elif timeout is not None and antiderivative.has(sp.Integral):
+                        # The indefinite integral already ran out of time; the definite one will too
+                        value = None
+                    else:
+                        value = self._symbolic('integrate', sp.integrate, (self.func, (self.x, x_min, x_max)), timeout)
+            if value is None:
+                with self.profiler.stage('quad'):
+                    value = sp.Float(reference_integral(self.compile(self.func), x_min, x_max))
+
+            self.definite_key = key
+            self.definite_value = value
+            return value
+
+    def _can_use_antiderivative(self, antiderivative, x_min, x_max):
+        if antiderivative.has(sp.Integral):
+            return False
+        if self.func.is_polynomial(self.x):
+            return True
+        try:
+            return not sp.singularities(self.func, self.x, sp.Interval(x_min, x_max))
+        except (NotImplementedError, TypeError, ValueError):
+            return False
+
+
+# -----------------------------------------------
+# Several Functions on One Grid
+# -----------------------------------------------
+
+class OverlayPipeline:
+    """
+    Sample several functions together, each with its own derivatives and integral.
+
+    The first function is the app's primary Pipeline (Details, critical points,
+    export); every further function gets its own Pipeline, kept while it stays
+    in the list. All of them share one x grid, and every curve missing from
+    their caches is compiled into one kernel and evaluated in a single pass
+    before each Pipeline assembles its PlotData.
+    """
+
+    def __init__(self, primary):
+        self.primary = primary
+        self.lock = primary.lock
+        self.children = {}
+        self.kernels = {}
+
+    def pipeline_for(self, index, func_str):
+        if index == 0:
+            return self.primary
+        child = self.children.get(func_str)
+        if child is None:
+            child = Pipeline(self.primary.num_points, self.primary.backend)
+            child.lock = self.lock
+            # Overlaid functions count towards the same job profile
+            child.profiler = self.primary.profiler
+            self.children[func_str] = child
+        return child
+
+    def compile_batch(self, exprs):
+        """Return the kernel for a tuple of expressions from several functions, compiling it once."""
+        kernel = self.kernels.get(exprs)
+        if kernel is None:
+            with self.primary.profiler.stage('compile'):
+                kernel = compile_kernel(exprs, self.primary.x, self.primary.backend)
+            self.kernels = {exprs: kernel}
+        else:
+            self.primary.profiler.count('cache_hits')
+        return kernel
+
+    def sample(self, func_strs, x_min, x_max, derivative_order, cancel_event=None, dps=None):
+        """
+        Sample every function in func_strs on one shared grid.
+
+        Raises:
+            sp.SympifyError: If any of the texts is not a valid expression
+
+        Returns:
+            list: One PlotData per function, in order
+        """
+        with self.lock:
+            pipelines = []
+            for index, func_str in enumerate(func_strs):
+                pipeline = self.pipeline_for(index, func_str)
+                pipeline.parse(func_str)
+                pipelines.append(pipeline)
+            # Functions no longer in the list release their caches
+            for func_str in list(self.children):
+                if func_str not in func_strs[1:]:
+                    del self.children[func_str]
+
+            x_vals = self.primary.grid(x_min, x_max)
+            missing = {}
+            for pipeline in pipelines:
+                pipeline.grid(x_min, x_max, x_vals)
+                for expr in pipeline.curves(derivative_order, cancel_event, dps):
+                    # AD placeholders are left to their own pipeline's Taylor pass
+                    if (expr, dps) not in pipeline.samples and not isinstance(expr, sp.Derivative):
+                        missing[expr] = None
+
+            # One kernel for the whole batch; a term shared by two functions
+            # (or a function that is another's derivative) is evaluated once
+            prefetched = {}
+            if len(pipelines) > 1 and missing:
+                check_cancelled(cancel_event)
+                exprs = tuple(missing)
+                kernel = self.compile_batch(exprs)
+                with self.primary.profiler.stage('sample'):
+                    prefetched = dict(zip(exprs, kernel(x_vals)))
+                self.primary.profiler.count('evaluations', len(x_vals) * len(exprs))
+
+            return [pipeline.sample(x_min, x_max, derivative_order, cancel_event, dps, prefetched)
+                    for pipeline in pipelines]
@@ -0,0 +1,118 @@
+import numpy as np
+import sympy as sp
+import mpmath
+from compute import compile_function
+
+# -----------------------------------------------
+# Arbitrary-Precision Evaluation
+# -----------------------------------------------
+
+# Relative (to the curve's scale) float64 error above which a point is re-evaluated
+DEFAULT_TOLERANCE = 1e-9
+
+# Neighbours re-evaluated on each side of a flagged point, to avoid visible seams
+DILATION = 2
+
+EPS_RATIO = np.finfo(np.float64).eps / np.finfo(np.float32).eps
+
+
+def compile_mpmath(expr, x):
+    """
+    Compile a SymPy expression into an mpmath function of one mpf argument.
+
+    The expression tree is translated once; evaluating a point is then a plain
+    Python call instead of a subs().evalf() tree walk.
+    """
+    return sp.lambdify(x, expr, modules='mpmath')
+
+
+def evaluate_mpmath(func_mp, x_vals, dps):
+    """
+    Evaluate an mpmath-compiled function at every x with dps significant digits.
+
+    The working precision is set once for the whole batch.
+
+    Returns:
+        np.ndarray: float64 results; complex or undefined points are NaN
+    """
+    y_vals = np.empty(len(x_vals), dtype=np.float64)
+    with mpmath.workdps(dps):
+        for i, x_val in enumerate(x_vals.tolist()):
+            try:
+                value = func_mp(mpmath.mpf(x_val))
+                if isinstance(value, mpmath.mpc):
+                    value = value.real if abs(value.imag) <= abs(value) * mpmath.mpf(10) ** (-dps // 2) else mpmath.nan
+                y_vals[i] = float(value)
+            except (ZeroDivisionError, ValueError, TypeError, OverflowError):
+                y_vals[i] = np.nan
+    return y_vals
+
+
+def ill_conditioned_mask(expr, x, x_vals, y_vals, tolerance=DEFAULT_TOLERANCE, func32=None):
+    """
+    Flag grid points where float64 evaluation has likely lost too many digits.
+
+    The expression is also evaluated in float32. Rounding error grows with
+    the same cancellation in both precisions, so |f32 - f64| scaled by the
+    ratio of the two machine epsilons estimates the float64 error. Points
+    whose estimate exceeds tolerance times the curve's magnitude are flagged,
+    and so are points where float64 overflows to +-inf, which higher
+    precision may bring back to a finite value. NaN points are left alone.
+
+    Args:
+        expr (sp.Expr): The expression
+        x (sp.Symbol): The independent variable
+        x_vals (np.ndarray): The grid
+        y_vals (np.ndarray): float64 values on the grid
+        tolerance (float): Acceptable error relative to the curve's scale
+        func32 (callable): A cached compile_function(expr, x, dtype=np.float32), if available
+
+    Returns:
+        np.ndarray: Boolean mask, dilated by DILATION points on each side
+    """
+    func32 = func32 or compile_function(expr, x, dtype=np.float32)
+    y32 = func32(x_vals).astype(np.float64)
+    finite = np.isfinite(y_vals)
+    if not finite.any():
+        return np.zeros(len(x_vals), dtype=bool)
+
+    scale = np.max(np.abs(y_vals[finite]))
+    with np.errstate(all='ignore'):
+        error = np.abs(y32 - y_vals) * EPS_RATIO
+    # float32 overflow or underflow says nothing about float64, so it is not flagged
+    comparable = finite & np.isfinite(y32)
+    mask = comparable & (error > tolerance * max(scale, np.finfo(np.float64).tiny))
+    # Overflow to inf in float64 may be recoverable at higher precision
+    mask |= np.isinf(y_vals)
+
+    if DILATION and mask.any():
+        kernel = np.ones(2 * DILATION + 1)
+        mask = np.convolve(mask.astype(float), kernel, mode='same') > 0
+    return mask
+
+
+def sample_precise(expr, x, x_vals, y_vals, dps, func_mp=None, tolerance=DEFAULT_TOLERANCE, func32=None):
+    """
+    Refine a float64 sample with mpmath, only where it is ill-conditioned.
+
+    Args:
+        expr (sp.Expr): The expression
+        x (sp.Symbol): The independent variable
+        x_vals (np.ndarray): The grid
+        y_vals (np.ndarray): float64 values on the grid
+        dps (int): Significant digits for the mpmath evaluation
+        func_mp (callable): A cached compile_mpmath(expr, x), if available
+        tolerance (float): See ill_conditioned_mask
+        func32 (callable): See ill_conditioned_mask
+
+    Returns:
+        tuple: (refined values, boolean mask of re-evaluated points)
+    """
+    mask = ill_conditioned_mask(expr, x, x_vals, y_vals, tolerance, func32)
+    if not mask.any():
+        return y_vals, mask
+
+    func_mp = func_mp or compile_mpmath(expr, x)
+    refined = y_vals.copy()
+    refined[mask] = evaluate_mpmath(func_mp, x_vals[mask], dps)
+    return refined, mask
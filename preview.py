@@ -0,0 +1,69 @@
+import threading
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+from compute import JobCancelled, check_cancelled
+
+# -----------------------------------------------
+# Background Preview Jobs
+# -----------------------------------------------
+
+class PreviewSignals(QObject):
+    # (job id, list of PlotData, one per function)
+    finished = pyqtSignal(int, object)
+    # (job id, error message)
+    failed = pyqtSignal(int, str)
+
+
+class PreviewJob(QRunnable):
+    """
+    Parse and sample the current inputs on a worker thread.
+
+    Only the fast vectorized path runs here; the symbolic Details work stays
+    on the explicit Plot. A cancelled job stops at the next stage boundary
+    and never emits a result. Stages are shared with the Plot button through
+    the app's OverlayPipeline, so a preview warms the cache for the next plot.
+    """
+
+    def __init__(self, job_id, pipeline, func_strs, x_min, x_max, derivative_order, dps=None):
+        super().__init__()
+        self.job_id = job_id
+        self.pipeline = pipeline
+        self.func_strs = func_strs
+        self.x_min = x_min
+        self.x_max = x_max
+        self.derivative_order = derivative_order
+        self.dps = dps
+        self.cancel_event = threading.Event()
+        self.signals = PreviewSignals()
+        # Pipeline profiler snapshot, filled in when the job completes
+        self.profile = None
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def run(self):
+        try:
+            check_cancelled(self.cancel_event)
+            with self.pipeline.lock:
+                # Plot may have cancelled this job while it waited for the pipeline
+                check_cancelled(self.cancel_event)
+                profiler = self.pipeline.primary.profiler
+                profiler.reset()
+                # Jobs predicted to be slow are left to an explicit, confirmed Plot
+                self.pipeline.primary.parse(self.func_strs[0])
+                if self.pipeline.primary.plan(self.derivative_order).expensive:
+                    return
+                data = self.pipeline.sample(self.func_strs, self.x_min, self.x_max, self.derivative_order,
+                                            cancel_event=self.cancel_event, dps=self.dps)
+                self.profile = profiler.snapshot()
+        except JobCancelled:
+            return
+        except Exception as e:
+            if not self.is_cancelled():
+                self.signals.failed.emit(self.job_id, str(e))
+            return
+
+        if not self.is_cancelled():
+            self.signals.finished.emit(self.job_id, data)
@@ -0,0 +1,106 @@
+import json
+import time
+import logging
+from contextlib import contextmanager
+from applog import get_logger
+
+# -----------------------------------------------
+# Stage Timers and Counters
+# -----------------------------------------------
+
+perf_logger = get_logger("perf")
+
+
+class JsonMessage:
+    """Log message that is only serialized if a handler actually emits it."""
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def __str__(self):
+        return json.dumps(self.fields, default=str)
+
+
+class Profiler:
+    """
+    Lightweight per-job timers and counters.
+
+    Timings accumulate wall time per stage name; counters hold things like
+    evaluated points, cache hits and points drawn. Both are reset at the start
+    of each job and read back with snapshot().
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.timings = {}
+        self.counters = {}
+
+    def reset(self):
+        self.timings = {}
+        self.counters = {}
+
+    @contextmanager
+    def stage(self, stage_name):
+        """Time a block and count one run of the stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[stage_name] = self.timings.get(stage_name, 0.0) + elapsed
+            self.count(stage_name + "_runs")
+
+    def count(self, counter_name, amount=1):
+        self.counters[counter_name] = self.counters.get(counter_name, 0) + amount
+
+    def snapshot(self):
+        return {"timings": dict(self.timings), "counters": dict(self.counters)}
+
+
+def log_snapshot(event, source, snapshot, **fields):
+    """
+    Emit a profiler snapshot as one structured (JSON) debug record.
+
+    Args:
+        event (str): What produced the snapshot (e.g., "plot", "preview")
+        source (str): Which profiler it came from
+        snapshot (dict): The result of Profiler.snapshot()
+        **fields: Extra context such as the inputs of the job
+    """
+    if perf_logger.isEnabledFor(logging.DEBUG):
+        record = {"event": event, "source": source, "time": time.time()}
+        record.update(fields)
+        record.update(snapshot)
+        perf_logger.debug("%s", JsonMessage(record))
+
+
+def enable_perf_log(path):
+    """
+    Append one JSON object per line to path for every profiled job.
+
+    Args:
+        path (str): The log file to write
+    """
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    perf_logger.addHandler(handler)
+    perf_logger.setLevel(logging.DEBUG)
+    return handler
+
+
+def format_profile(*snapshots):
+    """
+    Render one or more profiler snapshots as aligned plain-text lines.
+
+    Returns:
+        str: "stage  1.23 ms" lines followed by counters
+    """
+    lines = []
+    for snapshot in snapshots:
+        for stage_name, seconds in snapshot["timings"].items():
+            lines.append(f"{stage_name:<20s}{seconds * 1000:9.2f} ms")
+    for snapshot in snapshots:
+        for counter_name, value in snapshot["counters"].items():
+            if not counter_name.endswith("_runs"):
+                lines.append(f"{counter_name:<20s}{value:>9}")
+    return "\n".join(lines)
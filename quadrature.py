@@ -0,0 +1,168 @@
+import numpy as np
+from scipy.integrate import quad
+from compute import check_cancelled
+from surface import simpson_weights
+
+# -----------------------------------------------
+# Riemann Sums and Quadrature Rules
+# -----------------------------------------------
+
+# Plot modes, one per rule
+QUADRATURE_RULES = ("left", "right", "midpoint", "trapezoid", "simpson")
+
+# Largest number of subintervals accepted from the input field
+MAX_SUBINTERVALS = 100_000
+
+# Panels get an outline only while they are wide enough to see it
+OUTLINE_PANELS = 200
+
+# Points along each parabola of a Simpson panel
+SIMPSON_VERTICES = 9
+
+# The convergence plot runs from 2 subintervals up to CONVERGENCE_FACTOR * n
+# (at least CONVERGENCE_MIN), in CONVERGENCE_STEPS geometric steps
+CONVERGENCE_FACTOR = 16
+CONVERGENCE_MIN = 1024
+CONVERGENCE_STEPS = 24
+
+
+class QuadratureData:
+    """One rule applied with n subintervals, its panels, and its convergence as n grows."""
+
+    def __init__(self, rule, n, value, reference, panels, sizes, sums):
+        self.rule = rule
+        self.n = n
+        self.value = value
+        # Numeric integral the sums converge to (scipy.integrate.quad)
+        self.reference = reference
+        # (panels, vertices, 2) polygon array for one PolyCollection
+        self.panels = panels
+        # Subinterval counts of the convergence plot and the rule's value at each
+        self.sizes = sizes
+        self.sums = sums
+
+    @property
+    def error(self):
+        return abs(self.value - self.reference)
+
+    def observed_order(self):
+        """Slope of log|error| against log n over the finest steps, e.g. 2 for the trapezoid rule."""
+        errors = np.abs(self.sums - self.reference)
+        usable = (errors > 1e-13 * max(abs(self.reference), 1.0)) & np.isfinite(errors)
+        sizes, errors = self.sizes[usable][-6:], errors[usable][-6:]
+        if len(sizes) < 2:
+            return float('nan')
+        return float(-np.polyfit(np.log(sizes), np.log(errors), 1)[0])
+
+
+def rule_nodes(rule, x_min, x_max, n):
+    """Points f is evaluated at: n midpoints for "midpoint", the n + 1 grid nodes otherwise."""
+    h = (x_max - x_min) / n
+    if rule == "midpoint":
+        return x_min + h * (np.arange(n) + 0.5)
+    return np.linspace(x_min, x_max, n + 1)
+
+
+def rule_sum(rule, y_vals, x_min, x_max, n):
+    """
+    Apply a rule to f sampled at rule_nodes(rule, x_min, x_max, n).
+
+    Every rule is one vectorized reduction; Simpson's rule needs an even n.
+    """
+    h = (x_max - x_min) / n
+    if rule == "left":
+        return h * float(np.sum(y_vals[:-1]))
+    if rule == "right":
+        return h * float(np.sum(y_vals[1:]))
+    if rule == "midpoint":
+        return h * float(np.sum(y_vals))
+    if rule == "trapezoid":
+        return h * float(np.sum(y_vals) - (y_vals[0] + y_vals[-1]) / 2)
+    if rule == "simpson":
+        return h / 3 * float(simpson_weights(n + 1) @ y_vals)
+    raise ValueError(f"Unknown quadrature rule: {rule}")
+
+
+def rule_panels(rule, x_min, x_max, n, y_vals):
+    """
+    Build every panel of a rule as one (panels, vertices, 2) array.
+
+    y_vals are the samples at rule_nodes(); for the midpoint rule they are
+    the rectangle heights.
+
+    Rectangles and trapezoids are 4-vertex polygons; each Simpson panel covers
+    two subintervals and follows the interpolating parabola along its top.
+    """
+    nodes = np.linspace(x_min, x_max, n + 1)
+    x0, x1 = nodes[:-1], nodes[1:]
+    zero = np.zeros(n)
+    if rule == "simpson":
+        a, b = nodes[:-1:2], nodes[2::2]
+        ya, ym, yb = y_vals[:-1:2], y_vals[1:-1:2], y_vals[2::2]
+        s = np.linspace(0.0, 1.0, SIMPSON_VERTICES)
+        # Quadratic through (0, ya), (1/2, ym), (1, yb) in the panel's local coordinate
+        top_y = (ya[:, None] * (2 * s - 1) * (s - 1) - 4 * ym[:, None] * s * (s - 1)
+                 + yb[:, None] * s * (2 * s - 1))
+        top_x = a[:, None] + (b - a)[:, None] * s
+        base = np.zeros((len(a), 1))
+        xs = np.hstack([a[:, None], top_x, b[:, None]])
+        ys = np.hstack([base, top_y, base])
+        return np.stack([xs, ys], axis=2)
+    if rule == "trapezoid":
+        left, right = y_vals[:-1], y_vals[1:]
+    else:
+        # Rectangles: the height comes from the left node, right node or midpoint
+        heights = y_vals[:-1] if rule == "left" else y_vals[1:] if rule == "right" else y_vals
+        left = right = heights
+    xs = np.stack([x0, x0, x1, x1], axis=1)
+    ys = np.stack([zero, left, right, zero], axis=1)
+    return np.stack([xs, ys], axis=2)
+
+
+def convergence_sizes(rule, n):
+    """Geometric sequence of subinterval counts for the convergence plot (even for Simpson)."""
+    top = min(max(CONVERGENCE_FACTOR * n, CONVERGENCE_MIN), MAX_SUBINTERVALS * CONVERGENCE_FACTOR)
+    sizes = np.unique(np.geomspace(2, top, CONVERGENCE_STEPS).round().astype(int))
+    if rule == "simpson":
+        sizes = np.unique(sizes + sizes % 2)
+    return sizes
+
+
+def reference_integral(func, x_min, x_max):
+    """Adaptive quadrature of the compiled function; NaN if it does not converge."""
+    def scalar(x_val):
+        return float(func(np.array([x_val]))[0])
+
+    try:
+        value, _ = quad(scalar, x_min, x_max, limit=200)
+    except (ValueError, ZeroDivisionError):
+        return float('nan')
+    return value
+
+
+def apply_rule(rule, func, x_min, x_max, n, cancel_event=None):
+    """
+    Apply a rule with n subintervals, build its panels and its convergence sequence.
+
+    Args:
+        rule (str): One of QUADRATURE_RULES
+        func (callable): The compiled function (see compute.compile_function)
+        n (int): Subintervals; rounded up to an even count for Simpson's rule
+        cancel_event (threading.Event): Optional flag checked between convergence steps
+
+    Returns:
+        QuadratureData
+    """
+    if rule == "simpson" and n % 2:
+        n += 1
+    y_vals = func(rule_nodes(rule, x_min, x_max, n))
+    value = rule_sum(rule, y_vals, x_min, x_max, n)
+    panels = rule_panels(rule, x_min, x_max, n, y_vals)
+
+    sizes = convergence_sizes(rule, n)
+    sums = []
+    for size in sizes:
+        check_cancelled(cancel_event)
+        sums.append(rule_sum(rule, func(rule_nodes(rule, x_min, x_max, size)), x_min, x_max, size))
+    reference = reference_integral(func, x_min, x_max)
+    return QuadratureData(rule, n, value, reference, panels, sizes, np.array(sums))
@@ -0,0 +1,119 @@
+import math
+import time
+from PyQt5.QtCore import QElapsedTimer, QTimer
+
+# -----------------------------------------------
+# Blitted Left-to-Right Reveal
+# -----------------------------------------------
+
+# Length of the whole reveal and the frame interval (~30 fps)
+REVEAL_DURATION_MS = 1000
+FRAME_INTERVAL_MS = 33
+
+# Plots with more points than this (summed over all lines) are drawn at once
+MAX_ANIMATED_POINTS = 200_000
+
+# A frame that takes this many intervals to draw ends the reveal early
+ABORT_FRAME_RATIO = 4
+
+
+class RevealAnimation:
+    """
+    Reveal a set of lines from left to right, driven by a QTimer.
+
+    The static parts of the axes are rendered once and cached as a background
+    bitmap; each frame only restores it, draws the animated lines and blits
+    the axes box. Progress follows the wall clock, so a frame that runs over
+    budget makes the next one jump ahead instead of slowing the reveal down.
+    Any full redraw (resize, markers added, hover) refreshes the background.
+
+    Every line must already hold its full data; slicing it for a frame makes
+    views, not copies.
+    """
+
+    def __init__(self, canvas, ax, lines, profiler=None,
+                 duration_ms=REVEAL_DURATION_MS, interval_ms=FRAME_INTERVAL_MS):
+        self.canvas = canvas
+        self.ax = ax
+        self.lines = lines
+        self.data = [line.get_data(orig=True) for line in lines]
+        self.num_points = max((len(x_vals) for x_vals, _ in self.data), default=0)
+        self.profiler = profiler
+        self.duration_ms = duration_ms
+        self.interval_ms = interval_ms
+
+        self.timer = QTimer()
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self._tick)
+        self.clock = QElapsedTimer()
+        self.background = None
+        self.draw_cid = None
+        self.shown = 0
+
+    @property
+    def running(self):
+        return self.timer.isActive()
+
+    def start(self):
+        """Draw the static plot once and start revealing the lines."""
+        self.shown = 1
+        self._show(self.shown)
+        for line in self.lines:
+            line.set_animated(True)
+        self.draw_cid = self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.draw()
+        self.clock.start()
+        self.timer.start()
+
+    def _on_draw(self, event):
+        # A full redraw leaves the animated lines out: cache it, then draw them on top
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        for line in self.lines:
+            self.ax.draw_artist(line)
+
+    def _show(self, count):
+        for line, (x_vals, y_vals) in zip(self.lines, self.data):
+            line.set_data(x_vals[:count], y_vals[:count])
+
+    def _tick(self):
+        elapsed = self.clock.elapsed()
+        target = math.ceil(min(elapsed / self.duration_ms, 1.0) * self.num_points)
+        if target >= self.num_points or self.background is None:
+            self.finish()
+            return
+
+        start = time.perf_counter()
+        self._show(target)
+        self.canvas.restore_region(self.background)
+        for line in self.lines:
+            self.ax.draw_artist(line)
+        self.canvas.blit(self.ax.bbox)
+        cost_ms = (time.perf_counter() - start) * 1000
+
+        if self.profiler is not None:
+            self.profiler.count('animation_frames')
+            # Timer ticks that passed while this frame was drawn are never rendered
+            self.profiler.count('animation_frames_skipped', int(cost_ms // self.interval_ms))
+        self.shown = target
+        if cost_ms > ABORT_FRAME_RATIO * self.interval_ms:
+            self.finish()
+
+    def finish(self):
+        """Jump to the end: full lines drawn normally, timer and callbacks released."""
+        self._release()
+        self._show(self.num_points)
+        self.shown = self.num_points
+        self.canvas.draw_idle()
+
+    def cancel(self):
+        """Stop without drawing, e.g. because the figure is about to be cleared."""
+        self._release()
+
+    def _release(self):
+        self.timer.stop()
+        if self.draw_cid is not None:
+            self.canvas.mpl_disconnect(self.draw_cid)
+            self.draw_cid = None
+        for line in self.lines:
+            line.set_animated(False)
+        self.background = None
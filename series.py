@@ -0,0 +1,90 @@
+import numpy as np
+import sympy as sp
+from compute import split_expressions
+from parsing import parse_text
+
+# -----------------------------------------------
+# Taylor Series
+# -----------------------------------------------
+
+# Highest series order accepted from the order field
+MAX_SERIES_ORDER = 40
+
+# Taylor polynomials drawn at once: the requested order and the ones just below it
+SERIES_SHOWN = 4
+
+
+class SeriesData:
+    """f, its Taylor polynomials about one center, and the error of the highest one."""
+
+    def __init__(self, center, order, coefficients, x_vals, f_vals, polynomials, error):
+        self.center = center
+        self.order = order
+        # c_0 ... c_order, with c_k = f^(k)(center) / k!
+        self.coefficients = coefficients
+        self.x_vals = x_vals
+        self.f_vals = f_vals
+        # Order -> polynomial values on the grid, for the orders drawn
+        self.polynomials = polynomials
+        # |f - P_order| on the grid
+        self.error = error
+
+
+def parse_series(func_text):
+    """
+    Parse "f(x); a", or just "f(x)" for a Maclaurin series (a = 0).
+
+    Returns:
+        tuple: (function text, center)
+
+    Raises:
+        sp.SympifyError: If the text is empty or the center is not a real number
+    """
+    parts = split_expressions(func_text)
+    if not parts or len(parts) > 2:
+        raise sp.SympifyError(func_text)
+    if len(parts) == 1:
+        return parts[0], 0.0
+    try:
+        center = float(parse_text(parts[1], ()))
+    except (TypeError, ValueError) as e:
+        raise sp.SympifyError(parts[1]) from e
+    return parts[0], center
+
+
+def horner(coefficients, t_vals):
+    """
+    Evaluate c_0 + c_1 t + ... + c_n t^n with Horner's scheme.
+
+    One multiply and one add per coefficient, in place on a single array, and
+    no powers of t are ever formed.
+
+    Args:
+        coefficients (list): c_0 ... c_n
+        t_vals (np.ndarray): Offsets from the center, x - a
+    """
+    result = np.full(np.shape(t_vals), coefficients[-1], dtype=np.float64)
+    with np.errstate(all='ignore'):
+        for coefficient in reversed(coefficients[:-1]):
+            result *= t_vals
+            result += coefficient
+    return result
+
+
+def format_polynomial(coefficients, center):
+    """Readable text of the Taylor polynomial, lowest order first, for the Details panel."""
+    if center == 0:
+        base = "x"
+    else:
+        base = f"(x {'-' if center > 0 else '+'} {abs(center):g})"
+    terms = []
+    for k, c in enumerate(coefficients):
+        if c == 0:
+            continue
+        power = "" if k == 0 else base if k == 1 else f"{base}^{k}"
+        magnitude = f"{abs(c):.6g}" if k == 0 or abs(c) != 1 else ""
+        terms.append(("-" if c < 0 else "+", magnitude + power))
+    if not terms:
+        return "0"
+    text = ("-" if terms[0][0] == "-" else "") + terms[0][1]
+    return text + "".join(f" {sign} {term}" for sign, term in terms[1:])
@@ -0,0 +1,156 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from PyQt5.QtWidgets import QApplication
+from history import SessionHistory
+from memory import MemoryTracker
+
+# -----------------------------------------------
+# Soak Workload
+# -----------------------------------------------
+
+# (mode, input template, range min, range max, order); {k} makes each round a new
+# function, so the caches see an endless stream of inputs like a long session does
+WORKLOAD = [
+    ("function", "x**3/{k} - x + 1", -4, 4, 2),
+    ("function", "x**2/{k} - 1; sin(x) + {k}", -3, 3, 1),
+    ("series", "exp(x/{k}); 0", -3, 3, 5),
+    ("simpson", "x**2/{k} + x", -1, 3, 12),
+    ("midpoint", "1/(1 + x**2/{k})", -2, 2, 10),
+    ("parametric", "t**2/{k}; t", -2, 2, 0),
+    ("polar", "1 + theta/{k}", 0, 6.3, 0),
+    ("implicit", "x**2 + y**2/{k} = 4", -3, 3, 0),
+    ("contour", "x**2/{k} - y**2", -3, 3, 0),
+    ("heatmap", "x*y/{k} + y", -3, 3, 0),
+]
+
+# History kept by the soaked window: small, so eviction runs within a few plots
+HISTORY_LIMIT = 4 * 1024 * 1024
+
+
+def soaked_app(history_limit=HISTORY_LIMIT):
+    """A GraphiqueApp that plots without animation and fails loudly instead of showing dialogs."""
+    from main import MODE_INFO, GraphiqueApp
+
+    def fail(warning):
+        raise RuntimeError(warning)
+
+    app = GraphiqueApp()
+    app.plot_widget.animations_enabled = False
+    app.history = SessionHistory(memory_limit=history_limit)
+    app.warning = fail
+    app.confirm = lambda question: True
+    app.modes = list(MODE_INFO)
+    return app
+
+
+def plot(app, mode, text, range_min, range_max, order):
+    app.mode_selector.setCurrentIndex(app.modes.index(mode))
+    app.function_input.setText(text)
+    app.x_min_entry.setText(str(range_min))
+    app.x_max_entry.setText(str(range_max))
+    app.derivative_input.setText(str(order))
+    app.plot()
+
+
+def run_soak(plots, sample_every=50, round_trip_every=100, frames=0):
+    """
+    Plot plots times through the workload and sample memory along the way.
+
+    Args:
+        plots (int): Number of plots
+        sample_every (int): Plots between memory samples
+        round_trip_every (int): Plots between Back-to-splash and Start round trips (0 for none)
+        frames (int): tracemalloc traceback depth, 0 for RSS only
+
+    Returns:
+        list: MemorySample per sample, the first taken after one pass over WORKLOAD
+    """
+    tracker = MemoryTracker(frames, samples_kept=plots // sample_every + 2)
+    app = soaked_app()
+    windows = {id(app)}
+    samples = []
+    for index in range(plots):
+        mode, template, range_min, range_max, order = WORKLOAD[index % len(WORKLOAD)]
+        k = index // len(WORKLOAD) % 97 + 2
+        plot(app, mode, template.format(k=k), range_min, range_max, order)
+        QApplication.processEvents()
+
+        if round_trip_every and (index + 1) % round_trip_every == 0:
+            app.back_to_splash()
+            app.splash.launch_main()
+            windows.add(id(app.splash.main))
+
+        if index + 1 == len(WORKLOAD) or (index + 1) % sample_every == 0:
+            samples.append(tracker.record(f"plot {index + 1}", app.plot_widget.figure, app.cache_sizes()))
+
+    if len(windows) != 1:
+        raise RuntimeError(f"Round trips created {len(windows)} main windows")
+    tracker.stop()
+    return samples
+
+
+def check_bounded(samples, max_growth, max_figures):
+    """
+    Problems with the soak samples, empty when memory stayed bounded.
+
+    Growth is measured from the first sample (after one pass over every
+    mode, when the caches hold their first entries) to the highest later
+    sample, in traced bytes if tracemalloc ran and RSS otherwise.
+    """
+    problems = []
+    baseline = samples[0]
+    field = "traced_bytes" if baseline.traced_bytes is not None else "rss_bytes"
+    if getattr(baseline, field) is not None:
+        growth = max(getattr(sample, field) for sample in samples) - getattr(baseline, field)
+        if growth > max_growth:
+            problems.append(f"{field} grew by {growth / 1e6:.1f} MB (limit {max_growth / 1e6:.1f} MB)")
+    figures = max(sample.figures for sample in samples)
+    if figures > max_figures:
+        problems.append(f"{figures} live Figures (limit {max_figures})")
+    artists = [sample.artists for sample in samples]
+    if max(artists) > 2 * max(artists[:2]) + 100:
+        problems.append(f"artist count rose from {artists[0]} to {max(artists)}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plot thousands of functions and check that memory stays bounded.")
+    parser.add_argument("--plots", type=int, default=2000, help="number of plots")
+    parser.add_argument("--sample-every", type=int, default=50, help="plots between memory samples")
+    parser.add_argument("--round-trip-every", type=int, default=100, help="plots between back-to-splash round trips")
+    parser.add_argument("--frames", type=int, default=0, help="tracemalloc traceback depth (slow), 0 to measure RSS only")
+    parser.add_argument("--max-growth", type=float, default=64, help="allowed growth after warm-up in MB")
+    parser.add_argument("--max-figures", type=int, default=4, help="allowed live Matplotlib Figures")
+    parser.add_argument("--output", help="write the samples JSON to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    qapp = QApplication.instance() or QApplication(sys.argv)
+    start = time.perf_counter()
+    samples = run_soak(args.plots, args.sample_every, args.round_trip_every, args.frames)
+    problems = check_bounded(samples, args.max_growth * 1e6, args.max_figures)
+
+    text = json.dumps({
+        "plots": args.plots,
+        "seconds": time.perf_counter() - start,
+        "problems": problems,
+        "samples": [sample.as_dict() for sample in samples],
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    for problem in problems:
+        print(f"UNBOUNDED {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+import numpy as np
+import sympy as sp
+from compute import compile_family
+from parsing import parse_text
+
+# -----------------------------------------------
+# Two-Variable Functions
+# -----------------------------------------------
+
+# Mesh nodes per axis. Odd, so composite Simpson's rule applies on the full
+# mesh and on every other node (for the error estimate).
+SURFACE_GRID = 401
+
+# Nodes per axis actually drawn; larger meshes are strided down to this
+DISPLAY_GRID = 201
+
+# Filled contour levels of the contour view
+CONTOUR_LEVELS = 20
+
+SURFACE_VIEWS = ("contour", "heatmap")
+
+
+class SurfaceData:
+    """f(x, y) and its partial derivatives on a rectangular mesh, plus the region integral."""
+
+    def __init__(self, x_vals, y_vals, z_vals, fx_vals, fy_vals, integral, integral_error, exprs):
+        # z_vals[i, j] is f(x_vals[j], y_vals[i])
+        self.x_vals = x_vals
+        self.y_vals = y_vals
+        self.z_vals = z_vals
+        self.fx_vals = fx_vals
+        self.fy_vals = fy_vals
+        self.integral = integral
+        self.integral_error = integral_error
+        # Symbolic pieces for the Details panel (name -> expression)
+        self.exprs = exprs
+
+
+def parse_surface(func_text):
+    """
+    Parse f(x, y) text.
+
+    Raises:
+        sp.SympifyError: If the text is empty or not a valid expression
+    """
+    return parse_text(func_text, ("x", "y"))
+
+
+def simpson_weights(num_points):
+    """Composite Simpson weights 1, 4, 2, 4, ..., 4, 1 for an odd number of nodes."""
+    weights = np.ones(num_points)
+    weights[1:-1:2] = 4
+    weights[2:-1:2] = 2
+    return weights
+
+
+def simpson_2d(z_vals, x_vals, y_vals):
+    """Tensor-product Simpson's rule over a uniform mesh with an odd node count per axis."""
+    hx = (x_vals[-1] - x_vals[0]) / (len(x_vals) - 1)
+    hy = (y_vals[-1] - y_vals[0]) / (len(y_vals) - 1)
+    wx = simpson_weights(len(x_vals))
+    wy = simpson_weights(len(y_vals))
+    return float(hx * hy / 9 * (wy @ z_vals @ wx))
+
+
+def region_integral(z_vals, x_vals, y_vals):
+    """
+    Integrate the mesh over its rectangle with an error estimate.
+
+    Simpson's rule is applied on the full mesh and on every other node; for a
+    smooth integrand the difference of the two, divided by 15 (Richardson),
+    estimates the error of the finer result.
+
+    Returns:
+        tuple: (integral, error estimate); both NaN if f is undefined anywhere on the mesh
+    """
+    if not np.all(np.isfinite(z_vals)) or len(x_vals) < 5 or len(y_vals) < 5:
+        return float('nan'), float('nan')
+    fine = simpson_2d(z_vals, x_vals, y_vals)
+    coarse = simpson_2d(z_vals[::2, ::2], x_vals[::2], y_vals[::2])
+    return fine, abs(fine - coarse) / 15
+
+
+def sample_surface(f_expr, x_min, x_max, y_min, y_max, resolution=SURFACE_GRID):
+    """
+    Evaluate f, f_x and f_y on a resolution x resolution mesh with one fused kernel.
+
+    The mesh is never materialized as two full coordinate arrays: x is passed
+    as a row and y as a column, and the kernel broadcasts them.
+
+    Returns:
+        SurfaceData: The sampled surface and its integral over the rectangle
+    """
+    x, y = sp.Symbol('x'), sp.Symbol('y')
+    fx, fy = sp.diff(f_expr, x), sp.diff(f_expr, y)
+
+    x_vals = np.linspace(x_min, x_max, resolution)
+    y_vals = np.linspace(y_min, y_max, resolution)
+    z_vals, fx_vals, fy_vals = compile_family([f_expr, fx, fy], (x, y))(x_vals[None, :], y_vals[:, None])
+
+    integral, integral_error = region_integral(z_vals, x_vals, y_vals)
+    exprs = {
+        "f(x, y)": f_expr,
+        "∂f/∂x": fx,
+        "∂f/∂y": fy,
+        "|∇f|": sp.sqrt(fx ** 2 + fy ** 2),
+    }
+    return SurfaceData(x_vals, y_vals, z_vals, fx_vals, fy_vals, integral, integral_error, exprs)
+
+
+def downsample(x_vals, y_vals, z_vals, max_points=DISPLAY_GRID):
+    """
+    Level of detail for drawing: stride the mesh so neither axis exceeds max_points.
+
+    The first and last rows and columns are always kept so the plotted extent
+    does not shrink.
+    """
+    def indices(count):
+        if count <= max_points:
+            return np.arange(count)
+        return np.unique(np.linspace(0, count - 1, max_points).round().astype(int))
+
+    rows, cols = indices(len(y_vals)), indices(len(x_vals))
+    return x_vals[cols], y_vals[rows], z_vals[np.ix_(rows, cols)]
+
+
+def draw_surface(ax, x_vals, y_vals, z_vals, view):
+    """
+    Draw a (downsampled) mesh as filled contours with level lines, or as a heatmap.
+
+    Shared by PlotWidget and the background exporter so both look the same.
+    """
+    finite = z_vals[np.isfinite(z_vals)]
+    if not finite.size:
+        return None
+    if view == "heatmap":
+        mappable = ax.imshow(z_vals, origin='lower', aspect='auto', cmap='viridis',
+                             extent=(x_vals[0], x_vals[-1], y_vals[0], y_vals[-1]), interpolation='nearest')
+    else:
+        masked = np.ma.masked_invalid(z_vals)
+        mappable = ax.contourf(x_vals, y_vals, masked, levels=CONTOUR_LEVELS, cmap='viridis')
+        ax.contour(x_vals, y_vals, masked, levels=mappable.levels, colors='white', linewidths=0.5,
+                   linestyles='solid', alpha=0.6)
+    return mappable
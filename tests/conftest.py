@@ -0,0 +1,26 @@
+import os
+import sys
+
+# Headless Qt and a non-interactive Matplotlib backend before anything imports them
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from corpus import generate_expressions
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """The one QApplication of the test session."""
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+@pytest.fixture(scope="session")
+def corpus():
+    """The generated expression corpus (see corpus.generate_expressions)."""
+    return generate_expressions()
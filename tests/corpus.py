@@ -0,0 +1,110 @@
+import random
+import numpy as np
+import sympy as sp
+
+# -----------------------------------------------
+# Generated Expression Corpus and Reference Values
+# -----------------------------------------------
+
+x = sp.Symbol('x')
+
+# Seed of the generated corpus; the same expressions are built on every run
+CORPUS_SEED = 20240601
+CORPUS_SIZE = 40
+
+# Generated expressions simpler than this are skipped
+MIN_OPERATIONS = 3
+
+# Range every generated expression is finite and smooth on
+DOMAIN = (-3.0, 3.0)
+
+# Points the references are computed at (no grid point lands on them exactly)
+PROBES = np.array([-2.71, -1.3, -0.45, 0.0, 0.37, 1.1, 2.23, 2.96])
+
+# Significant digits of the reference values
+REFERENCE_DPS = 30
+
+# Building blocks that stay finite and smooth on all of DOMAIN for any
+# finite argument: no poles, no logs of values that can reach zero, and
+# exponentials only of bounded arguments
+UNARY = [
+    lambda u: sp.sin(u),
+    lambda u: sp.cos(u),
+    lambda u: sp.atan(u),
+    lambda u: sp.tanh(u),
+    lambda u: sp.exp(sp.sin(u)),
+    lambda u: sp.exp(-u ** 2 / 4),
+    lambda u: sp.sqrt(1 + u ** 2),
+    lambda u: sp.log(2 + sp.cos(u)),
+    lambda u: u ** 2,
+    lambda u: u ** 3 / 10,
+]
+BINARY = [
+    lambda a, b: a + b,
+    lambda a, b: a - b,
+    lambda a, b: a * b,
+    lambda a, b: a / (2 + sp.sin(b)),
+    lambda a, b: a / (1 + b ** 2),
+]
+
+# Hand-picked functions with closed-form integrals for the sp.integrate checks
+INTEGRABLE = [
+    "x**2 + 3*x + 5",
+    "2*x**5 - 5*x**3 + x",
+    "sin(x)*cos(2*x)",
+    "x*exp(x/5)",
+    "exp(-x**2/10)*x",
+    "cos(x)**2",
+    "x*sin(x)",
+    "1/(x**2 + 4)",
+    "log(x**2 + 1)",
+    "sqrt(x**2 + 1)",
+]
+
+
+def _leaf(rng):
+    choice = rng.random()
+    if choice < 0.6:
+        return x
+    if choice < 0.8:
+        return sp.Integer(rng.randint(1, 5)) * x
+    return sp.Rational(rng.randint(-9, 9), rng.randint(1, 4))
+
+
+def _tree(rng, depth):
+    if depth == 0 or rng.random() < 0.1:
+        return _leaf(rng)
+    if rng.random() < 0.55:
+        return rng.choice(UNARY)(_tree(rng, depth - 1))
+    return rng.choice(BINARY)(_tree(rng, depth - 1), _tree(rng, depth - 1))
+
+
+def generate_expressions(seed=CORPUS_SEED, count=CORPUS_SIZE, max_depth=3):
+    """
+    Random expressions of x that are finite and smooth on DOMAIN.
+
+    Constants and near-trivial results (fewer than MIN_OPERATIONS operations)
+    are dropped, so every expression is a real composition of x.
+
+    Returns:
+        list: count distinct SymPy expressions, the same for the same seed
+    """
+    rng = random.Random(seed)
+    exprs = []
+    while len(exprs) < count:
+        expr = _tree(rng, rng.randint(2, max_depth))
+        if expr.has(x) and sp.count_ops(expr) >= MIN_OPERATIONS and expr not in exprs:
+            exprs.append(expr)
+    return exprs
+
+
+def reference_values(expr, points=PROBES, dps=REFERENCE_DPS):
+    """expr at each point through subs().evalf(), the slow path every fast path must agree with."""
+    return np.array([float(sp.re(expr.subs(x, sp.Float(float(point), dps)).evalf(dps)))
+                     for point in points])
+
+
+def assert_close(actual, expected, rtol=1e-9, atol=1e-9, message=""):
+    """np.testing.assert_allclose with the tolerance scaled to the largest reference value."""
+    scale = max(float(np.max(np.abs(expected))), 1.0)
+    np.testing.assert_allclose(actual, expected, rtol=rtol, atol=atol * scale, err_msg=message)
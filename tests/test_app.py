@@ -0,0 +1,73 @@
+import pytest
+
+# -----------------------------------------------
+# Main Window Plot Flow
+# -----------------------------------------------
+
+@pytest.fixture(scope="module")
+def app(qapp):
+    from soak import soaked_app
+    window = soaked_app()
+    window.dialogs = []
+
+    def dialog(kind, answer):
+        def show(text):
+            # A dialog runs a nested event loop; the preview worker must not be locked out meanwhile
+            assert not window.pipeline.lock._is_owned(), f"{kind} shown while the pipeline is locked"
+            window.dialogs.append((kind, text))
+            return answer
+        return show
+
+    window.warning = lambda warning: dialog("warning", None)(warning)
+    window.confirm = lambda question: dialog("confirm", False)(question)
+    yield window
+    window.deleteLater()
+
+
+@pytest.mark.parametrize("mode, text, order", [
+    ("function", "sin(x", 1),
+    ("function", "x; cos(", 1),
+    ("function", "erf(sin(x)*exp(x))*gamma(x)", 12),
+    ("series", "sqrt(x); 0", 3),
+    ("simpson", "x +", 10),
+])
+def test_dialogs_are_shown_without_the_pipeline_lock(app, mode, text, order):
+    from soak import plot
+    app.dialogs.clear()
+    plot(app, mode, text, -2, 2, order)
+    assert app.dialogs
+
+
+
+@pytest.mark.parametrize("mode, text, variable", [
+    ("polar", "1 + cos(t)", "t"),
+    ("parametric", "cos(3*x); sin(x)", "x"),
+    ("implicit", "x**2 + z**2 = 1", "z"),
+])
+def test_curve_with_another_modes_variable_warns(app, mode, text, variable):
+    from main import MODE_INFO
+    from soak import plot
+    app.dialogs.clear()
+    plot(app, mode, text, -2, 2, 0)
+    [(kind, message)] = app.dialogs
+    assert kind == "warning" and MODE_INFO[mode][1] in message and f"'{variable}'" in message
+
+
+@pytest.mark.parametrize("view", ["contour", "heatmap"])
+def test_surface_with_a_variable_other_than_x_and_y_warns(app, view):
+    from main import MODE_INFO
+    from soak import plot
+    app.dialogs.clear()
+    plot(app, view, "sin(t)*y", -2, 2, 0)
+    [(kind, message)] = app.dialogs
+    assert kind == "warning" and MODE_INFO[view][1] in message and "'t'" in message
+
+def test_failed_preview_is_logged_and_forgotten(app, caplog):
+    import logging
+    app.preview_job = None
+    app.start_preview()
+    job = app.preview_job
+    with caplog.at_level(logging.DEBUG, logger="graphique.app"):
+        app.on_preview_failed(job.job_id, "division by zero")
+    assert app.preview_job is None
+    assert "division by zero" in caplog.text
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+import sympy as sp
+from compute import FusedKernel, GridTable, compile_family, compile_function, grid_slice, sample_parallel
+from corpus import DOMAIN, PROBES, assert_close, generate_expressions, reference_values, x
+from kernels import compile_kernel, resolve_backend
+
+# -----------------------------------------------
+# Compiled Evaluation Against subs().evalf()
+# -----------------------------------------------
+
+CORPUS = generate_expressions()
+IDS = [str(expr)[:40] for expr in CORPUS]
+
+
+@pytest.mark.parametrize("expr", CORPUS, ids=IDS)
+def test_compile_function_matches_evalf(expr):
+    assert_close(compile_function(expr, x)(PROBES), reference_values(expr), message=str(expr))
+
+
+@pytest.mark.parametrize("expr", CORPUS, ids=IDS)
+def test_fused_family_matches_evalf(expr):
+    # f, f', f'' through one CSE kernel, as the plot samples them
+    derivatives = [expr, sp.diff(expr, x), sp.diff(expr, x, 2)]
+    values = compile_family(derivatives, x)(PROBES)
+    for order, (derivative, y_vals) in enumerate(zip(derivatives, values)):
+        assert_close(y_vals, reference_values(derivative), rtol=1e-8, message=f"order {order} of {expr}")
+
+
+@pytest.mark.parametrize("expr", CORPUS[:10], ids=IDS[:10])
+def test_numpy_backend_matches_fused_kernel(expr):
+    derivatives = [expr, sp.diff(expr, x)]
+    expected = compile_family(derivatives, x)(PROBES)
+    for actual, wanted in zip(compile_kernel(derivatives, x, "numpy")(PROBES), expected):
+        np.testing.assert_array_equal(actual, wanted)
+
+
+def test_auto_backend_is_the_fused_kernel():
+    # numexpr and numba evaluate curve by curve, so they are never picked implicitly
+    assert resolve_backend("auto") == "numpy"
+    assert isinstance(compile_kernel([CORPUS[0], sp.diff(CORPUS[0], x)], x, "auto"), FusedKernel)
+
+
+def test_complex_points_become_nan():
+    y_vals = compile_function(sp.sqrt(x), x)(np.array([-1.0, 4.0]))
+    assert np.isnan(y_vals[0]) and y_vals[1] == 2.0
+
+
+def test_constant_expression_broadcasts():
+    y_vals = compile_function(sp.Integer(3), x)(np.zeros(5))
+    assert y_vals.shape == (5,) and np.all(y_vals == 3.0)
+
+
+# -----------------------------------------------
+# Chunked and Parallel Sampling Against One Pass
+# -----------------------------------------------
+
+def test_grid_slice_matches_linspace():
+    grid = np.linspace(-2.5, 7.0, 1001)
+    for start, stop in [(0, 1001), (0, 17), (500, 733), (990, 1001)]:
+        np.testing.assert_allclose(grid_slice(-2.5, 7.0, 1001, start, stop), grid[start:stop], rtol=0, atol=1e-14)
+
+
+def test_grid_table_blocks_match_one_pass():
+    from scipy.integrate import cumulative_trapezoid
+    expr = CORPUS[0]
+    kernel = compile_family([expr, sp.diff(expr, x)], x)
+    x_vals = np.linspace(*DOMAIN, 10_000)
+    f_vals, df_vals = kernel(x_vals)
+    integral = cumulative_trapezoid(f_vals, x_vals, initial=0)
+
+    table = GridTable(kernel, *DOMAIN, 10_000, chunk_size=777)
+    columns = [np.concatenate(parts) for parts in zip(*(values for _, _, values in table.blocks()))]
+    np.testing.assert_allclose(columns[0], x_vals, rtol=0, atol=1e-14)
+    np.testing.assert_allclose(columns[1], f_vals, rtol=1e-15)
+    np.testing.assert_allclose(columns[2], df_vals, rtol=1e-15)
+    np.testing.assert_allclose(columns[3], integral, rtol=1e-12, atol=1e-12)
+
+
+def test_sample_parallel_matches_one_pass():
+    from scipy.integrate import cumulative_trapezoid
+    expr = CORPUS[5]
+    kernel = compile_family([expr], x)
+    num_points = 1 << 16
+    x_vals = np.linspace(*DOMAIN, num_points)
+    columns = sample_parallel(kernel, *DOMAIN, num_points, workers=4)
+    np.testing.assert_allclose(columns[1], kernel(x_vals)[0], rtol=1e-15)
+    np.testing.assert_allclose(columns[-1], cumulative_trapezoid(columns[1], x_vals, initial=0), rtol=1e-10, atol=1e-12)
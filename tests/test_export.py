@@ -0,0 +1,56 @@
+import os
+import numpy as np
+import pytest
+from export import ArrayTable, CHUNK_ROWS, ExportJob
+
+# -----------------------------------------------
+# Background Export Jobs
+# -----------------------------------------------
+
+def run_job(job):
+    """Run a job on this thread and collect the signals it emits."""
+    emitted = []
+    job.signals.finished.connect(lambda name: emitted.append(("finished", name)))
+    job.signals.failed.connect(lambda error: emitted.append(("failed", error)))
+    job.signals.cancelled.connect(lambda name: emitted.append(("cancelled", name)))
+    job.run()
+    return emitted
+
+
+def table(rows=3 * CHUNK_ROWS):
+    x_vals = np.linspace(0.0, 1.0, rows)
+    return ArrayTable([("x", x_vals), ("f", x_vals ** 2)])
+
+
+def test_finished_job_reports_its_file(qapp, tmp_path):
+    file_name = str(tmp_path / "curves.csv")
+    assert run_job(ExportJob(table(), file_name, "csv")) == [("finished", file_name)]
+    assert np.loadtxt(file_name, delimiter=",", skiprows=1).shape == (3 * CHUNK_ROWS, 2)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "npy"])
+def test_cancelled_job_reports_back_and_leaves_no_file(qapp, tmp_path, fmt):
+    file_name = str(tmp_path / f"curves.{fmt}")
+    job = ExportJob(table(), file_name, fmt)
+    job.cancel()
+    assert run_job(job) == [("cancelled", file_name)]
+    assert not os.path.exists(file_name)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "npy", "npz"])
+def test_job_cancelled_before_writing_keeps_an_existing_file(qapp, tmp_path, fmt):
+    path = tmp_path / f"curves.{fmt}"
+    path.write_bytes(b"earlier export")
+    job = ExportJob(table(), str(path), fmt)
+    job.cancel()
+    assert run_job(job) == [("cancelled", str(path))]
+    assert path.read_bytes() == b"earlier export"
+
+
+def test_job_cancelled_while_writing_removes_its_partial_file(qapp, tmp_path):
+    path = tmp_path / "curves.csv"
+    path.write_bytes(b"earlier export")
+    job = ExportJob(table(), str(path), "csv")
+    job.signals.progress.connect(lambda value: job.cancel())
+    assert run_job(job) == [("cancelled", str(path))]
+    assert not path.exists()
@@ -0,0 +1,49 @@
+import sympy as sp
+
+# -----------------------------------------------
+# Memory Diagnostics and Bounded Caches
+# -----------------------------------------------
+
+def test_trim_caches_clears_sympy_over_the_limit():
+    from memory import sympy_cache_entries, trim_caches
+    x = sp.Symbol('x')
+    sp.diff(sp.sin(x) * sp.exp(x), x, 3)
+    assert sympy_cache_entries() > 0
+    assert trim_caches(limit=sympy_cache_entries()) == 0
+    assert trim_caches(limit=0) > 0
+    assert sympy_cache_entries() == 0
+
+
+def test_tracker_reports_allocation_growth():
+    from memory import MemoryTracker
+    tracker = MemoryTracker(frames=1)
+    try:
+        tracker.record("empty", count_figures=False)
+        kept = [bytearray(1 << 20)]
+        sample = tracker.record("one MiB", count_figures=False)
+        assert sample.traced_bytes >= 1 << 20
+        assert sample.growth and sample.growth[0][1] >= 1 << 20
+        assert "one MiB" in tracker.report()
+        del kept
+    finally:
+        tracker.stop()
+
+
+def test_formula_cache_is_capped_by_bytes(qapp, monkeypatch):
+    import typeset
+    typeset.clear_cache()
+    monkeypatch.setattr(typeset, "MATH_CACHE_BYTES", 3 * typeset.image_bytes(typeset.render_math("x^{2}")))
+    for k in range(20):
+        typeset.render_math(f"x^{{{k}}}")
+    formulas, formula_bytes = typeset.cache_info()
+    assert formulas < 20 and formula_bytes <= typeset.MATH_CACHE_BYTES
+    typeset.clear_cache()
+    assert typeset.cache_info() == (0, 0)
+
+
+def test_soak_keeps_one_window_and_one_figure(qapp):
+    from soak import check_bounded, run_soak
+    samples = run_soak(30, sample_every=10, round_trip_every=10)
+    # Other tests' widgets may still be alive; the soak must not add any per plot
+    assert len({sample.figures for sample in samples}) == 1
+    assert check_bounded(samples, max_growth=256e6, max_figures=samples[0].figures) == []
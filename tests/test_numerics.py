@@ -0,0 +1,79 @@
+import math
+import numpy as np
+import pytest
+import sympy as sp
+from compute import compile_function
+from corpus import assert_close, generate_expressions, reference_values, x
+from parsing import ParseError, parse_text
+from quadrature import QUADRATURE_RULES, apply_rule, rule_nodes, rule_sum
+from series import horner
+
+# -----------------------------------------------
+# Parsing, Quadrature and Series Against SymPy
+# -----------------------------------------------
+
+CORPUS = generate_expressions()
+IDS = [str(expr)[:40] for expr in CORPUS]
+
+# Lowest polynomial degree each rule does not integrate exactly, and its order of convergence
+EXACT_BELOW = {"left": 1, "right": 1, "midpoint": 2, "trapezoid": 2, "simpson": 4}
+ORDER = {"left": 1, "right": 1, "midpoint": 2, "trapezoid": 2, "simpson": 4}
+
+
+@pytest.mark.parametrize("expr", CORPUS, ids=IDS)
+def test_parser_round_trips_printed_expressions(expr):
+    parsed = parse_text(str(expr))
+    assert sp.simplify(parsed - expr) == 0 or np.allclose(
+        reference_values(parsed), reference_values(expr), rtol=1e-12, atol=1e-12)
+
+
+def test_parser_matches_sympify_on_caret_and_constants():
+    assert parse_text("x^2 + pi*E") == sp.sympify("x**2 + pi*E")
+
+
+@pytest.mark.parametrize("text", ["2x", "import os", "x +", "__class__", "sin(x", "x**99999", "(1/2)**(10**10)",
+                                  "(22/7)**900"])
+def test_parser_rejects_bad_input(text):
+    with pytest.raises(ParseError):
+        parse_text(text)
+
+
+def test_parser_rejects_variables_the_input_does_not_take():
+    with pytest.raises(ParseError) as error:
+        parse_text("x*y")
+    assert (error.value.start, error.value.end) == (2, 3)
+    assert "'y'" in str(error.value)
+    assert parse_text("x*y", ("x", "y")) == sp.Symbol('x') * sp.Symbol('y')
+    with pytest.raises(ParseError):
+        parse_text("pi*x", ())
+
+
+@pytest.mark.parametrize("rule", QUADRATURE_RULES)
+def test_rules_are_exact_on_low_degree_polynomials(rule):
+    for degree in range(EXACT_BELOW[rule]):
+        expr = x ** degree + 1
+        n = 6
+        y_vals = compile_function(expr, x)(rule_nodes(rule, -1.5, 2.0, n))
+        expected = float(sp.integrate(expr, (x, -1.5, 2.0)))
+        assert math.isclose(rule_sum(rule, y_vals, -1.5, 2.0, n), expected, rel_tol=1e-12)
+
+
+@pytest.mark.parametrize("rule", QUADRATURE_RULES)
+@pytest.mark.parametrize("expr", CORPUS[:6], ids=IDS[:6])
+def test_rules_converge_to_sp_integrate_at_their_order(rule, expr):
+    func = compile_function(expr, x)
+    quadrature = apply_rule(rule, func, -1.0, 2.0, 64)
+    expected = float(sp.Integral(expr, (x, -1.0, 2.0)).evalf(20))
+    assert math.isclose(quadrature.reference, expected, rel_tol=1e-9, abs_tol=1e-12)
+    order = quadrature.observed_order()
+    if np.isfinite(order):
+        assert abs(order - ORDER[rule]) < 0.5, f"observed order {order:.2f}"
+
+
+@pytest.mark.parametrize("expr", CORPUS[:6], ids=IDS[:6])
+def test_horner_matches_expanded_taylor_polynomial(expr):
+    center = 0.3
+    coefficients = [reference_values(sp.diff(expr, x, k), [center])[0] / math.factorial(k) for k in range(6)]
+    polynomial = sum(sp.Float(c, 20) * (x - center) ** k for k, c in enumerate(coefficients))
+    t_vals = np.linspace(-0.5, 0.5, 11)
+    assert_close(horner(coefficients, t_vals), reference_values(polynomial, t_vals + center), rtol=1e-12)
@@ -0,0 +1,173 @@
+import math
+import numpy as np
+import pytest
+import sympy as sp
+from autodiff import TaylorKernel, compile_derivative, supports
+from corpus import DOMAIN, INTEGRABLE, PROBES, assert_close, generate_expressions, reference_values, x
+from parsing import parse_text
+from pipeline import OverlayPipeline, Pipeline
+
+# -----------------------------------------------
+# Cached Pipeline Against the Reference Paths
+# -----------------------------------------------
+
+CORPUS = generate_expressions()
+IDS = [str(expr)[:40] for expr in CORPUS]
+
+# Grid rows compared against subs().evalf() in the sampling tests
+CHECKED_ROWS = [0, 57, 133, 200, 311, 399]
+
+
+def pipeline_for(text):
+    pipeline = Pipeline()
+    pipeline.parse(text)
+    return pipeline
+
+
+@pytest.mark.parametrize("expr", CORPUS[:20], ids=IDS[:20])
+def test_sampled_derivatives_match_evalf(expr):
+    pipeline = pipeline_for(str(expr))
+    data = pipeline.sample(*DOMAIN, 2)
+    points = data.x_vals[CHECKED_ROWS]
+    for order in range(3):
+        expected = reference_values(sp.diff(pipeline.func, x, order), points)
+        assert_close(data.y_vals_list[order][CHECKED_ROWS], expected, rtol=1e-8, message=f"order {order}")
+
+
+@pytest.mark.parametrize("expr", CORPUS[:10], ids=IDS[:10])
+def test_incremental_updates_match_a_fresh_pipeline(expr):
+    # Range and order changes reuse cached stages; the result must not depend on the path
+    # taken (up to rounding: the curves may be evaluated in differently fused kernels)
+    pipeline = pipeline_for(str(expr))
+    pipeline.sample(-1.0, 1.0, 1)
+    pipeline.sample(-1.0, 1.0, 3)
+    pipeline.sample(*DOMAIN, 0)
+    cached = pipeline.sample(*DOMAIN, 3)
+    fresh = pipeline_for(str(expr)).sample(*DOMAIN, 3)
+    for cached_vals, fresh_vals in zip(cached.y_vals_list, fresh.y_vals_list):
+        np.testing.assert_allclose(cached_vals, fresh_vals, rtol=1e-13, atol=1e-13)
+    np.testing.assert_allclose(cached.int_vals, fresh.int_vals, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize("text", INTEGRABLE)
+def test_definite_integral_matches_sp_integrate(text):
+    pipeline = pipeline_for(text)
+    expected = float(sp.integrate(parse_text(text), (x, -2, 3)).evalf(30))
+    assert math.isclose(float(pipeline.definite_integral(-2.0, 3.0)), expected, rel_tol=1e-10, abs_tol=1e-12)
+    assert math.isclose(float(pipeline.definite_integral(-2.0, 3.0, numeric=True)), expected,
+                        rel_tol=1e-8, abs_tol=1e-10)
+
+
+@pytest.mark.parametrize("text", INTEGRABLE)
+def test_running_integral_matches_sp_integrate(text):
+    pipeline = pipeline_for(text)
+    pipeline.antiderivative()
+    data = pipeline.sample(-2.0, 3.0, 0)
+    t = sp.Symbol('t')
+    antiderivative = sp.integrate(parse_text(text).subs(x, t), (t, -2, x))
+    expected = reference_values(antiderivative, data.x_vals[CHECKED_ROWS])
+    # Exact when F(x) - F(x_min) is used, trapezoid accuracy otherwise
+    assert_close(data.int_vals[CHECKED_ROWS], expected, rtol=1e-4, atol=1e-4)
+
+
+def test_running_integral_without_antiderivative_is_trapezoid_accurate():
+    pipeline = pipeline_for("exp(sin(x))")
+    data = pipeline.sample(*DOMAIN, 0)
+    expected = [float(sp.Integral(sp.exp(sp.sin(x)), (x, DOMAIN[0], point)).evalf(20))
+                for point in data.x_vals[CHECKED_ROWS]]
+    assert_close(data.int_vals[CHECKED_ROWS], np.array(expected), rtol=1e-4, atol=1e-4)
+
+
+@pytest.mark.parametrize("expr", CORPUS[:8], ids=IDS[:8])
+def test_taylor_coefficients_match_sp_diff(expr):
+    pipeline = pipeline_for(str(expr))
+    coefficients = pipeline.taylor_coefficients(0.5, 4)
+    expected = [reference_values(sp.diff(pipeline.func, x, k), [0.5])[0] / math.factorial(k) for k in range(5)]
+    assert_close(np.array(coefficients), np.array(expected), rtol=1e-8)
+
+
+def test_critical_points_of_sine():
+    pipeline = pipeline_for("sin(x)")
+    pipeline.sample(-4.0, 4.0, 2)
+    critical = pipeline.critical_points(-4.0, 4.0)
+    np.testing.assert_allclose(sorted(point[0] for point in critical.roots), [-np.pi, 0.0, np.pi], atol=1e-10)
+    np.testing.assert_allclose([point[0] for point in critical.maxima], [np.pi / 2], atol=1e-8)
+    np.testing.assert_allclose([point[0] for point in critical.minima], [-np.pi / 2], atol=1e-8)
+
+
+def test_overlay_matches_separate_pipelines():
+    texts = [str(expr) for expr in CORPUS[:3]]
+    overlay = OverlayPipeline(Pipeline())
+    results = overlay.sample(texts, *DOMAIN, 2)
+    for text, data in zip(texts, results):
+        alone = pipeline_for(text).sample(*DOMAIN, 2)
+        for overlaid_vals, alone_vals in zip(data.y_vals_list, alone.y_vals_list):
+            np.testing.assert_allclose(overlaid_vals, alone_vals, rtol=1e-13, atol=1e-13)
+
+
+
+def test_precise_sampling_fixes_cancellation_and_reuses_the_float32_kernel():
+    # 1 - cos(x) loses every digit near 0 in float64; the limit there is 1/2
+    pipeline = pipeline_for("(1 - cos(x))/x**2")
+    data = pipeline.sample(-1e-5, 1e-5, 0, dps=30)
+    np.testing.assert_allclose(data.y_vals_list[0], 0.5, rtol=1e-8)
+    kernel = pipeline.compiled32[pipeline.func]
+    pipeline.sample(-2e-5, 2e-5, 0, dps=30)
+    assert pipeline.compiled32[pipeline.func] is kernel
+
+# -----------------------------------------------
+# Taylor-Mode AD Against sp.diff
+# -----------------------------------------------
+
+AD_CORPUS = [expr for expr in CORPUS if supports(expr, x)]
+
+
+@pytest.mark.parametrize("expr", AD_CORPUS, ids=[str(expr)[:40] for expr in AD_CORPUS])
+def test_autodiff_matches_sp_diff(expr):
+    orders = TaylorKernel(expr, x, 4)(PROBES)
+    for order in range(5):
+        assert_close(orders[order], reference_values(sp.diff(expr, x, order)), rtol=1e-7, atol=1e-9,
+                     message=f"order {order} of {expr}")
+
+
+def test_derivative_placeholder_compiles_to_autodiff():
+    expr = parse_text("exp(sin(x))*cos(x)")
+    evaluate = compile_derivative(sp.Derivative(expr, (x, 6)), x)
+    assert_close(evaluate(PROBES), reference_values(sp.diff(expr, x, 6)), rtol=1e-8)
+
+
+def test_autodiff_strategy_samples_like_sp_diff():
+    # A large tree at a high order is routed to AD; the curves must not change
+    text = "sqrt(1 + sin(x)**2)/(x + exp(-x)) + cos(x)*exp(sin(x))"
+    pipeline = pipeline_for(text)
+    assert pipeline.plan(8).strategy == "autodiff"
+    data = pipeline.sample(0.0, 2.0, 8)
+    assert isinstance(data.derivatives[8], sp.Derivative)
+    points = data.x_vals[CHECKED_ROWS]
+    expected = reference_values(sp.diff(parse_text(text), x, 8), points)
+    assert_close(data.y_vals_list[8][CHECKED_ROWS], expected, rtol=1e-7)
+
+
+# -----------------------------------------------
+# Time-Limited SymPy Worker
+# -----------------------------------------------
+
+def test_symbolic_worker_is_reused_and_restarted_after_a_timeout():
+    import time
+    from complexity import SymbolicTimeout, SymbolicWorker
+    worker = SymbolicWorker()
+    try:
+        assert worker.call(sp.simplify, (sp.sin(x) ** 2 + sp.cos(x) ** 2,), 30) == 1
+        pid = worker.process.pid
+        assert worker.call(sp.integrate, (x ** 2, x), 30) == x ** 3 / 3
+        assert worker.process.pid == pid
+        start = time.perf_counter()
+        with pytest.raises(SymbolicTimeout):
+            worker.call(time.sleep, (30,), 0.5)
+        assert time.perf_counter() - start < 10
+        assert worker.call(sp.diff, (sp.sin(x), x), 30) == sp.cos(x)
+        assert worker.process.pid != pid
+        with pytest.raises(ZeroDivisionError):
+            worker.call(divmod, (1, 0), 30)
+    finally:
+        worker.stop()
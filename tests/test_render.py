@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pytest
+import sympy as sp
+
+# -----------------------------------------------
+# PlotWidget Rendering Through Image Hashes
+# -----------------------------------------------
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "render_hashes.json")
+
+# Set to 1 to rewrite BASELINES from the current rendering (after an intended visual change)
+UPDATE_BASELINES = os.environ.get("GRAPHIQUE_UPDATE_BASELINES") == "1"
+
+# Figure size in inches at the widget's 100 dpi
+FIGURE_SIZE = (6.0, 4.8)
+
+# Difference-hash grid (HASH_SIZE + 1 by HASH_SIZE cells, HASH_SIZE^2 bits), and the
+# share of bits that may differ from the baseline: antialiasing and font hinting
+# change a few edges between FreeType and Matplotlib versions, a wrong plot far more
+HASH_SIZE = 16
+HASH_TOLERANCE = 0.08
+
+
+def pixels(widget):
+    widget.draw()
+    return np.asarray(widget.buffer_rgba())[..., :3].copy()
+
+
+def exact_hash(widget):
+    """sha256 of the rendered RGB pixels: equal only for identical images."""
+    return hashlib.sha256(pixels(widget).tobytes()).hexdigest()
+
+
+def difference_hash(widget):
+    """
+    Perceptual hash of the rendered image as a hex string.
+
+    The image is averaged down to (HASH_SIZE, HASH_SIZE + 1) grey cells and
+    each bit says whether a cell is brighter than its right neighbour.
+    """
+    grey = pixels(widget).mean(axis=2)
+    rows = np.array_split(np.arange(grey.shape[0]), HASH_SIZE)
+    columns = np.array_split(np.arange(grey.shape[1]), HASH_SIZE + 1)
+    cells = np.array([[grey[np.ix_(r, c)].mean() for c in columns] for r in rows])
+    bits = (cells[:, 1:] > cells[:, :-1]).ravel()
+    return f"{int(''.join('1' if bit else '0' for bit in bits), 2):0{HASH_SIZE * HASH_SIZE // 4}x}"
+
+
+def distance(first, second):
+    """Share of differing bits between two difference hashes."""
+    return bin(int(first, 16) ^ int(second, 16)).count("1") / (HASH_SIZE * HASH_SIZE)
+
+
+@pytest.fixture(scope="module")
+def baselines():
+    stored = {}
+    if os.path.exists(BASELINES):
+        with open(BASELINES) as file:
+            stored = json.load(file)
+    yield stored
+    if UPDATE_BASELINES:
+        os.makedirs(os.path.dirname(BASELINES), exist_ok=True)
+        with open(BASELINES, "w") as file:
+            json.dump(stored, file, indent=2, sort_keys=True)
+            file.write("\n")
+
+
+@pytest.fixture
+def widget(qapp):
+    from graph import PlotWidget
+    plot_widget = PlotWidget()
+    plot_widget.figure.set_size_inches(*FIGURE_SIZE)
+    plot_widget.animations_enabled = False
+    yield plot_widget
+    plot_widget.clear_axes()
+    plot_widget.deleteLater()
+
+
+def check_baseline(baselines, name, widget):
+    actual = difference_hash(widget)
+    if UPDATE_BASELINES:
+        baselines[name] = actual
+        return
+    assert name in baselines, f"No baseline for {name}; run with GRAPHIQUE_UPDATE_BASELINES=1"
+    assert distance(actual, baselines[name]) <= HASH_TOLERANCE, \
+        f"{name} differs from its baseline in {distance(actual, baselines[name]):.0%} of the hash"
+
+
+def sampled(text, order, x_min=-4.0, x_max=4.0):
+    from pipeline import Pipeline
+    pipeline = Pipeline()
+    pipeline.parse(text)
+    return pipeline, pipeline.sample(x_min, x_max, order)
+
+
+def draw_function(widget, text="sin(x)*exp(-x**2/8)", order=2):
+    pipeline, data = sampled(text, order)
+    widget.plot_function(data.x_vals, data.y_vals_list, data.dy_vals_list, data.int_vals)
+    return pipeline, data
+
+
+def test_function_plot(widget, baselines):
+    pipeline, _ = draw_function(widget)
+    widget.mark_points(pipeline.critical_points(-4.0, 4.0))
+    check_baseline(baselines, "function", widget)
+
+
+def test_overlay_plot(widget, baselines):
+    draw_function(widget, order=1)
+    widget.set_overlaid([("cos(x)", sampled("cos(x)", 1)[1])])
+    check_baseline(baselines, "overlay", widget)
+
+
+def test_series_plot(widget, baselines):
+    pipeline, _ = sampled("exp(sin(x))", 0)
+    widget.plot_series(pipeline.series(-4.0, 4.0, 0.0, 5), "exp(sin(x))")
+    check_baseline(baselines, "series", widget)
+
+
+@pytest.mark.parametrize("rule", ["midpoint", "simpson"])
+def test_quadrature_plot(widget, baselines, rule):
+    from quadrature import apply_rule
+    pipeline, data = sampled("x**2*exp(-x/3)", 0, -1.0, 3.0)
+    quadrature = apply_rule(rule, pipeline.compile(pipeline.func), -1.0, 3.0, 12)
+    widget.plot_quadrature(quadrature, data.x_vals, data.y_vals_list[0], "x**2*exp(-x/3)")
+    check_baseline(baselines, f"quadrature-{rule}", widget)
+
+
+@pytest.mark.parametrize("view", ["contour", "heatmap"])
+def test_surface_plot(widget, baselines, view):
+    from surface import parse_surface, sample_surface
+    surface = sample_surface(parse_surface("sin(x)*cos(y)"), -3.0, 3.0, -3.0, 3.0)
+    widget.plot_surface(surface, view)
+    check_baseline(baselines, f"surface-{view}", widget)
+
+
+def test_curve_plots(widget, baselines):
+    from curves import T, parse_curve, sample_implicit, sample_parametric
+    exprs = parse_curve("parametric", "cos(3*t); sin(2*t)")
+    widget.plot_curve(sample_parametric(exprs[0], exprs[1], T, 0.0, 6.3), "parametric")
+    check_baseline(baselines, "parametric", widget)
+    widget.plot_curve(sample_implicit(parse_curve("implicit", "x**2 + y**2 = 4")[0], -3.0, 3.0, -3.0, 3.0), "implicit")
+    check_baseline(baselines, "implicit", widget)
+
+
+def test_rendering_is_deterministic(widget):
+    draw_function(widget)
+    first = exact_hash(widget)
+    draw_function(widget)
+    assert exact_hash(widget) == first
+
+
+def test_finished_reveal_matches_unanimated_plot(widget):
+    # The reveal only changes how the plot appears, never where it ends up
+    _, data = sampled("sin(x)*exp(-x**2/8)", 2)
+    widget.animations_enabled = False
+    widget.animate_plot(data.x_vals, data.y_vals_list, data.dy_vals_list, data.int_vals)
+    expected = exact_hash(widget)
+    widget.animations_enabled = True
+    widget.animate_plot(data.x_vals, data.y_vals_list, data.dy_vals_list, data.int_vals)
+    assert widget.animation is not None and widget.animation.running
+    widget.animation.finish()
+    assert exact_hash(widget) == expected
+
+
+def test_compacted_history_snapshot_redraws_the_same_plot(widget):
+    # float32 samples and grid descriptors must not visibly change a recalled plot
+    from history import compact_snapshot, expand_snapshot
+    draw_function(widget)
+    snapshot = widget.snapshot()
+    widget.show_snapshot(snapshot)
+    full = difference_hash(widget)
+    widget.show_snapshot(expand_snapshot(compact_snapshot(snapshot)))
+    assert difference_hash(widget) == full
+
+
+def test_different_functions_hash_differently(widget):
+    draw_function(widget, "sin(x)", 0)
+    first = difference_hash(widget)
+    draw_function(widget, "x**3/20 - x", 0)
+    assert distance(difference_hash(widget), first) > HASH_TOLERANCE
+
+
+# -----------------------------------------------
+# Details Typesetting
+# -----------------------------------------------
+
+def test_plain_text_keeps_products():
+    from typeset import plain_text
+    x, y = sp.symbols('x y')
+    assert plain_text(2 * x * y) == "2·x·y"
+    assert plain_text(x ** 2) == "x^2"
+
+
+def test_incremental_details_match_a_full_rebuild(qapp):
+    from typeset import MathTextEdit, expression_html
+    x = sp.Symbol('x')
+
+    def sections(order, value):
+        items = [("function", "<div><b>Original Function:</b></div>" + expression_html("f(x) = ", x * sp.sin(x), ""))]
+        for i in range(1, order + 1):
+            formula = expression_html(f"f^{{({i})}}(x) = ", sp.diff(x * sp.sin(x), x, i), "")
+            items.append((f"derivative-{i}", f'<div style="margin-left: 15px;">{formula}</div>'))
+        return items + [("definite", f"<div>{value}</div>")]
+
+    incremental = MathTextEdit()
+    for order, value in [(2, 1), (3, 1), (3, 2), (1, 5), (4, 7)]:
+        incremental.set_sections(sections(order, value))
+    full = MathTextEdit()
+    full.set_sections(sections(4, 7))
+    assert incremental.toHtml() == full.toHtml()
+
+
+@pytest.mark.parametrize("text, x_min, x_max", [("log(x)", -1.0, 1.0), ("sqrt(x)", 0.0, 4.0), ("sqrt(x)", -4.0, -1.0)])
+def test_animated_plot_ignores_points_outside_the_domain(widget, text, x_min, x_max):
+    _, data = sampled(text, 1, x_min, x_max)
+    widget.animate_plot(data.x_vals, data.y_vals_list, data.dy_vals_list, data.int_vals)
+    assert np.all(np.isfinite(widget.ax.get_ylim()))
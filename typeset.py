@@ -0,0 +1,229 @@
+import io
+from collections import OrderedDict
+from functools import lru_cache
+from html import escape
+from urllib.parse import quote, unquote
+import sympy as sp
+from matplotlib import mathtext
+from matplotlib.font_manager import FontProperties
+from PyQt5.QtGui import QImage, QTextBlockFormat, QTextCharFormat, QTextCursor, QTextDocument
+from PyQt5.QtWidgets import QTextEdit
+from applog import get_logger
+
+logger = get_logger("typeset")
+
+# -----------------------------------------------
+# Cached Math Typesetting for the Details Panel
+# -----------------------------------------------
+
+# Rendered formula images kept across plots (failures are remembered too), and
+# the pixel bytes they may hold together: a long derivative is a wide image
+MATH_CACHE_SIZE = 512
+MATH_CACHE_BYTES = 16 * 1024 * 1024
+
+# LaTeX longer than this is shown as text: a formula image that wide is
+# unreadable and slow to render
+MAX_LATEX_LENGTH = 1200
+
+# Formula size (points at MATH_DPI, matching the panel's 22px text) and colour
+MATH_SIZE = 16
+MATH_DPI = 100
+MATH_COLOR = '#55557D'
+
+# Image URLs carry the size and the LaTeX itself, so HTML saved in the
+# session history can be shown again after the cache forgot the image
+MATH_SCHEME = "math"
+
+_images = OrderedDict()
+_image_bytes = 0
+
+
+@lru_cache(maxsize=MATH_CACHE_SIZE)
+def latex(expr):
+    """sp.latex(expr), cached per expression."""
+    return sp.latex(expr)
+
+
+def plain_text(expr):
+    """
+    Readable one-line text of an expression: ^ for powers and · for products.
+
+    Unlike dropping every '*', this keeps 2*x*y as 2·x·y instead of 2xy.
+    """
+    return escape(str(expr).replace('**', '^').replace('*', '·'))
+
+
+def render_math(tex, size=MATH_SIZE):
+    """
+    Render LaTeX with Matplotlib's mathtext, once per (tex, size).
+
+    Returns:
+        QImage: The formula, or None if mathtext cannot typeset it
+    """
+    global _image_bytes
+    key = (tex, size)
+    if key in _images:
+        _images.move_to_end(key)
+        return _images[key]
+
+    buffer = io.BytesIO()
+    try:
+        mathtext.math_to_image(f"${tex}$", buffer, prop=FontProperties(size=size), dpi=MATH_DPI,
+                               format='png', color=MATH_COLOR)
+        image = QImage.fromData(buffer.getvalue(), "PNG")
+    except (ValueError, RuntimeError) as e:
+        logger.debug("mathtext cannot typeset %r: %s", tex, e)
+        image = None
+    _images[key] = image
+    _image_bytes += image_bytes(image)
+    while len(_images) > 1 and (len(_images) > MATH_CACHE_SIZE or _image_bytes > MATH_CACHE_BYTES):
+        _image_bytes -= image_bytes(_images.popitem(last=False)[1])
+    return image
+
+
+def image_bytes(image):
+    return image.sizeInBytes() if image is not None else 0
+
+
+def cache_info():
+    """Formulas and pixel bytes held by the image cache, for memory diagnostics."""
+    return len(_images), _image_bytes
+
+
+def math_html(tex, fallback, size=MATH_SIZE):
+    """
+    An <img> of the typeset formula, or the escaped fallback text.
+
+    Args:
+        tex (str): LaTeX without the surrounding $...$
+        fallback (str): HTML shown when the formula is too long or cannot be typeset
+    """
+    if len(tex) > MAX_LATEX_LENGTH or render_math(tex, size) is None:
+        return fallback
+    return f'<img src="{MATH_SCHEME}:{size}/{quote(tex, safe="")}" style="vertical-align: middle;">'
+
+
+def expression_html(prefix_tex, expr, prefix_text, suffix="", size=MATH_SIZE):
+    """
+    "prefix = expr" typeset as one formula, e.g. expression_html("f(x) = ", expr, "f(x) = ").
+
+    Args:
+        prefix_tex (str): LaTeX put before the expression
+        prefix_text (str): The same prefix for the text fallback
+        suffix (str): Put after the expression in both forms, e.g. " + C"
+    """
+    return math_html(prefix_tex + latex(expr) + suffix, prefix_text + plain_text(expr) + escape(suffix), size)
+
+
+def clear_cache():
+    """Forget every rendered formula and cached LaTeX string."""
+    global _image_bytes
+    _images.clear()
+    _image_bytes = 0
+    latex.cache_clear()
+
+
+class MathTextEdit(QTextEdit):
+    """
+    A read-only QTextEdit for the Details panel, updated section by section.
+
+    set_sections() takes (key, html) pairs. When the keys are the same as
+    before, only the sections whose HTML changed are replaced in place;
+    otherwise the sections after the first difference are removed and
+    appended again. Nothing before that point is re-laid out, so a long
+    derivative list is not rebuilt when only the x range or the last
+    derivative changes.
+
+    Formula images (see math_html) are loaded on demand from the cache.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Section edits are not for the user to undo, and would pile up in the undo stack
+        self.setUndoRedoEnabled(False)
+        self.sections = []
+        # (start, end) document positions of every section
+        self.bounds = []
+
+    def loadResource(self, resource_type, url):
+        if resource_type == QTextDocument.ImageResource and url.scheme() == MATH_SCHEME:
+            size, _, tex = url.path().partition("/")
+            image = render_math(unquote(tex), int(size))
+            return image if image is not None else QImage()
+        return super().loadResource(resource_type, url)
+
+    def setHtml(self, html):
+        # Replaces everything; the next set_sections starts from scratch
+        self.sections = []
+        self.bounds = []
+        super().setHtml(html)
+
+    def set_sections(self, sections):
+        """
+        Show sections, reusing every unchanged one.
+
+        Args:
+            sections (list): (key, html) pairs in display order
+        """
+        sections = list(sections)
+        if not self.sections:
+            self.clear()
+        keys = [key for key, _ in sections]
+        if keys == [key for key, _ in self.sections]:
+            for index in reversed(range(len(sections))):
+                if sections[index][1] != self.sections[index][1]:
+                    self._replace(index, sections[index][1])
+        else:
+            keep = 0
+            while keep < min(len(sections), len(self.sections)) and sections[keep] == self.sections[keep]:
+                keep += 1
+            self._truncate(keep)
+            for _, html in sections[keep:]:
+                self._append(html)
+        self.sections = sections
+
+    def _replace(self, index, html):
+        start, end = self.bounds[index]
+        cursor = QTextCursor(self.document())
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.KeepAnchor)
+        self._insert(cursor, html)
+        delta = cursor.position() - end
+        self.bounds[index] = (start, cursor.position())
+        for later in range(index + 1, len(self.bounds)):
+            later_start, later_end = self.bounds[later]
+            self.bounds[later] = (later_start + delta, later_end + delta)
+
+    def _truncate(self, keep):
+        # Remove sections keep... together with the block break before the first of them
+        if keep >= len(self.bounds):
+            return
+        cursor = QTextCursor(self.document())
+        cursor.setPosition(self.bounds[keep - 1][1] if keep else 0)
+        cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+        if not keep:
+            # An emptied document keeps the format of the block that was first
+            self.clear()
+        del self.bounds[keep:]
+
+    def _append(self, html):
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        if self.bounds:
+            # A plain block: the new section must not inherit the indent of the last one
+            cursor.insertBlock(QTextBlockFormat(), QTextCharFormat())
+        start = cursor.position()
+        self._insert(cursor, html)
+        self.bounds.append((start, cursor.position()))
+
+    def _insert(self, cursor, html):
+        # insertHtml merges the first block of html into the block at the
+        # cursor, dropping its margins and indent; put them back afterwards
+        parsed = QTextDocument()
+        parsed.setHtml(html)
+        first = parsed.begin().blockFormat()
+        start = cursor.selectionStart()
+        cursor.insertHtml(html)
+        block = QTextCursor(self.document().findBlock(start))
+        block.setBlockFormat(first)